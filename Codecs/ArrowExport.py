@@ -0,0 +1,201 @@
+# Python deps & external libraries
+import re
+from decimal import Decimal
+from typing import Iterator
+
+class ArrowExport:
+    '''
+    Helper class for converting streamed tuple row batches into Apache Arrow IPC streams and Parquet files.
+
+    `pyarrow` is imported on demand, so the API runs without it as long as the export endpoint isn't used.
+    '''
+    FORMATS = {
+        'arrow': {
+            'mimetype': 'application/vnd.apache.arrow.stream',
+            'extension': 'arrows'
+        },
+        'parquet': {
+            'mimetype': 'application/vnd.apache.parquet',
+            'extension': 'parquet'
+        }
+    }
+
+    @staticmethod
+    def available() -> bool:
+        '''
+        Checks if `pyarrow` is installed.
+        '''
+        try:
+            import pyarrow
+            return True
+        except ImportError:
+            return False
+
+    @staticmethod
+    def export(export_format: str, batches: Iterator[tuple[list, list]], column_types: dict) -> Iterator[bytes]:
+        '''
+        Converts the row `batches` into `export_format` and yields the encoded bytes as they become available.
+
+        Args:
+            export_format (str): `arrow` for an IPC stream, or `parquet` for a Parquet file (one row group per batch)
+            batches (Iterator): The column names and tuple rows, as yielded by `DatabaseManager.select_batches`
+            column_types (dict): The declared SQL column types keyed by the column names
+
+        Yields:
+            bytes: The encoded chunks
+        '''
+        import pyarrow as pa
+
+        sink = _ChunkSink()
+        writer = None
+        schema = None
+
+        try:
+            for columns, rows in batches:
+                if schema is None:
+                    schema = ArrowExport._build_schema(columns, rows, column_types)
+                    writer = ArrowExport._create_writer(export_format, sink, schema)
+
+                if rows:
+                    writer.write_batch(ArrowExport._to_record_batch(schema, rows))
+
+                yield from sink.drain()
+        finally:
+            if writer is not None:
+                writer.close()
+
+        yield from sink.drain()
+
+    # ------------------------------
+    # Helper methods
+    # ------------------------------
+    @staticmethod
+    def _create_writer(export_format: str, sink: '_ChunkSink', schema: any) -> any:
+        import pyarrow as pa
+
+        if export_format == 'parquet':
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(sink, schema)
+        return pa.ipc.new_stream(sink, schema)
+
+    @staticmethod
+    def _to_record_batch(schema: any, rows: list) -> any:
+        '''
+        Transposes the tuple `rows` into columns and builds a record batch of `schema`.
+        '''
+        import pyarrow as pa
+
+        arrays = [
+            ArrowExport._to_array(values, field.type)
+            for field, values in zip(schema, zip(*rows))
+        ]
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    @staticmethod
+    def _to_array(values: tuple, arrow_type: any) -> any:
+        '''
+        Converts the column `values` into an array of `arrow_type`. The values of the string columns that aren't strings
+        (e.g. the numbers of an untyped SQLite column) are converted with `str()`, the floats of the decimal columns with
+        their shortest repr.
+        '''
+        import pyarrow as pa
+
+        try:
+            return pa.array(values, type=arrow_type)
+        except (pa.ArrowException, TypeError, ValueError):
+            if pa.types.is_string(arrow_type):
+                return pa.array([None if value is None else str(value) for value in values], type=arrow_type)
+            if pa.types.is_decimal(arrow_type):
+                return pa.array([Decimal(repr(value)) if isinstance(value, float) else value for value in values], type=arrow_type)
+            raise
+
+    @staticmethod
+    def _build_schema(columns: list, rows: list, column_types: dict) -> any:
+        '''
+        Builds the Arrow schema from the declared `column_types`, it holds for all the batches of the stream.
+        The columns with unknown types, or with a declared type the first batch of `rows` doesn't fit (SQLite doesn't enforce
+        the declared types), are exported as strings.
+        '''
+        import pyarrow as pa
+
+        fields = []
+        column_values = list(zip(*rows)) if rows else [[] for _ in columns]
+
+        for column, values in zip(columns, column_values):
+            arrow_type = ArrowExport._arrow_type(column_types.get(column, ''))
+
+            if arrow_type is not None:
+                try:
+                    pa.array(values, type=arrow_type)
+                except (pa.ArrowException, TypeError, ValueError):
+                    arrow_type = None
+
+            fields.append(pa.field(column, arrow_type if arrow_type is not None else pa.string()))
+
+        return pa.schema(fields)
+
+    @staticmethod
+    def _arrow_type(sql_type: str) -> any:
+        '''
+        Maps a declared SQL column type to an Arrow type.
+
+        Returns:
+            pyarrow.DataType: The Arrow type, or None if the type is unknown
+        '''
+        import pyarrow as pa
+
+        sql_type = sql_type.lower()
+        base_type = sql_type.split('(')[0].strip()
+
+        if sql_type.startswith('tinyint(1)') or base_type in ('bool', 'boolean'):
+            return pa.bool_()
+        if base_type in ('tinyint', 'smallint', 'mediumint', 'int', 'integer', 'bigint', 'serial', 'bigserial', 'smallserial'):
+            return pa.int64()
+        if base_type in ('float', 'double', 'double precision', 'real'):
+            return pa.float64()
+        if base_type in ('decimal', 'numeric'):
+            precision = re.match(r'\w+\((\d+),\s*(\d+)\)', sql_type)
+            # Without a declared precision the values may have any scale, strings keep them exact
+            if not precision:
+                return pa.string()
+            decimal_type = pa.decimal128 if int(precision[1]) <= 38 else pa.decimal256
+            return decimal_type(int(precision[1]), int(precision[2]))
+        if base_type in ('char', 'varchar', 'character', 'character varying', 'text', 'tinytext', 'mediumtext', 'longtext', 'enum', 'set', 'json', 'jsonb', 'uuid'):
+            return pa.string()
+        if base_type in ('blob', 'tinyblob', 'mediumblob', 'longblob', 'binary', 'varbinary', 'bytea'):
+            return pa.binary()
+        if base_type == 'date':
+            return pa.date32()
+        if base_type in ('datetime', 'timestamp', 'timestamp without time zone'):
+            return pa.timestamp('us')
+        if base_type == 'timestamp with time zone':
+            return pa.timestamp('us', tz='UTC')
+        return None
+
+class _ChunkSink:
+    '''
+    Minimal writable file object for the Arrow writers, collecting the written bytes until they are drained.
+    '''
+    def __init__(self):
+        self.__chunks = []
+        self.__position = 0
+        self.closed = False
+
+    def write(self, data: bytes) -> int:
+        self.__chunks.append(bytes(data))
+        self.__position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.__position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> Iterator[bytes]:
+        chunks, self.__chunks = self.__chunks, []
+        if chunks:
+            yield b''.join(chunks)
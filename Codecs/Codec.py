@@ -0,0 +1,46 @@
+# Python deps & external libraries
+from abc import ABC, abstractmethod
+
+class Codec(ABC):
+    '''
+    Core abstract class for the request/response body codecs. This class should be inherited by the codec classes.
+
+    Attributes:
+        content_type (str): The canonical content type of the codec
+        aliases (tuple): Other content types the codec accepts
+    '''
+    content_type: str = None
+    aliases: tuple = tuple()
+
+    @property
+    def content_types(self) -> tuple:
+        '''
+        All the content types handled by the codec, the canonical one first.
+        '''
+        return (self.content_type, *self.aliases)
+
+    @abstractmethod
+    def decode(self, body: bytes) -> any:
+        '''
+        Decode the raw request `body` into Python objects.
+
+        Args:
+            body (bytes): The raw request body
+
+        Returns:
+            any: The decoded data
+        '''
+        pass
+
+    @abstractmethod
+    def encode(self, data: any) -> bytes:
+        '''
+        Encode `data` into the raw response body.
+
+        Args:
+            data (any): The response data
+
+        Returns:
+            bytes: The encoded response body
+        '''
+        pass
@@ -0,0 +1,120 @@
+# Python deps & external libraries
+import time
+import flask
+from werkzeug.exceptions import BadRequest
+
+# Imports for proper typing
+from .Codec import Codec
+from Database import QueryStats
+
+class CodecRegistry:
+    '''
+    Registry of the supported request/response body codecs. Shared by the middleware and the routes.
+
+    Attributes:
+        default (Codec): The codec used when the client has no preference
+    '''
+    def __init__(self, *codecs: Codec):
+        self.__codecs = {}
+        self.default = None
+
+        for codec in codecs:
+            self.register(codec)
+
+    def register(self, codec: Codec):
+        '''
+        Registers `codec` for all of its content types. The first registered codec is the default.
+
+        Args:
+            codec (Codec): The codec instance
+        '''
+        for content_type in codec.content_types:
+            self.__codecs[content_type] = codec
+
+        if self.default is None:
+            self.default = codec
+
+    @property
+    def content_types(self) -> tuple:
+        '''
+        All the registered content types.
+        '''
+        return tuple(self.__codecs.keys())
+
+    def get(self, content_type: str) -> Codec:
+        '''
+        Gets the codec for `content_type`, ignoring any parameters (e.g. `; charset=utf-8`).
+
+        Args:
+            content_type (str): The content type header value
+
+        Returns:
+            Codec: The codec, or None if the content type is not supported
+        '''
+        if not content_type:
+            return None
+        return self.__codecs.get(content_type.split(';')[0].strip().lower())
+
+    def negotiate(self, request: flask.Request) -> Codec:
+        '''
+        Picks the response codec based on the `Accept` header of the `request`.
+
+        Args:
+            request (flask.Request): The request object
+
+        Returns:
+            Codec: The best matching codec, or the default codec
+        '''
+        best_match = request.accept_mimetypes.best_match(self.__codecs.keys())
+        return self.__codecs.get(best_match, self.default)
+
+    def decode_request(self, request: flask.Request) -> any:
+        '''
+        Decodes the body of the `request` with the codec matching its content type. The result is cached for the request.
+
+        Args:
+            request (flask.Request): The request object
+
+        Returns:
+            any: The decoded data, or None if the request has no body or an unsupported content type
+        '''
+        if 'decoded_body' in flask.g:
+            return flask.g.decoded_body
+
+        codec = self.get(request.content_type)
+        body = request.get_data(cache=True)
+        data = None
+
+        if codec is not None and body:
+            try:
+                data = codec.decode(body)
+            except Exception as e:
+                raise BadRequest(f'Failed to decode the request body as `{codec.content_type}`: {e}')
+
+        flask.g.decoded_body = data
+        return data
+
+    def make_response(self, data: any, status: int = None) -> flask.Response:
+        '''
+        Encodes `data` with the codec negotiated for the current request.
+
+        Args:
+            data (any): The response data
+            status (int, optional): The HTTP status code
+
+        Returns:
+            flask.Response: The response object
+        '''
+        codec = self.negotiate(flask.request)
+
+        started = time.perf_counter()
+        body = codec.encode(data)
+        QueryStats.record(serialize_time = time.perf_counter() - started)
+
+        response = flask.current_app.response_class(body, mimetype=codec.content_type)
+
+        if status is not None:
+            response.status_code = status
+
+        response.vary.add('Accept')
+        return response
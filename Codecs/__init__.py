@@ -0,0 +1,3 @@
+from .Codec import Codec
+from .CodecRegistry import CodecRegistry
+from .ArrowExport import ArrowExport
@@ -0,0 +1,130 @@
+# Python deps & external libraries
+import math
+import uuid
+import flask
+from json.encoder import encode_basestring, encode_basestring_ascii
+
+# Imports for proper typing
+from typing import Iterator, override
+from Database import RowSet
+
+from .. import Codec
+
+class JSONCodec(Codec):
+    '''
+    Codec type: JSON. Uses the Flask app's JSON provider, so the output matches `jsonify`.
+
+    The rows of the `rows` layout are encoded straight from the fetched tuples, one `{"column":value,...}` object at a time,
+    so no dictionary is built per row. They are spliced into the encoded response in place of a marker.
+    '''
+    content_type = 'application/json'
+    CHUNK_ROWS = 1000
+
+    @override
+    def decode(self, body: bytes) -> any:
+        '''
+        Decode a JSON request body.
+
+        Args:
+            body (bytes): The raw request body
+
+        Returns:
+            any: The decoded data
+        '''
+        return flask.json.loads(body)
+
+    @override
+    def encode(self, data: any) -> bytes:
+        '''
+        Encode `data` as JSON.
+
+        Args:
+            data (any): The response data
+
+        Returns:
+            bytes: The encoded response body
+        '''
+        # Same formatting as `jsonify`: pretty-printed in debug mode, compact otherwise
+        if flask.current_app.debug:
+            body = flask.json.dumps(data, default=self._default, indent=2)
+            return f'{body}\n'.encode('utf-8')
+
+        # The row sets are replaced by markers, unique to this call, and encoded on their own
+        row_sets = []
+        token = uuid.uuid4().hex
+        def default(value: any) -> any:
+            if isinstance(value, RowSet) and value.layout == 'rows' and len(set(value.columns)) == len(value.columns):
+                row_sets.append(value)
+                return f'\x00{token}:{len(row_sets) - 1}'
+            return self._default(value)
+
+        body = flask.json.dumps(data, default=default, separators=(',', ':'))
+        if not row_sets:
+            return f'{body}\n'.encode('utf-8')
+
+        # Joined once, without an intermediate copy of the body or of the rows
+        pieces = []
+        for index, row_set in enumerate(row_sets):
+            before, _, body = body.partition(flask.json.dumps(f'\x00{token}:{index}'))
+            pieces.append(before)
+            pieces.extend(self._encode_rows(row_set))
+        pieces.append(f'{body}\n')
+
+        return ''.join(pieces).encode('utf-8')
+
+    def _encode_rows(self, row_set: RowSet) -> Iterator[str]:
+        '''
+        Encodes the rows of `row_set` as an array of objects, as the JSON provider would encode their dictionaries
+        (same key order and escaping), from the tuples.
+
+        Args:
+            row_set (RowSet): The rows
+
+        Yields:
+            str: The pieces of the encoded array
+        '''
+        provider = flask.current_app.json
+        encode_string = encode_basestring_ascii if getattr(provider, 'ensure_ascii', True) else encode_basestring
+        columns = row_set.columns
+
+        # The provider sorts the keys of the objects
+        order = sorted(range(len(columns)), key=lambda index: columns[index]) if getattr(provider, 'sort_keys', True) else list(range(len(columns)))
+        keys = [f'{encode_string(str(columns[index]))}:' for index in order]
+        reorder = order != list(range(len(columns)))
+
+        def encode_value(value: any) -> str:
+            return flask.json.dumps(value, default=self._default, separators=(',', ':'))
+        def encode_float(value: float) -> str:
+            return float.__repr__(value) if math.isfinite(value) else encode_value(value)
+
+        # The native types by exact type (a subclass goes through the provider), the others through the provider
+        encoders = {
+            str: encode_string,
+            int: int.__repr__,
+            float: encode_float,
+            bool: lambda value: 'true' if value else 'false',
+            type(None): lambda value: 'null'
+        }
+        encoders_get = encoders.get
+
+        # Joined by chunks of rows, fewer pieces to keep until the final join
+        rows = row_set.rows
+        for start in range(0, len(rows), self.CHUNK_ROWS):
+            encoded = []
+            for row in rows[start:start + self.CHUNK_ROWS]:
+                if reorder:
+                    row = [row[index] for index in order]
+                encoded.append('{' + ','.join([key + (encoders_get(type(value)) or encode_value)(value) for key, value in zip(keys, row)]) + '}')
+            yield ('[' if start == 0 else ',') + ','.join(encoded)
+        yield ']' if rows else '[]'
+
+    def _default(self, value: any) -> any:
+        '''
+        Converts the values JSON can't encode natively, falling back to the Flask app's JSON provider.
+
+        Args:
+            value (any): The value to convert
+        '''
+        if isinstance(value, RowSet):
+            return value.serialize()
+        return flask.current_app.json.default(value)
@@ -0,0 +1,2 @@
+from .JSON import JSONCodec
+from .MessagePack import MessagePackCodec
@@ -1,19 +1,45 @@
 # Python deps & external libraries
+import time
+import threading
 from abc import ABC, abstractmethod
 from datetime import datetime, timezone
+from typing import Iterator
 
 # Imports for proper typing
 from Logger import Logger
 
+# Result rows
+from .RowSet import RowSet
+from .QueryStats import QueryStats
+from .SlowQueryLog import SlowQueryLog
+from .GroupCommit import GroupCommit
+
 # Status messages
 from status import DATABASE_STATUS_MESSAGES as STATUS_MESSAGES
+from status import DATABASE_STATUS_CODES as STATUS_CODES
 
 # Constants
-from constants import API_CORE_URL_PREFIX
+from constants import API_CORE_URL_PREFIX, METRICS, SLOW_QUERY_LOGGER
+
+QUERY_SECONDS       = METRICS.histogram('db_query_duration_seconds', 'Query execution time by statement type and table', ('statement', 'table'))
+ROWS_FETCHED        = METRICS.counter('db_rows_fetched_total', 'Rows fetched from the database')
+QUERIES_IN_FLIGHT   = METRICS.gauge('db_queries_in_flight', 'Queries executing on the database connection')
+
+class DatabaseConnectionError(RuntimeError):
+    '''
+    Raised by `Database.connection` when the connection can't be opened.
+    
+    Attributes:
+        status (dict): The `connection_fail` status to answer, without the database password
+    '''
+    def __init__(self, message: str, status: dict):
+        super().__init__(message)
+        self.status = status
 
 class Database(ABC):
     '''
     Core abstract class for database instances. This class should be inherited by the database engine classes.
+    The connection is opened on first use, so building the app doesn't connect to the database.
     
     Attributes:
         config (dict): The database connection options
@@ -22,9 +48,39 @@ class Database(ABC):
     def __init__(self, config: dict, logger: Logger, db_type: str):
         self.logger = logger
         self.config = config
-        self.connection = self._create_connection()
+        self._connection = None
+        self.__connect_lock = threading.Lock()
         self.db_type = db_type if db_type else self.__class__.__name__.replace('Database', '').lower()
         
+        METRICS.gauge('db_connections_open', 'Open database connections', callback = lambda: int(self._connection is not None))
+        
+        # Log the queries slower than `slow_query_ms` (disabled if not set)
+        self.slow_queries = None
+        if config.get('slow_query_ms'):
+            self.slow_queries = SlowQueryLog(
+                database = self,
+                logger = SLOW_QUERY_LOGGER,
+                threshold_ms = config['slow_query_ms'],
+                per_minute = config.get('slow_query_log_per_minute', 10),
+                explain = config.get('slow_query_explain', True)
+            )
+        
+        # Commit the concurrent writes together (disabled if the window is not set)
+        self.group_commit = None
+        if config.get('group_commit_ms'):
+            self.group_commit = GroupCommit(
+                database = self,
+                logger = logger,
+                window_ms = config['group_commit_ms'],
+                max_batch = config.get('group_commit_max', 64)
+            )
+        
+        # Statement timeouts in milliseconds (0: no limit), enforced by the engines
+        self.statement_timeout = float(config.get('statement_timeout_ms') or 0)
+        self.route_timeouts = {route: float(timeout) for route, timeout in (config.get('route_timeouts') or {}).items()}
+        self.table_timeouts = {table: float(timeout) for table, timeout in (config.get('table_timeouts') or {}).items()}
+        self.timeouts_enabled = bool(self.statement_timeout or any(self.route_timeouts.values()) or any(self.table_timeouts.values()))
+        
         # Define valid SQL actions
         self.valid_sql_actions = ('select', 'insert', 'update', 'delete')
         self.committable_actions = ('insert', 'update', 'delete')
@@ -35,22 +91,184 @@ class Database(ABC):
         Create a connection to the database. This method should be implemented by the db-type classes accordingly.
         '''
         pass
-        
+
+    @property
+    def connection(self) -> any:
+        '''
+        The database connection, opened on first use. A failed attempt raises `DatabaseConnectionError`, and the next use tries again.
+        '''
+        if self._connection is None:
+            with self.__connect_lock:
+                if self._connection is None:
+                    try:
+                        self._connection = self._create_connection()
+                    except RuntimeError as e:
+                        # The message of `e` holds the full configuration, the status only the public part of it
+                        config = {key: value for key, value in self.config.items() if key != 'password'}
+                        driver_error = str(e.__context__) if e.__context__ is not None else None
+                        status = STATUS_MESSAGES['connection_fail'](self.config.get('database'), config, driver_error)
+                        raise DatabaseConnectionError(str(e), status) from e
+        return self._connection
+
+    @connection.setter
+    def connection(self, connection: any):
+        self._connection = connection
+
+    def close(self):
+        '''
+        Closes the database connection, e.g. in the parent of the forked server workers before forking: a connection must not be
+        shared by two processes.
+        '''
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def reconnect(self):
+        '''
+        Opens a new database connection, e.g. in a forked server worker.
+        '''
+        self.__connect_lock = threading.Lock()
+        self._connection = self._create_connection()
+
     @abstractmethod
-    def query(self, query: str, table_name: str = None, cursor_settings: dict = None, query_arguments: dict = None, is_meta_query: bool = False, with_body: bool = True) -> dict:
+    def query(self, query: str, table_name: str = None, query_arguments: dict = None, is_meta_query: bool = False, with_body: bool = True, layout: str = 'rows') -> dict:
         '''
         The core method to execute a query on the database.
         
         Args:
             query (str): The query string
             table_name (str): The table name
-            cursor_settings (dict): The cursor settings
             query_arguments (dict): The query arguments
             is_meta_query (bool): If the query is a meta query or not
             with_body (bool): If the query result should include the body or not
+            layout (str): The response layout of the data (see `API_RESPONSE_LAYOUTS`)
         '''
         pass
     
+    def write(self, query: str, table_name: str = None, query_arguments: dict = None) -> dict:
+        '''
+        Executes the INSERT, UPDATE or DELETE `query`, in the next group commit when enabled. Same result as `query`.
+        
+        Args:
+            query (str): The query string
+            table_name (str): The table name
+            query_arguments (dict): The query arguments
+        
+        Returns:
+            dict: The query result dictionary
+        '''
+        if self.group_commit is None:
+            return self.query(query, table_name = table_name, query_arguments = query_arguments)
+        
+        status = {'success': True, 'type': 'info'}
+        affected_rows = 0
+        try:
+            affected_rows = max(self.group_commit.submit(query, table_name), 0)
+        except Exception as e:
+            status = self._query_error(e, query)
+        
+        return self._build_get_query_result(
+            query = {
+                'type': query.strip().lower().split(' ')[0],
+                'query': query
+            },
+            table_name = table_name,
+            query_arguments = query_arguments or {},
+            status = status,
+            affected_rows = affected_rows,
+            data = RowSet(tuple(), [])
+        )
+    
+    def _query_error(self, error: Exception, query: str) -> dict:
+        '''
+        Logs the failure of `query` and builds its status: `query_timeout` if it was cancelled by its statement timeout,
+        `connection_fail` if the connection couldn't be opened.
+        
+        Args:
+            error (Exception): The driver error
+            query (str): The query string
+        
+        Returns:
+            dict: The status message
+        '''
+        if isinstance(error, DatabaseConnectionError):
+            self.logger.error(str(error))
+            return {**error.status, 'success': False}
+        
+        status = STATUS_MESSAGES['query_timeout'](query) if self._is_timeout(error) else STATUS_MESSAGES['query_fail'](error, query)
+        self.logger.error(status['message'])
+        return status
+    
+    def timed_out(self, result: dict) -> bool:
+        '''
+        Checks if the query of `result` was cancelled by its statement timeout.
+        
+        Args:
+            result (dict): The query result dictionary
+        '''
+        return result.get('status', {}).get('code') == STATUS_CODES['query_timeout']
+    
+    def _statement_timeout(self, table_name: str = None) -> float:
+        '''
+        Gets the timeout of a statement on `table_name` in the current request: the table's, else the route's, else the default.
+        
+        Args:
+            table_name (str, optional): The table name
+        
+        Returns:
+            float: The timeout in milliseconds, 0 for no limit
+        '''
+        if table_name in self.table_timeouts:
+            return self.table_timeouts[table_name]
+        
+        stats = QueryStats.current()
+        if stats is not None and stats.route in self.route_timeouts:
+            return self.route_timeouts[stats.route]
+        
+        return self.statement_timeout
+    
+    def _limit_statement(self, cursor: any, query: str, timeout_ms: float) -> str:
+        '''
+        Applies the statement timeout `timeout_ms` to `query`, run next on `cursor`. Implemented by the engines, natively.
+        
+        Args:
+            cursor (any): The database cursor
+            query (str): The query string
+            timeout_ms (float): The timeout in milliseconds, 0 for no limit
+        
+        Returns:
+            str: The query to execute
+        '''
+        return query
+    
+    def _is_timeout(self, error: Exception) -> bool:
+        '''
+        Checks if the driver `error` is the cancellation of a statement by its timeout. Implemented by the engines.
+        
+        Args:
+            error (Exception): The driver error
+        '''
+        return False
+    
+    def _begin_group(self, cursor: any):
+        '''
+        Opens the transaction of a group commit, if the driver doesn't open it on the first statement.
+        
+        Args:
+            cursor (any): The cursor of the group
+        '''
+        pass
+    
+    def _in_transaction(self, connection: any) -> bool:
+        '''
+        Checks if the transaction of a group commit is still open after a failed write. Implemented by the engines whose errors
+        may roll back the whole transaction.
+        
+        Args:
+            connection (any): The connection of the group
+        '''
+        return True
+    
     def _commit_changes(self, query: str) -> dict:
         '''
         Checks if `query` is a committable action and commits the changes to the database.
@@ -65,12 +283,160 @@ class Database(ABC):
             query_action = query.strip().lower().split(' ')[0]
             if query_action not in self.committable_actions:
                 return # do not commit changes if the query is not committable (SELECT)
-            self.connection.commit()
-            self.logger.info(f'Changes committed to the database: {query}')
+            self._timed(self.connection.commit)
+            self.logger.info(f'Changes committed to the database: {query}', extra = Logger.SAMPLED)
         except Exception as e:
             self.logger.error(f'Failed to commit changes to the database: {query}. Error: {str(e)}')
     
-    def _build_get_query_result(self, query: str, table_name: str, query_arguments: dict, is_meta_query: bool = False, status: dict = {'success': True, 'type': 'info'}, affected_rows: int = 0, result_group: bool = False, data: list = [], with_body: bool = True) -> dict:
+    def stream(self, query: str, batch_size: int = 10000) -> Iterator[tuple[list, list]]:
+        '''
+        Executes the SELECT `query` and yields the result set in batches of tuple rows, without fetching it all into memory.
+        The first batch is always yielded (even if empty), so the column names are known for empty result sets too.
+        
+        Args:
+            query (str): The query string
+            batch_size (int): The maximum number of rows per batch
+        
+        Yields:
+            tuple: The column names and a list of at most `batch_size` rows
+        '''
+        cursor = self._create_stream_cursor()
+        try:
+            self._execute(cursor, query)
+            
+            rows = self._timed(cursor.fetchmany, batch_size)
+            columns = self._get_column_names(cursor)
+            ROWS_FETCHED.inc(amount = len(rows))
+            yield columns, rows
+            
+            while len(rows) == batch_size:
+                rows = self._timed(cursor.fetchmany, batch_size)
+                if rows:
+                    ROWS_FETCHED.inc(amount = len(rows))
+                    yield columns, rows
+        finally:
+            cursor.close()
+
+    def execute_write(self, query: str, table_name: str = None) -> int:
+        '''
+        Executes the write `query` and commits it. Unlike `query`, the failures are raised (after a rollback), so the caller
+        knows whether the rows are durable.
+
+        Args:
+            query (str): The INSERT, UPDATE or DELETE statement
+            table_name (str, optional): The table name, for the metrics
+
+        Returns:
+            int: The number of affected rows
+        '''
+        if self.group_commit is not None:
+            return self.group_commit.submit(query, table_name)
+        
+        cursor = self.connection.cursor()
+        try:
+            self._execute(cursor, query, table_name)
+            self._timed(self.connection.commit)
+            return cursor.rowcount
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def _execute(self, cursor: any, query: str, table_name: str = None):
+        '''
+        Executes `query` on `cursor`. All the queries go through here, so the round trips and their durations are reported
+        to the request's `QueryStats` and to the query metrics.
+        
+        Args:
+            cursor (any): The database cursor
+            query (str): The query string
+            table_name (str, optional): The table name, for the metrics
+        '''
+        statement = query.split(None, 1)[0].lower()
+        if statement not in self.valid_sql_actions:
+            statement = 'other'
+        
+        statement_query = query
+        if self.timeouts_enabled:
+            statement_query = self._limit_statement(cursor, query, self._statement_timeout(table_name))
+        
+        QUERIES_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            cursor.execute(statement_query)
+        finally:
+            elapsed = time.perf_counter() - started
+            QUERIES_IN_FLIGHT.dec()
+            QUERY_SECONDS.observe(elapsed, statement, table_name or '')
+            QueryStats.record(queries = 1, db_time = elapsed)
+            
+            if self.slow_queries is not None and elapsed >= self.slow_queries.threshold:
+                rows = getattr(cursor, 'rowcount', -1)
+                self.slow_queries.record(query, elapsed, rows if rows >= 0 else None, table_name)
+    
+    def _explain_query(self, query: str) -> str:
+        '''
+        Builds the query plan statement of `query`, used by the slow query log.
+        
+        Args:
+            query (str): The query string
+        '''
+        return f'EXPLAIN {query}'
+    
+    def _timed(self, fetch: callable, *args) -> any:
+        '''
+        Calls the cursor `fetch` method, adding its duration to the request's database time.
+        
+        Args:
+            fetch (callable): The fetch method (e.g. `cursor.fetchall`)
+            *args: The arguments of the fetch method
+        '''
+        started = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            QueryStats.record(db_time = time.perf_counter() - started)
+    
+    def _create_stream_cursor(self) -> any:
+        '''
+        Creates the cursor used by `stream`. The default cursors of all the supported drivers return tuple rows.
+        '''
+        return self.connection.cursor()
+    
+    def _get_column_names(self, cursor: any) -> tuple:
+        '''
+        Gets the column names of the result set from the `cursor` description.
+        
+        Args:
+            cursor (any): The executed database cursor
+        
+        Returns:
+            tuple: The column names, or an empty tuple if the query returned no result set
+        '''
+        if cursor is None or not cursor.description:
+            return tuple()
+        return tuple(column[0] for column in cursor.description)
+    
+    def _fetch_rows(self, cursor: any, with_body: bool = True, layout: str = 'rows') -> RowSet:
+        '''
+        Fetches the result set of the executed `cursor` as plain tuple rows with a single column-name header.
+        This is the common row pipeline of all the engines; the rows are shaped only when serialized.
+        
+        Args:
+            cursor (any): The executed database cursor
+            with_body (bool): If the rows should be fetched or not
+            layout (str): The output layout of the rows
+        
+        Returns:
+            RowSet: The fetched rows
+        '''
+        columns = self._get_column_names(cursor)
+        rows = self._timed(cursor.fetchall) if with_body and columns else []
+        ROWS_FETCHED.inc(amount = len(rows))
+        return RowSet(columns, rows, layout)
+    
+    def _build_get_query_result(self, query: str, table_name: str, query_arguments: dict, is_meta_query: bool = False, status: dict = {'success': True, 'type': 'info'}, affected_rows: int = 0, result_group: bool = False, data: RowSet = None, with_body: bool = True, layout: str = 'rows') -> dict:
         '''
         Constructs the query result dictionary.
         
@@ -81,8 +447,9 @@ class Database(ABC):
             status (dict): The query status
             affected_rows (int): The number of affected rows
             result_group (bool): If there are results or not
-            data (list): The query result data
+            data (RowSet): The query result rows
             is_meta_query (bool): If the query is a meta query or not
+            layout (str): The response layout of the data
         
         Returns:
             dict: The query result dictionary. This dictionary ultimately appears in the API responses.
@@ -93,7 +460,8 @@ class Database(ABC):
             return {
                 'status': {
                     'success': status.get('success', True),
-                    'type': status.get('type', 'info')
+                    'type': status.get('type', 'info'),
+                    **({'code': status['code']} if 'code' in status else {})
                 },
                 'affected_rows': affected_rows,
                 'result_group': result_group,
@@ -105,9 +473,10 @@ class Database(ABC):
             }
         
         # construct metadata
-        total_records = len(data)
-        limit = int(query_arguments.get('limit', -1))
-        offset = int(query_arguments.get('offset', 0))
+        total_records = len(data) if data else 0
+        # `limit` is None when the client requested all records (limit=0 or limit=-1)
+        limit = int(query_arguments.get('limit') or -1)
+        offset = int(query_arguments.get('offset') or 0)
         
         if limit == -1:
             per_page = total_records
@@ -125,18 +494,20 @@ class Database(ABC):
 
         # add query parameters to links if limit is not -1
         if limit != -1:
-            self_url += f'?offset={offset}&limit={limit}'
+            layout_arg = f'&layout={layout}' if layout != 'rows' else ''
+            self_url += f'?offset={offset}&limit={limit}{layout_arg}'
             if page < total_pages:
-                next_url = f'{base_url}?offset={offset + limit}&limit={limit}'
+                next_url = f'{base_url}?offset={offset + limit}&limit={limit}{layout_arg}'
             if page > 1:
-                prev_url = f'{base_url}?offset={max(0, offset - limit)}&limit={limit}'
+                prev_url = f'{base_url}?offset={max(0, offset - limit)}&limit={limit}{layout_arg}'
 
         # construct the final dictionary
         return {
             'success': status.get('success'),
             'status': {
                 'success': status.get('success'),
-                'type': status.get('type')
+                'type': status.get('type'),
+                **({'code': status['code']} if 'code' in status else {})
             },
             'affected_rows': affected_rows,
             'result_group': result_group,
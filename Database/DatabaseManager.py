@@ -1,12 +1,14 @@
 # Python deps & external libraries
+from typing import Iterator
 from pypika import Table, Field, Order, Criterion
 from pypika.dialects import MySQLQuery as Query
 
 # DB Helper classes
 from .Helpers import MetadataRetriever, QueryBuilder, CacheManager
+from .QueryStats import QueryStats
 
 # Imports for proper typing
-from . import Database
+from . import Database, DatabaseConnectionError
 from Logger import Logger
 
 # Status messages
@@ -30,6 +32,7 @@ class DatabaseManager:
         # Caches for common metadata
         self.__primary_key_cache = {}
         self.__table_columns_cache = {}
+        self.__column_types_cache = {}
         self.__table_names_cache = []
         
         # Database type
@@ -50,7 +53,7 @@ class DatabaseManager:
             str: The primary key field
         '''
         # Check if the primary key is in cache
-        if CacheManager.check_cache(table, self.__primary_key_cache):
+        if CacheManager.check_cache(table, self.__primary_key_cache, 'primary_key'):
             return self.__primary_key_cache[table]
         
         try:
@@ -74,8 +77,12 @@ class DatabaseManager:
         
         Returns:
             list: The list of table names
+            
+        Raises:
+            DatabaseConnectionError: If the connection couldn't be opened
         '''
         # Check if the table names are in cache
+        CacheManager.record_lookup('table_names', bool(self.__table_names_cache))
         if self.__table_names_cache:
             return self.__table_names_cache
         
@@ -84,7 +91,10 @@ class DatabaseManager:
             
             if db_tables:
                 self.__table_names_cache.extend(db_tables)
-                return db_tables
+            return db_tables
+        except DatabaseConnectionError:
+            # Not a database without tables, the caller answers the failed connection
+            raise
         except Exception as e:
             self.__logger.error(STATUS_MESSAGES['query_fail']('Error getting table names', str(e))['message'])
             return []
@@ -110,13 +120,14 @@ class DatabaseManager:
             cache_key = table
         
         # Check if the table columns are in cache  
-        if CacheManager.check_cache(cache_key, self.__table_columns_cache):
+        if CacheManager.check_cache(cache_key, self.__table_columns_cache, 'columns'):
             return self.__table_columns_cache[cache_key]
         
         try:
             columns = MetadataRetriever.get_column_names(self.__db, table, required_fields, unique_fields)
             
-            if columns:
+            # A table may well have no required or unique columns, but it always has columns
+            if columns or required_fields or unique_fields:
                 self.__table_columns_cache[cache_key] = columns
                 return columns
             else:
@@ -125,9 +136,86 @@ class DatabaseManager:
             self.__logger.error(STATUS_MESSAGES['query_fail'](f'Error getting columns for `{table}`', str(e))['message'])
             return []
         
+    def get_column_types(self, table: str) -> dict:
+        '''
+        Gets the declared column types for `table` from the active database.
+        
+        Args:
+            table (str): The table name
+        
+        Returns:
+            dict: The column types keyed by the column names
+        '''
+        # Check if the column types are in cache
+        if CacheManager.check_cache(table, self.__column_types_cache, 'column_types'):
+            return self.__column_types_cache[table]
+        
+        try:
+            column_types = MetadataRetriever.get_column_types(self.__db, table)
+            
+            if column_types:
+                self.__column_types_cache[table] = column_types
+                return column_types
+            else:
+                raise ValueError(f'No columns found for table {table}')
+        except Exception as e:
+            self.__logger.error(STATUS_MESSAGES['query_fail'](f'Error getting column types for `{table}`', str(e))['message'])
+            return {}
+
+    def render_query_templates(self, table_name: str, columns: list, primary_key: str = None) -> list:
+        '''
+        Builds the SQL of the common queries of `table_name` (list, one row, insert, update and delete) the way the actions do,
+        without running them, so the query building paths are warm before the first request.
+
+        Args:
+            table_name (str): The table name
+            columns (list): The columns of the table
+            primary_key (str, optional): The primary key, defaults to the first column
+
+        Returns:
+            list: The SQL strings
+        '''
+        if not columns:
+            return []
+
+        table = Table(table_name)
+        key = primary_key or columns[0]
+        where = {'where': f'{key}=1'}
+
+        queries = (
+            self._build_select_query(table_name, ['*'], {'order_by': key, 'sort': 'asc'}).limit(100).offset(0),
+            self._build_select_query(table_name, ['*'], where).limit(100).offset(0),
+            Query.into(table).columns(*[Field(column) for column in columns]).insert(*[None] * len(columns)),
+            QueryBuilder.apply_clause(Query.update(table).set(Field(columns[-1]), None), 'where', where['where'], where),
+            QueryBuilder.apply_clause(Query.from_(table).delete(), 'where', where['where'], where),
+        )
+        return [query.get_sql() for query in queries]
+
     # ------------------------------
     # Helper methods
     # ------------------------------
+    def _build_select_query(self, table_name: str, fields: list, query_args: dict) -> Query:
+        '''
+        Builds a SELECT query for `table_name` with the clauses in `query_args`.
+        
+        Args:
+            table_name (str): The name of the table to query
+            fields (list): A list of fields to select
+            query_args (dict): The query arguments
+        
+        Returns:
+            Query: The constructed query
+        '''
+        table = Table(table_name)
+        query = Query.from_(table).select(*fields) # SELECT * FROM table
+        
+        # Add the query clauses
+        if query_args is not None:
+            for key, value in query_args.items():
+                query = QueryBuilder.apply_clause(query, key, value, query_args)
+        
+        return query
+    
     def _create_status_result(self, status_type: str, *args, **kwargs) -> dict:
         '''
         Create a status message for the query.
@@ -148,7 +236,7 @@ class DatabaseManager:
             self.__logger.warning(status_message['message'])
             success = False
         else:
-            self.__logger.info(status_message['message'])
+            self.__logger.info(status_message['message'], extra = Logger.SAMPLED)
             success = True
             
         return {
@@ -157,10 +245,16 @@ class DatabaseManager:
             **kwargs
         }
        
+    def _timeout_result(self, sql: str) -> dict:
+        '''
+        The result of the query `sql` cancelled by its statement timeout, already logged by the database.
+        '''
+        return {'success': False, 'status': STATUS_MESSAGES['query_timeout'](sql)}
+       
     # ------------------------------
     # Database actions (public)
     # ------------------------------
-    def select(self, table_name: str, fields: list = ['*'], query_args: dict = None, with_fetch: bool = True) -> dict:
+    def select(self, table_name: str, fields: list = ['*'], query_args: dict = None, with_fetch: bool = True, layout: str = 'rows', charge: bool = True) -> dict:
         '''
         Database action: SELECT
         
@@ -173,6 +267,8 @@ class DatabaseManager:
             sort (optional): Sort order (ASC or DESC)
             limit (optional): Limit on the number of results
             offset (optional): Offset for pagination
+            layout (str): The response layout of the data. The rows are shaped into it only when serialized.
+            charge (bool): If the rows count towards the request's rows (and its rows quota). False for the internal reads of the routes.
         
         Returns:
             dict: The result of the SELECT query
@@ -186,13 +282,7 @@ class DatabaseManager:
         DEFAULT_OFFSET = 0
         DEFAULT_LIMIT = 100
         
-        table = Table(table_name)
-        query = Query.from_(table).select(*fields) # SELECT * FROM table
-        
-        # Add the query clauses
-        if query_args is not None:
-            for key, value in query_args.items():
-                query = QueryBuilder.apply_clause(query, key, value, query_args)
+        query = self._build_select_query(table_name, fields, query_args)
         
         # Apply the defaults
         limit = query_args.get('limit', DEFAULT_LIMIT)
@@ -205,18 +295,42 @@ class DatabaseManager:
             result = self.__db.query(
                 query = sql, 
                 table_name = table_name,
-                cursor_settings = {'dictionary': True},
                 query_arguments = query_args,
-                with_body = with_fetch
+                with_body = with_fetch,
+                layout = layout
             )
+            if self.__db.timed_out(result):
+                return self._timeout_result(sql)
+            if charge:
+                QueryStats.record(rows = result.get('affected_rows', 0))
             
-            if with_fetch and not result.get('result_group') and len(result.get('data')) == 0:
+            if with_fetch and not result.get('result_group') and result['meta']['total_records'] == 0:
                 return self._create_status_result('query_not_found', sql)
             
             return result
         except Exception as e:
             return self._create_status_result('query_fail', str(e), sql)
     
+    def select_batches(self, table_name: str, fields: list = ['*'], query_args: dict = None, batch_size: int = 10000) -> Iterator[tuple[list, list]]:
+        '''
+        Database action: SELECT, streamed in batches of tuple rows. Unlike `select`, no default limit is applied.
+        
+        Args:
+            table_name (str): The name of the table to query
+            fields (list): A list of fields to select
+            query_args (dict): The query arguments (where, order_by, sort)
+            batch_size (int): The maximum number of rows per batch
+        
+        Yields:
+            tuple: The column names and a list of at most `batch_size` rows
+        '''
+        sql = self._build_select_query(table_name, fields, query_args).get_sql()
+        self.__logger.info(STATUS_MESSAGES['query_success'](sql)['message'], extra = Logger.SAMPLED)
+        
+        for columns, rows in self.__db.stream(sql, batch_size):
+            QueryStats.record(rows = len(rows))
+            yield columns, rows
+    
     def insert(self, table_name: str, data: dict, query_args: dict) -> dict:
         '''
         Database action: INSERT
@@ -240,13 +354,15 @@ class DatabaseManager:
         sql = query.get_sql()
         
         try:
-            result = self.__db.query(
+            result = self.__db.write(
                 query = sql, 
                 table_name = table_name,
-                cursor_settings = {'dictionary': True},
                 query_arguments = query_args
             )
+            if self.__db.timed_out(result):
+                return self._timeout_result(sql)
             affected_rows = result.get('affected_rows', 0)
+            QueryStats.record(rows = affected_rows)
             
             if affected_rows > 0:
                 return self._create_status_result('insert_success', table_name)
@@ -255,6 +371,24 @@ class DatabaseManager:
         except Exception as e:
             return self._create_status_result('insert_fail', data, table_name, str(e))
         
+    def build_insert_many(self, table_name: str, columns: tuple, rows: list) -> str:
+        '''
+        Builds one INSERT statement of many rows, e.g. for the batches of the ingestion queue.
+        
+        Args:
+            table_name (str): The name of the table
+            columns (tuple): The columns, the same for every row
+            rows (list): The value tuples, in the order of `columns`
+        
+        Returns:
+            str: The SQL string
+        '''
+        query = Query.into(Table(table_name)).columns(*[Field(column) for column in columns]) # INSERT INTO table (columns)
+        for values in rows:
+            query = query.insert(*values)
+        
+        return query.get_sql()
+        
     def update(self, table_name: str, data: dict, query_args: dict) -> dict:
         '''
         Database action: UPDATE
@@ -285,13 +419,15 @@ class DatabaseManager:
         sql = query.get_sql()
 
         try:
-            result = self.__db.query(
+            result = self.__db.write(
                 query = sql, 
                 table_name = table_name,
-                cursor_settings = {'dictionary': True},
                 query_arguments = query_args
             )
+            if self.__db.timed_out(result):
+                return self._timeout_result(sql)
             affected_rows = result.get('affected_rows', 0)
+            QueryStats.record(rows = affected_rows)
             
             if affected_rows > 0:
                 return self._create_status_result('update_success', query_args.get('where'), table_name)
@@ -323,13 +459,15 @@ class DatabaseManager:
         sql = query.get_sql()
     
         try:
-            result = self.__db.query(
+            result = self.__db.write(
                 query = sql, 
                 table_name = table_name,
-                cursor_settings = {'dictionary': True},
                 query_arguments = query_args
             )
+            if self.__db.timed_out(result):
+                return self._timeout_result(sql)
             affected_rows = result.get('affected_rows', 0)
+            QueryStats.record(rows = affected_rows)
             
             if affected_rows > 0:
                 return self._create_status_result('delete_success', query_args['where'], table_name)
@@ -0,0 +1,202 @@
+# Python deps & external libraries
+import time
+import logging
+import threading
+import contextvars
+from typing import TYPE_CHECKING
+
+# Imports for proper typing (Database imports this module)
+if TYPE_CHECKING:
+    from .Database import Database
+
+# Constants
+from constants import METRICS
+
+GROUP_SIZE      = METRICS.histogram('db_group_commit_writes', 'Writes committed per group commit', buckets = (1, 2, 4, 8, 16, 32, 64, 128))
+GROUP_SECONDS   = METRICS.histogram('db_group_commit_duration_seconds', 'Execution and commit time of a group of writes')
+
+class _Write:
+    '''
+    A write waiting for its group, with its outcome once the group is committed.
+    '''
+    __slots__ = ('query', 'table_name', 'context', 'done', 'promoted', 'rowcount', 'error')
+
+    def __init__(self, query: str, table_name: str):
+        self.query = query
+        self.table_name = table_name
+        # The request's context, so the write is counted in the stats of its own request
+        self.context = contextvars.copy_context()
+        self.done = threading.Event()
+        # Set (with `done`) when the write is handed the lead of the writes left over by a full group
+        self.promoted = False
+        self.rowcount = 0
+        self.error = None
+
+class GroupCommit:
+    '''
+    Commits the concurrent writes together: the writes arriving within `window` seconds of each other are executed in one
+    transaction and committed once, so the database flushes its log once per group instead of once per write.
+
+    The first write of a group leads it: while other writes are in flight, it waits for the window (or for `max_batch` writes),
+    then for the previous group to be committed, the writes arriving meanwhile join its group. A lone write doesn't wait.
+    A group takes at most `max_batch` writes: the first of the writes left over leads the next group.
+    The leader executes the writes in order, each in its own savepoint, and commits. A failed write is rolled back to its
+    savepoint, so it fails alone. When the failure rolls back the whole transaction instead (an interrupted SQLite statement), the
+    other writes run again in a new transaction. The callers wait for the commit of their group, so each gets its own result once it is
+    durable, as with a commit per write. If the commit itself fails, all the writes of the group fail.
+
+    Attributes:
+        database (Database): The database the writes run on
+        logger (logging.Logger): The logger
+        window (float): The seconds the first write of a group waits for the others
+        max_batch (int): The maximum number of writes per group
+    '''
+    def __init__(self, database: 'Database', logger: logging.Logger, window_ms: float, max_batch: int = 64):
+        self.database = database
+        self.logger = logger
+        self.window = float(window_ms) / 1000
+        self.max_batch = max(1, int(max_batch))
+
+        self.__lock = threading.Lock()
+        self.__full = threading.Event()
+        self.__pending = []
+        self.__leading = False
+        self.__in_flight = 0
+        # Held by the group being executed, so the next group only collects meanwhile
+        self.__execute_lock = threading.Lock()
+
+    def submit(self, query: str, table_name: str = None) -> int:
+        '''
+        Executes the write `query` in the next group, and waits for its commit.
+
+        Args:
+            query (str): The INSERT, UPDATE or DELETE statement
+            table_name (str, optional): The table name, for the metrics
+
+        Returns:
+            int: The number of affected rows
+
+        Raises:
+            Exception: The error of the write, or of the commit of its group
+        '''
+        write = _Write(query, table_name)
+
+        with self.__lock:
+            self.__pending.append(write)
+            self.__in_flight += 1
+            concurrent = self.__in_flight > 1
+            leader = not self.__leading
+            self.__leading = True
+            if len(self.__pending) >= self.max_batch:
+                self.__full.set()
+
+        if leader:
+            if concurrent:
+                self.__full.wait(self.window)
+            self._lead()
+        else:
+            write.done.wait()
+            if write.promoted:
+                # Leads the next group: it waited for the previous one, so it doesn't wait for the window
+                write.done.clear()
+                self._lead()
+
+        if write.error is not None:
+            raise write.error
+        return write.rowcount
+
+    def _lead(self):
+        '''
+        Takes the next group of at most `max_batch` pending writes once the previous group is committed, and commits it.
+        The first of the writes left over is promoted to lead the next group.
+        '''
+        with self.__execute_lock:
+            with self.__lock:
+                batch, self.__pending = self.__pending[:self.max_batch], self.__pending[self.max_batch:]
+                if self.__pending:
+                    successor = self.__pending[0]
+                    successor.promoted = True
+                    successor.done.set()
+                else:
+                    self.__leading = False
+                if len(self.__pending) < self.max_batch:
+                    self.__full.clear()
+            self._commit_group(batch)
+
+    def _commit_group(self, batch: list):
+        '''
+        Executes the writes of `batch` in one transaction, each in its own savepoint, and commits them.
+        Runs under the execute lock.
+        '''
+        started = time.perf_counter()
+        connection, cursor = None, None
+        try:
+            connection = self.database.connection
+            cursor = connection.cursor()
+            writes = batch
+            while writes:
+                writes = self._execute_group(connection, cursor, writes)
+
+            self.database._timed(connection.commit)
+        except Exception as e:
+            # Nothing of the group is durable
+            self.logger.error(f'Group commit of {len(batch)} writes failed: {e}')
+            try:
+                if connection is not None:
+                    connection.rollback()
+            except Exception:
+                pass
+            for write in batch:
+                if write.error is None:
+                    write.error = e
+                    write.rowcount = 0
+        finally:
+            if cursor is not None:
+                cursor.close()
+            GROUP_SIZE.observe(len(batch))
+            GROUP_SECONDS.observe(time.perf_counter() - started)
+            with self.__lock:
+                self.__in_flight -= len(batch)
+            for write in batch:
+                write.done.set()
+
+    def _execute_group(self, connection: any, cursor: any, writes: list) -> list:
+        '''
+        Executes `writes` in a new transaction, each in its own savepoint.
+
+        Returns:
+            list: The writes to execute again in a new transaction, when a failed write rolled back the whole transaction
+            (e.g. a SQLite statement interrupted by its timeout), empty once the transaction is ready to commit
+        '''
+        self.database._begin_group(cursor)
+        if len(writes) == 1:
+            # Alone in its transaction, no savepoint needed
+            if not self._run(cursor, writes[0]):
+                connection.rollback()
+            return []
+
+        for index, write in enumerate(writes):
+            savepoint = f'group_write_{index}'
+            cursor.execute(f'SAVEPOINT {savepoint}')
+            if not self._run(cursor, write):
+                if not self.database._in_transaction(connection):
+                    # The savepoints are gone with the transaction: only `write` fails, the others run again
+                    return [other for other in writes if other is not write and other.error is None]
+                cursor.execute(f'ROLLBACK TO SAVEPOINT {savepoint}')
+            cursor.execute(f'RELEASE SAVEPOINT {savepoint}')
+        return []
+
+    def _run(self, cursor: any, write: _Write) -> bool:
+        '''
+        Executes `write` in the context of its request.
+
+        Returns:
+            bool: If the write succeeded, its error is kept otherwise
+        '''
+        try:
+            write.context.run(self.database._execute, cursor, write.query, write.table_name)
+            write.rowcount = cursor.rowcount
+            return True
+        except Exception as e:
+            write.error = e
+            return False
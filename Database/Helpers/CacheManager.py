@@ -1,14 +1,33 @@
+# Constants
+from constants import METRICS
+
+CACHE_LOOKUPS = METRICS.counter('db_metadata_cache_lookups_total', 'Metadata cache lookups by cache and result', ('cache', 'result'))
+
 class CacheManager:
     '''
     Helper class for managing the Database cache values.
     '''
     @staticmethod
-    def check_cache(table: str, cache: dict) -> bool:
+    def check_cache(table: str, cache: dict, name: str = 'metadata') -> bool:
         '''
         Checks if the `table` is in the `cache`
         
         Args:
             table (str): The table name
             cache (dict): The cache dictionary
+            name (str): The cache name for the hit/miss metrics
         '''
-        return table in cache
\ No newline at end of file
+        hit = table in cache
+        CacheManager.record_lookup(name, hit)
+        return hit
+    
+    @staticmethod
+    def record_lookup(name: str, hit: bool):
+        '''
+        Counts a lookup of the cache `name` in the metrics.
+        
+        Args:
+            name (str): The cache name
+            hit (bool): If the value was found in the cache
+        '''
+        CACHE_LOOKUPS.inc(name, 'hit' if hit else 'miss')
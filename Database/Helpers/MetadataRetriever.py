@@ -21,15 +21,15 @@ class MetadataRetriever:
             query = f'PRAGMA table_info({table})'
             result = db.query(query, is_meta_query=True)
             for row in result['data']:
-                if row[5] == 1:  # Sixth column in the result set indicates if the column is a primary key
-                    primary_key_column = row[1]  # Second column in the result set contains the column names
+                if row['pk'] == 1:  # The `pk` column indicates if the column is a primary key
+                    primary_key_column = row['name']
         else:
             query = f'''
                 SELECT COLUMN_NAME
                 FROM INFORMATION_SCHEMA.COLUMNS
                 WHERE TABLE_NAME = "{table}" AND COLUMN_KEY = "PRI"
             '''
-            result = db.query(query, cursor_settings={'dictionary': True}, is_meta_query=True)
+            result = db.query(query, is_meta_query=True)
 
             if result:
                 primary_key_column = result['data'][0]['COLUMN_NAME']
@@ -46,10 +46,16 @@ class MetadataRetriever:
             
         Returns:
             list: A list of table names
+            
+        Raises:
+            DatabaseConnectionError: If the connection couldn't be opened
         '''
         tables = []
         db_name = db.config.get('database')
         
+        # Opened first, so a failed connection raises rather than reading as a database without tables
+        db.connection
+        
         if db.db_type == 'sqlite':
             query = '''
                 SELECT name
@@ -57,7 +63,7 @@ class MetadataRetriever:
                 WHERE type = 'table'
                 AND name NOT LIKE 'sqlite_%'
             '''
-            result = db.query(query, cursor_settings={'dictionary': True}, is_meta_query=True)
+            result = db.query(query, is_meta_query=True)
 
             if result:
                 tables = [row['name'] for row in result['data']]
@@ -68,7 +74,7 @@ class MetadataRetriever:
                 WHERE TABLE_TYPE = "BASE TABLE"
                 AND TABLE_SCHEMA = "{db_name}"
             '''
-            result = db.query(query, cursor_settings={'dictionary': True}, is_meta_query=True)
+            result = db.query(query, is_meta_query=True)
 
             if result:
                 tables = [row['TABLE_NAME'] for row in result['data']]
@@ -84,19 +90,31 @@ class MetadataRetriever:
             db (Database): The database instance
             table (str): The name of the table
             required_fields (bool): If True, only return the required fields
+            unique_fields (bool): If True, only return the (single column) unique fields
             
         Returns:
             list: A list of column names
         '''
         columns = []
         if db.db_type == 'sqlite':
-            # TODO - Add support for required & unique fields
+            if unique_fields:
+                return MetadataRetriever._get_sqlite_unique_columns(db, table)
         
             query = f'PRAGMA table_info({table})'
             result = db.query(query, is_meta_query=True)
 
             if result:
-                columns = [row[1] for row in result['data']]
+                rows = result['data']
+                
+                if required_fields:
+                    # NOT NULL columns without a default. An INTEGER PRIMARY KEY is an alias of the rowid, so it is generated if omitted.
+                    columns = [
+                        row['name'] for row in rows
+                        if (row['notnull'] == 1 or row['pk'] > 0) and row['dflt_value'] is None
+                        and not (row['pk'] == 1 and str(row['type']).upper() == 'INTEGER')
+                    ]
+                else:
+                    columns = [row['name'] for row in rows]
         else:
             query = f'''
                 SELECT COLUMN_NAME
@@ -110,8 +128,68 @@ class MetadataRetriever:
             if unique_fields:
                 query += ' AND COLUMN_KEY = "UNI"'
             
-            result = db.query(query, cursor_settings={'dictionary': True}, is_meta_query=True)
+            result = db.query(query, is_meta_query=True)
             
             if result:
                 columns = [row['COLUMN_NAME'] for row in result['data']]
-        return columns
\ No newline at end of file
+        return columns
+    
+    @staticmethod
+    def _get_sqlite_unique_columns(db: Database, table: str) -> list:
+        '''
+        Retrieves the columns of the single column UNIQUE constraints & indexes of a SQLite table.
+        
+        Args:
+            db (Database): The database instance
+            table (str): The name of the table
+            
+        Returns:
+            list: A list of column names
+        '''
+        columns = []
+        indexes = db.query(f'PRAGMA index_list({table})', is_meta_query=True)
+        
+        for index in indexes['data']:
+            # Skip the primary key and non-unique indexes
+            if index['unique'] != 1 or index['origin'] == 'pk':
+                continue
+            
+            index_columns = db.query(f'PRAGMA index_info("{index["name"]}")', is_meta_query=True)['data']
+            if len(index_columns) == 1:
+                columns.append(index_columns[0]['name'])
+        
+        return columns
+    
+    @staticmethod
+    def get_column_types(db: Database, table: str) -> dict:
+        '''
+        Retrieves the declared column types for the specified table from the database.
+        
+        Args:
+            db (Database): The database instance
+            table (str): The name of the table
+            
+        Returns:
+            dict: The lowercase column types keyed by the column names (e.g. `{'id': 'int(11)'}`)
+        '''
+        column_types = {}
+        if db.db_type == 'sqlite':
+            query = f'PRAGMA table_info({table})'
+            result = db.query(query, is_meta_query=True)
+
+            if result:
+                column_types = {row['name']: str(row['type']).lower() for row in result['data']}
+        else:
+            # COLUMN_TYPE includes the precision & scale, but only exists in MySQL
+            type_column = 'COLUMN_TYPE' if db.db_type == 'mysql' else 'DATA_TYPE'
+            query = f'''
+                SELECT COLUMN_NAME, {type_column} AS COLUMN_TYPE
+                FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_NAME = "{table}"
+                ORDER BY ORDINAL_POSITION
+            '''
+            result = db.query(query, is_meta_query=True)
+            
+            if result:
+                column_types = {row['COLUMN_NAME']: str(row['COLUMN_TYPE']).lower() for row in result['data']}
+        return column_types
\ No newline at end of file
@@ -16,7 +16,7 @@ class QueryBuilder:
             case 'limit':
                 return QueryBuilder._limit_clause(query, value)
             case 'offset':
-                return QueryBuilder._offset_clause(query, value, limit=query_args.get('limit', 0))
+                return QueryBuilder._offset_clause(query, value)
             # ... other clauses if needed
             case _:
                 # return the unmodified query if the clause is not recognized
@@ -0,0 +1,228 @@
+# Python deps & external libraries
+import os
+import time
+import uuid
+import queue
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+
+# Imports for proper typing
+from .Database import Database
+from .DatabaseManager import DatabaseManager
+
+# Constants
+from constants import METRICS
+
+INGEST_ROWS     = METRICS.counter('ingest_rows_total', 'Rows of the async ingestion by table and result', ('table', 'result'))
+INGEST_BATCHES  = METRICS.histogram('ingest_batch_rows', 'Rows per flushed ingestion batch', buckets = (1, 5, 10, 50, 100, 500, 1000, 5000))
+
+class IngestQueue:
+    '''
+    Write-behind queue of the tables in async ingestion mode: `POST` only validates the row and queues it, a background
+    flusher inserts the queued rows in batches (one multi-row INSERT and one commit per table and column set), when
+    `batch_size` rows are queued or `flush_interval` seconds after the first one.
+
+    Each row gets a ticket, whose status is `queued`, then `committed` (durable) or `failed` (with the error). When a batch
+    fails, its rows are retried one by one, so one bad row doesn't fail the others. The queued rows are in memory only:
+    they are flushed on a clean shutdown, and lost if the process crashes.
+
+    The tickets are kept in the memory of the process, so the async ingestion runs in one server process only (`index.py`
+    refuses it with several workers). A ticket starts with the id of the process that issued it (`issued_here`), so a lookup
+    from another process (e.g. after a restart) is told apart from an unknown or expired ticket.
+
+    Attributes:
+        database (Database): The database
+        db_manager (DatabaseManager): The database manager, building the statements
+        logger (logging.Logger): The logger
+        tables (frozenset): The tables in async ingestion mode
+        batch_size (int): The maximum rows per batch
+        flush_interval (float): The maximum seconds a row waits for its batch
+        retention (int): The number of tickets kept for the status lookups
+    '''
+    QUEUED = 'queued'
+    COMMITTED = 'committed'
+    FAILED = 'failed'
+
+    # The seconds the shutdown waits for the queued rows to be flushed
+    CLOSE_TIMEOUT = 10.0
+
+    def __init__(self, database: Database, db_manager: DatabaseManager, logger: logging.Logger, tables: frozenset, queue_size: int = 10000, batch_size: int = 500, flush_ms: float = 200, retention: int = 100000):
+        self.database = database
+        self.db_manager = db_manager
+        self.logger = logger
+        self.tables = frozenset(table for table in tables if table)
+        self.batch_size = int(batch_size)
+        self.flush_interval = float(flush_ms) / 1000
+        self.retention = int(retention)
+
+        self.__queue = queue.Queue(maxsize = int(queue_size))
+        self.__tickets = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__pid = None
+        self.__origin = None
+        self.__thread = None
+
+        METRICS.gauge('ingest_queue_depth', 'Rows waiting in the async ingestion queue', callback = self.__queue.qsize)
+        atexit.register(self.close)
+
+    def accepts(self, table: str) -> bool:
+        return table in self.tables
+
+    def submit(self, table: str, row: dict) -> str:
+        '''
+        Queues a validated row of `table`. Called on the request thread, does no I/O.
+
+        Args:
+            table (str): The table name
+            row (dict): The row
+
+        Returns:
+            str: The ticket of the row, or None when the queue is full
+        '''
+        self._ensure_worker()
+        ticket = f'{self.__origin}-{uuid.uuid4().hex}'
+
+        with self.__lock:
+            self.__tickets[ticket] = {'table': table, 'status': self.QUEUED, 'queued_at': time.time(), 'committed_at': None, 'error': None}
+            while len(self.__tickets) > self.retention:
+                self.__tickets.popitem(last = False)
+
+        try:
+            self.__queue.put_nowait((ticket, table, row))
+        except queue.Full:
+            with self.__lock:
+                self.__tickets.pop(ticket, None)
+            INGEST_ROWS.inc(table, 'rejected')
+            return None
+
+        return ticket
+
+    def status(self, ticket: str) -> dict:
+        '''
+        Gets the status of the row of `ticket`.
+
+        Returns:
+            dict: The table, the status (`queued`, `committed` or `failed`), if the row is durable, the queue and commit times
+            and the error, or None for unknown (or expired) tickets
+        '''
+        with self.__lock:
+            entry = self.__tickets.get(ticket)
+            if entry is None:
+                return None
+            return {'ticket': ticket, **entry, 'durable': entry['status'] == self.COMMITTED}
+
+    def issued_here(self, ticket: str) -> bool:
+        '''
+        Checks if `ticket` was issued by this process, so its status is known here unless it expired.
+
+        Args:
+            ticket (str): The ticket
+        '''
+        return self.__origin is not None and ticket.partition('-')[0] == self.__origin
+
+    def close(self):
+        '''
+        Flushes the queued rows and stops the flusher. Registered to run at exit.
+        '''
+        thread = self.__thread
+        if thread is None or self.__pid != os.getpid() or not thread.is_alive():
+            return
+
+        self.__queue.put(None)
+        thread.join(timeout = self.CLOSE_TIMEOUT)
+        if self.__queue.qsize():
+            self.logger.warning(f'{self.__queue.qsize()} queued ingestion rows were not flushed on shutdown.')
+
+    def _ensure_worker(self):
+        '''
+        Starts the flusher thread, also in a forked worker (threads don't survive a fork).
+        '''
+        pid = os.getpid()
+        if self.__pid == pid:
+            return
+
+        with self.__lock:
+            if self.__pid == pid:
+                return
+            self.__pid = pid
+            self.__origin = uuid.uuid4().hex[:8]
+            self.__thread = threading.Thread(target = self._work, name = 'ingest-flusher', daemon = True)
+            self.__thread.start()
+
+    def _work(self):
+        while True:
+            batch, stopping = self._collect()
+            if batch:
+                self._flush(batch)
+            if stopping:
+                return
+
+    def _collect(self) -> tuple[list, bool]:
+        '''
+        Waits for a row, then collects the rows queued until the batch is full or `flush_interval` has passed.
+
+        Returns:
+            tuple: The batch, and if the queue is closing
+        '''
+        item = self.__queue.get()
+        if item is None:
+            return [], True
+
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.__queue.get(timeout = remaining) if remaining > 0 else self.__queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+
+        return batch, False
+
+    def _flush(self, batch: list):
+        '''
+        Inserts `batch`, one statement per table and column set.
+        '''
+        INGEST_BATCHES.observe(len(batch))
+        groups = {}
+        for ticket, table, row in batch:
+            groups.setdefault((table, tuple(row)), []).append((ticket, tuple(row.values())))
+
+        for (table, columns), items in groups.items():
+            try:
+                self._insert(table, columns, items)
+            except Exception as e:
+                if len(items) == 1:
+                    self._resolve(table, items, self.FAILED, str(e))
+                    continue
+
+                # Retry the rows one by one, to fail only the bad ones
+                self.logger.warning(f'Ingestion batch of {len(items)} rows into `{table}` failed ({e}), retrying row by row.')
+                for item in items:
+                    try:
+                        self._insert(table, columns, [item])
+                    except Exception as e:
+                        self._resolve(table, [item], self.FAILED, str(e))
+
+    def _insert(self, table: str, columns: tuple, items: list):
+        self.database.execute_write(self.db_manager.build_insert_many(table, columns, [values for _, values in items]), table)
+        self._resolve(table, items, self.COMMITTED)
+
+    def _resolve(self, table: str, items: list, status: str, error: str = None):
+        now = time.time()
+        with self.__lock:
+            for ticket, _ in items:
+                entry = self.__tickets.get(ticket)
+                if entry is not None:
+                    entry['status'] = status
+                    entry['committed_at'] = now if status == self.COMMITTED else None
+                    entry['error'] = error
+
+        INGEST_ROWS.inc(table, status, amount = len(items))
+        if error:
+            self.logger.error(f'Ingestion of {len(items)} row(s) into `{table}` failed: {error}')
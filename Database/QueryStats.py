@@ -0,0 +1,81 @@
+# Python deps & external libraries
+from contextvars import ContextVar
+from typing import Iterator, Iterable
+
+class QueryStats:
+    '''
+    Per-request database usage counters. The active instance lives in a context variable,
+    so the database layer can report to it without knowing about the request.
+
+    Attributes:
+        queries (int): The number of queries run (database round trips)
+        rows (int): The number of rows returned or written
+        db_time (float): The seconds spent executing queries and fetching rows
+        serialize_time (float): The seconds spent encoding the response body
+        route (str): The route rule of the request, or None
+    '''
+    __slots__ = ('queries', 'rows', 'db_time', 'serialize_time', 'route')
+
+    _current: ContextVar = ContextVar('query_stats', default = None)
+
+    def __init__(self, route: str = None):
+        self.route = route
+        self.queries = 0
+        self.rows = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+
+    @classmethod
+    def start(cls, route: str = None) -> 'QueryStats':
+        '''
+        Creates a new instance and makes it the active one in the current context.
+
+        Args:
+            route (str, optional): The route rule of the request
+        '''
+        stats = cls(route)
+        cls._current.set(stats)
+        return stats
+
+    @classmethod
+    def current(cls) -> 'QueryStats':
+        '''
+        Gets the active instance, or None outside of a request.
+        '''
+        return cls._current.get()
+
+    @classmethod
+    def record(cls, rows: int = 0, queries: int = 0, db_time: float = 0.0, serialize_time: float = 0.0):
+        '''
+        Adds to the active instance. Does nothing when there is none.
+
+        Args:
+            rows (int): The rows returned or written
+            queries (int): The queries run
+            db_time (float): The seconds spent in the database
+            serialize_time (float): The seconds spent encoding the response
+        '''
+        stats = cls._current.get()
+        if stats is not None:
+            stats.queries += queries
+            stats.rows += rows
+            stats.db_time += db_time
+            stats.serialize_time += serialize_time
+
+    def bind(self, iterable: Iterable) -> Iterator:
+        '''
+        Iterates `iterable` with this instance active. Used for streamed responses,
+        which are consumed outside the context the request ran in.
+
+        Args:
+            iterable (Iterable): The iterable to consume
+        '''
+        token = self._current.set(self)
+        try:
+            yield from iterable
+        finally:
+            try:
+                self._current.reset(token)
+            except ValueError:
+                # Closed from another context (e.g. garbage collected), nothing to restore
+                pass
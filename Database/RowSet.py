@@ -0,0 +1,58 @@
+class RowSet:
+    '''
+    Query result rows as fetched from the cursor: a single column-name header and plain tuple rows.
+    The rows are only converted to the output shape when they are accessed or serialized, so no dictionary is allocated per row up front.
+
+    Attributes:
+        columns (tuple): The column names of the rows
+        rows (list): The fetched tuple rows
+        layout (str): The output layout of the rows (see `API_RESPONSE_LAYOUTS`)
+    '''
+    __slots__ = ('columns', 'rows', 'layout')
+
+    def __init__(self, columns: tuple, rows: list, layout: str = 'rows'):
+        self.columns = columns
+        self.rows = rows
+        self.layout = layout
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self):
+        '''
+        Iterates the rows as dictionaries, creating them one at a time.
+        '''
+        columns = self.columns
+        for row in self.rows:
+            yield dict(zip(columns, row))
+
+    def __getitem__(self, index: int | slice) -> dict | list:
+        '''
+        Gets the row(s) at `index` as dictionaries.
+        '''
+        if isinstance(index, slice):
+            return [dict(zip(self.columns, row)) for row in self.rows[index]]
+        return dict(zip(self.columns, self.rows[index]))
+
+    def __repr__(self) -> str:
+        return f'RowSet(columns={self.columns}, rows={len(self.rows)}, layout={self.layout!r})'
+
+    def serialize(self) -> list | dict:
+        '''
+        Shapes the rows into the output `layout` for the response codecs.
+
+        Returns:
+            list | dict: The shaped rows
+        '''
+        match self.layout:
+            case 'columnar':
+                return {
+                    'columns': self.columns,
+                    'rows': self.rows
+                }
+            case 'columns':
+                values = zip(*self.rows) if self.rows else ([] for _ in self.columns)
+                return {column: list(column_values) for column, column_values in zip(self.columns, values)}
+            case _:
+                # The JSON and MessagePack codecs encode this layout from the tuples, without calling `serialize`
+                return list(self)
@@ -0,0 +1,170 @@
+# Python deps & external libraries
+import os
+import re
+import time
+import queue
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+# The per-request stats carry the calling route
+from .QueryStats import QueryStats
+
+# Imports for proper typing (Database imports this module)
+if TYPE_CHECKING:
+    from .Database import Database
+
+class SlowQueryLog:
+    '''
+    Records the queries slower than a threshold to a dedicated (JSON lines) log.
+
+    The record holds the SQL template (the literals replaced with `?`), the redacted parameters, the duration, the rows and the
+    calling route. The `EXPLAIN` of the query is captured by a background thread on its own database connection, so the request
+    never waits for it. The records are rate limited per minute, and dropped when the capture queue is full.
+
+    Attributes:
+        database (Database): The database the queries run on
+        logger (logging.Logger): The slow query logger
+        threshold (float): The threshold in seconds
+        per_minute (int): The maximum number of records per minute
+        explain (bool): If the `EXPLAIN` is captured
+    '''
+    # Quoted strings and standalone numbers, as rendered by PyPika
+    LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+    STRING_PATTERN = re.compile(r"'(?:[^']|'')*'")
+    # Statements that can be explained without being executed
+    EXPLAINABLE = ('select', 'update', 'delete')
+
+    def __init__(self, database: 'Database', logger: logging.Logger, threshold_ms: float, per_minute: int = 10, explain: bool = True):
+        self.database = database
+        self.logger = logger
+        self.threshold = float(threshold_ms) / 1000
+        self.per_minute = int(per_minute)
+        self.explain = explain
+
+        self.__queue = queue.Queue(maxsize = 100)
+        self.__lock = threading.Lock()
+        self.__window_start = 0.0
+        self.__window_count = 0
+        self.__pid = None
+        self.__connection = None
+
+    @classmethod
+    def template(cls, query: str) -> tuple[str, list]:
+        '''
+        Splits `query` into a template and its redacted parameters.
+
+        Args:
+            query (str): The SQL query
+
+        Returns:
+            tuple: The template, and the parameters as their types and lengths only
+        '''
+        params = []
+
+        def redact(match: re.Match) -> str:
+            literal = match.group(0)
+            params.append(f'<str:{len(literal) - 2}>' if literal.startswith("'") else '<number>')
+            return '?'
+
+        return ' '.join(cls.LITERAL_PATTERN.sub(redact, query).split()), params
+
+    def _allow(self) -> bool:
+        '''
+        Checks the per minute rate limit of the records.
+        '''
+        now = time.monotonic()
+        with self.__lock:
+            if now - self.__window_start >= 60:
+                self.__window_start = now
+                self.__window_count = 0
+            if self.__window_count >= self.per_minute:
+                return False
+            self.__window_count += 1
+            return True
+
+    def record(self, query: str, duration: float, rows: int = None, table_name: str = None):
+        '''
+        Queues a slow query record. Called on the request thread, does no I/O.
+
+        Args:
+            query (str): The SQL query
+            duration (float): The execution time in seconds
+            rows (int, optional): The rows returned or affected, if known
+            table_name (str, optional): The queried table
+        '''
+        if not self._allow():
+            return
+
+        self._ensure_worker()
+
+        stats = QueryStats.current()
+        try:
+            self.__queue.put_nowait({
+                'query': query,
+                'duration_ms': round(duration * 1000, 3),
+                'rows': rows,
+                'table': table_name,
+                'route': stats.route if stats is not None else None,
+            })
+        except queue.Full:
+            pass
+
+    def _ensure_worker(self):
+        '''
+        Starts the capture thread, also in a forked worker (threads don't survive a fork).
+        '''
+        pid = os.getpid()
+        if self.__pid == pid:
+            return
+
+        with self.__lock:
+            if self.__pid == pid:
+                return
+            self.__pid = pid
+            self.__connection = None
+            threading.Thread(target = self._work, name = 'slow-query-log', daemon = True).start()
+
+    def _work(self):
+        while True:
+            entry = self.__queue.get()
+            query = entry.pop('query')
+            statement = query.split(None, 1)[0].lower()
+
+            entry['statement'] = statement
+            entry['sql'], entry['params'] = self.template(query)
+            if self.explain and statement in self.EXPLAINABLE:
+                entry['explain'] = self._explain(query)
+
+            self.logger.warning(entry)
+
+    def _explain(self, query: str) -> list:
+        '''
+        Runs the `EXPLAIN` of `query` on the capture connection.
+
+        Args:
+            query (str): The SQL query
+
+        Returns:
+            list: The plan rows, or an error string
+        '''
+        try:
+            if self.__connection is None:
+                self.__connection = self.database._create_connection()
+
+            cursor = self.__connection.cursor()
+            try:
+                cursor.execute(self.database._explain_query(query))
+                columns = [column[0] for column in cursor.description or []]
+                # The plans may quote the literals of the query (e.g. PostgreSQL filters)
+                return [
+                    {column: self.STRING_PATTERN.sub('?', value) if isinstance(value, str) else value for column, value in zip(columns, row)}
+                    for row in cursor.fetchall()
+                ]
+            finally:
+                cursor.close()
+                # EXPLAIN may open a transaction (PostgreSQL), never keep it
+                self.__connection.rollback()
+        except Exception as e:
+            self.__connection = None
+            return f'EXPLAIN failed: {e}'
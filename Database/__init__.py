@@ -1,3 +1,7 @@
-from .Database import Database
+from .RowSet import RowSet
+from .QueryStats import QueryStats
+from .GroupCommit import GroupCommit
+from .Database import Database, DatabaseConnectionError
 from .DatabaseFactory import DatabaseFactory
-from .DatabaseManager import DatabaseManager
\ No newline at end of file
+from .DatabaseManager import DatabaseManager
+from .IngestQueue import IngestQueue
\ No newline at end of file
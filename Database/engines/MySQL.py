@@ -5,13 +5,16 @@ import mysql.connector
 from typing import override
 from Logger import Logger
 
-from .. import Database
+from .. import Database, DatabaseConnectionError, RowSet
 from status import DATABASE_STATUS_MESSAGES
 
 class MySQLDatabase(Database):
     '''
     Database type: MySQL (MariaDB)
     '''
+    # ER_QUERY_TIMEOUT (MySQL) and ER_STATEMENT_TIMEOUT (MariaDB)
+    TIMEOUT_ERRORS = (3024, 1969)
+    
     def __init__(self, config: dict, logger: Logger):
         '''
         Initialize the MySQL database object.
@@ -21,6 +24,7 @@ class MySQLDatabase(Database):
             logger (Logger): The logger instance
         '''
         super().__init__(config, logger, 'mysql')
+        self._mariadb = False
     
     @override
     def _create_connection(self) -> mysql.connector.connection.MySQLConnection:
@@ -42,49 +46,70 @@ class MySQLDatabase(Database):
             )
             self.logger.info(DATABASE_STATUS_MESSAGES['connection_success'](connection.database, self.config, 'MySQL')['message'])
             
+            # MariaDB has its own statement timeout
+            self._mariadb = 'mariadb' in connection.get_server_info().lower()
+            
             return connection
         except mysql.connector.Error as e:
             raise RuntimeError(DATABASE_STATUS_MESSAGES['connection_fail'](self.config.get('database'), self.config, e)['message'])
         
     @override
-    def query(self, query: str, table_name: str = None, cursor_settings: dict = None, query_arguments: dict = None, is_meta_query: bool = False, with_body: bool = True) -> dict:
+    def _limit_statement(self, cursor: mysql.connector.cursor.MySQLCursor, query: str, timeout_ms: float) -> str:
+        '''
+        Adds the statement timeout to `query`: MariaDB's `max_statement_time` bounds all the statements, MySQL's
+        `MAX_EXECUTION_TIME` optimizer hint only bounds the read-only SELECTs (the writes are bounded by the lock wait timeouts).
+        '''
+        if not timeout_ms:
+            return query
+        if self._mariadb:
+            return f'SET STATEMENT max_statement_time = {timeout_ms / 1000} FOR {query}'
+        
+        statement, _, rest = query.lstrip().partition(' ')
+        if statement.lower() != 'select':
+            return query
+        return f'{statement} /*+ MAX_EXECUTION_TIME({int(timeout_ms)}) */ {rest}'
+    
+    @override
+    def _is_timeout(self, error: Exception) -> bool:
+        return getattr(error, 'errno', None) in self.TIMEOUT_ERRORS
+    
+    @override
+    def query(self, query: str, table_name: str = None, query_arguments: dict = None, is_meta_query: bool = False, with_body: bool = True, layout: str = 'rows') -> dict:
         '''
         Execute `query` on the MySQL database.
         
         Args:
             query (str): The query string
-            cursor_settings (dict): The cursor settings
             query_arguments (dict): The query arguments
             is_meta_query (bool): If the query is a meta query or not
             with_body (bool): If the query result should include the body or not
+            layout (str): The response layout of the data
             
         Returns:
             dict: The query result dictionary
         '''
-        if self.connection is None:
-            return DATABASE_STATUS_MESSAGES['connection_fail'](self.config, 'No connection established.')
-        
-        result = []
+        result = RowSet(tuple(), [], layout)
+        cursor = None
         status = {
             'success': True,
             'type': 'info'
         }
         
         try:
-            cursor = self.connection.cursor(**cursor_settings)
-            cursor.execute(query)
-
-            result = None
+            cursor = self.connection.cursor(buffered = True)
+            self._execute(cursor, query, table_name)
             
-            if with_body:
-                result = cursor.fetchall()
+            # Fetch plain tuple rows, shaped only when serialized
+            result = self._fetch_rows(cursor, with_body, layout)
             
             # Commit changes if necessary
             self._commit_changes(query)
+        except DatabaseConnectionError as e:
+            # The connection couldn't be opened, the next query tries again
+            status = self._query_error(e, query)
         except mysql.connector.Error as e:
             self.connection.rollback()
-            status = DATABASE_STATUS_MESSAGES['query_fail'](e, query)
-            self.logger.error(status['message'])
+            status = self._query_error(e, query)
         finally:
             return self._build_get_query_result(
                 query = {
@@ -95,8 +120,9 @@ class MySQLDatabase(Database):
                 query_arguments = query_arguments,
                 is_meta_query = is_meta_query,
                 status = status,
-                affected_rows = cursor.rowcount if cursor.rowcount != -1 else 0,
-                result_group = cursor.with_rows is not False,
+                affected_rows = cursor.rowcount if cursor and cursor.rowcount != -1 else 0,
+                result_group = bool(result.columns),
                 data = result,
-                with_body = with_body
+                with_body = with_body,
+                layout = layout
             )
\ No newline at end of file
@@ -1,12 +1,13 @@
 # Python deps & external libraries
 import psycopg2
-from psycopg2.extras import RealDictCursor
+import psycopg2.errors
+import uuid
 
 # Imports for proper typing
 from typing import override
 from Logger import Logger
 
-from .. import Database
+from .. import Database, DatabaseConnectionError, RowSet
 from status import DATABASE_STATUS_MESSAGES
 
 class PostgreSQLDatabase(Database):
@@ -44,52 +45,50 @@ class PostgreSQLDatabase(Database):
             if 'charset' in self.config:
                 connection.set_client_encoding(self.config.get('charset'))
             
-            self.logger.info(DATABASE_STATUS_MESSAGES['connection_success'](self.config, 'PostgreSQL')['message'])
+            self.logger.info(DATABASE_STATUS_MESSAGES['connection_success'](self.config.get('database'), self.config, 'PostgreSQL')['message'])
         
             return connection
         except psycopg2.Error as e:
             raise RuntimeError(DATABASE_STATUS_MESSAGES['connection_fail'](self.config.get('database'), self.config, e)['message'])
         
     @override
-    def query(self, query: str, table_name: str = None, cursor_settings: dict = None, query_arguments: dict = None, is_meta_query: bool = False, with_body: bool = True) -> dict:
+    def query(self, query: str, table_name: str = None, query_arguments: dict = None, is_meta_query: bool = False, with_body: bool = True, layout: str = 'rows') -> dict:
         '''
         Execute `query` on the MySQL database.
         
         Args:
             query (str): The query string
-            cursor_settings (dict): The cursor settings
             query_arguments (dict): The query arguments
             is_meta_query (bool): If the query is a meta query or not
             with_body (bool): If the query result should include the body or not
+            layout (str): The response layout of the data
             
         Returns:
             dict: The query result dictionary
         '''
-        if self.connection is None:
-            return DATABASE_STATUS_MESSAGES['connection_fail'](self.config, 'No connection established.')
-        
-        result = []
+        result = RowSet(tuple(), [], layout)
+        cursor = None
         status = {
             'success': True,
             'type': 'info'
         }
         
         try:
-            cursor_factory = RealDictCursor if cursor_settings.get('dictionary', False) else None
-            cursor = self.connection.cursor(cursor_factory = cursor_factory)
-            cursor.execute(query)
-            
-            result = None
+            cursor = self.connection.cursor()
+            self._execute(cursor, query, table_name)
             
-            if with_body:
-                result = cursor.fetchall()
+            # Fetch plain tuple rows, shaped only when serialized
+            result = self._fetch_rows(cursor, with_body, layout)
             
             # Commit changes if necessary
             self._commit_changes(query)
+        except DatabaseConnectionError as e:
+            # The connection couldn't be opened, the next query tries again
+            status = self._query_error(e, query)
         except psycopg2.OperationalError as e:
+            # Also ends the statement timeout set for the transaction
             self.connection.rollback()
-            status = DATABASE_STATUS_MESSAGES['query_fail'](e, query)
-            self.logger.error(status['message'])
+            status = self._query_error(e, query)
         finally:
             return self._build_get_query_result(
                 query = {
@@ -100,8 +99,49 @@ class PostgreSQLDatabase(Database):
                 query_arguments = query_arguments,
                 is_meta_query = is_meta_query,
                 status = status,
-                affected_rows = cursor.rowcount if cursor.rowcount != -1 else 0,
-                result_group = cursor.description is not None,
+                affected_rows = cursor.rowcount if cursor and cursor.rowcount != -1 else 0,
+                result_group = bool(result.columns),
                 data = result,
-                with_body = with_body
-            )
\ No newline at end of file
+                with_body = with_body,
+                layout = layout
+            )
+    
+    @override
+    def _limit_statement(self, cursor: psycopg2.extensions.cursor, query: str, timeout_ms: float) -> str:
+        '''
+        Sets `statement_timeout` for the statement, sent in the same round trip. `SET LOCAL` ends with the transaction, and is
+        set again before each statement, so a timeout never applies to the next statements.
+        '''
+        setting = f'SET LOCAL statement_timeout = {int(timeout_ms)}'
+        if cursor.name is not None:
+            # A server-side cursor declares one query only
+            with self.connection.cursor() as setting_cursor:
+                setting_cursor.execute(setting)
+            return query
+        return f'{setting}; {query}'
+    
+    @override
+    def _is_timeout(self, error: Exception) -> bool:
+        return isinstance(error, psycopg2.errors.QueryCanceled)
+    
+    @override
+    def stream(self, query: str, batch_size: int = 10000):
+        '''
+        Streams the result set of `query` using a server-side cursor, so the whole result set is never held by the client.
+        
+        Args:
+            query (str): The query string
+            batch_size (int): The maximum number of rows per batch
+        '''
+        try:
+            yield from super().stream(query, batch_size)
+        finally:
+            # Server-side cursors live in a transaction, end it once the stream is consumed
+            self.connection.commit()
+    
+    @override
+    def _create_stream_cursor(self) -> psycopg2.extensions.cursor:
+        '''
+        Creates a named (server-side) cursor for streaming.
+        '''
+        return self.connection.cursor(name = f'stream_{uuid.uuid4().hex}')
\ No newline at end of file
@@ -1,17 +1,22 @@
 # Python deps & external libraries
+import time
 import sqlite3
+import threading
 
 # Imports for proper typing
 from typing import override
 from Logger import Logger
 
-from .. import Database
+from .. import Database, DatabaseConnectionError, RowSet
 from status import DATABASE_STATUS_MESSAGES
 
 class SQLiteDatabase(Database):
     '''
     Database type: MySQL (MariaDB)
     '''
+    # The VM instructions between the checks of the statement deadline
+    PROGRESS_INSTRUCTIONS = 1000
+    
     def __init__(self, config: dict, logger: Logger):
         '''
         Initialize the MySQL database object.
@@ -21,6 +26,8 @@ class SQLiteDatabase(Database):
             logger (Logger): The logger instance
         '''
         super().__init__(config, logger, 'sqlite')
+        # The deadline of the statement running on each thread (the progress handler runs on the executing thread)
+        self.__deadline = threading.local()
     
     @override
     def _create_connection(self) -> sqlite3.Connection:
@@ -38,56 +45,89 @@ class SQLiteDatabase(Database):
                 database            = self.config['database'],
                 check_same_thread   = False
             )
-            self.logger(DATABASE_STATUS_MESSAGES['connection_success'](self.config, 'SQLite')['message'], 'info')
+            
+            # Interrupt the statements past their deadline (no handler, no overhead, without timeouts)
+            if self.timeouts_enabled:
+                connection.set_progress_handler(self._check_deadline, self.PROGRESS_INSTRUCTIONS)
+            self.logger.info(DATABASE_STATUS_MESSAGES['connection_success'](self.config['database'], self.config, 'SQLite')['message'])
             
             return connection
         except sqlite3.Error as e:
             raise RuntimeError(DATABASE_STATUS_MESSAGES['connection_fail'](self.config.get('database'), self.config, e)['message'])
         
     @override
-    def query(self, query: str, table_name: str = None, cursor_settings: dict = None, query_arguments: dict = None, is_meta_query: bool = False, with_body: bool = True) -> dict:
+    def _explain_query(self, query: str) -> str:
+        return f'EXPLAIN QUERY PLAN {query}'
+    
+    @override
+    def _limit_statement(self, cursor: sqlite3.Cursor, query: str, timeout_ms: float) -> str:
+        # Also covers the fetch, SQLite produces the rows while they are fetched
+        self.__deadline.at = time.monotonic() + timeout_ms / 1000 if timeout_ms else None
+        return query
+    
+    @override
+    def _is_timeout(self, error: Exception) -> bool:
+        return isinstance(error, sqlite3.OperationalError) and str(error) == 'interrupted'
+    
+    def _check_deadline(self) -> int:
+        '''
+        The progress handler: interrupts the running statement once past its deadline.
+        '''
+        deadline = getattr(self.__deadline, 'at', None)
+        return 1 if deadline is not None and time.monotonic() > deadline else 0
+    
+    @override
+    def _begin_group(self, cursor: sqlite3.Cursor):
+        # The deadline of an interrupted write must not interrupt the next transaction
+        self.__deadline.at = None
+        # A savepoint outside of a transaction would commit on its release
+        if not self.connection.in_transaction:
+            cursor.execute('BEGIN')
+    
+    @override
+    def _in_transaction(self, connection: sqlite3.Connection) -> bool:
+        # An interrupted write rolls back the whole transaction, with its savepoints
+        return connection.in_transaction
+    
+    @override
+    def query(self, query: str, table_name: str = None, query_arguments: dict = None, is_meta_query: bool = False, with_body: bool = True, layout: str = 'rows') -> dict:
         '''
         Execute `query` on the SQLite database.
         
         Args:
             query (str): The query string
-            cursor_settings (dict): The cursor settings
             query_arguments (dict): The query arguments
             is_meta_query (bool): If the query is a meta query or not
             with_body (bool): If the query result should include the body or not
+            layout (str): The response layout of the data
             
         Returns:
             dict: The query result dictionary
         '''
-        if self.connection is None:
-            return DATABASE_STATUS_MESSAGES['connection_fail'](self.config, 'No connection established.')
-        
-        result = []
+        result = RowSet(tuple(), [], layout)
+        cursor = None
         status = {
             'success': True,
             'type': 'info'
         }
         
         try:
-            # Apply cursor settings if provided
-            if cursor_settings:
-                if cursor_settings.get('row_factory') == 'dict':
-                    self.connection.row_factory = sqlite3.Row
-                
             cursor = self.connection.cursor()
-            cursor.execute(query)
-            
-            result = None
+            self._execute(cursor, query, table_name)
             
-            if with_body:
-                result = cursor.fetchall()
+            # Fetch plain tuple rows, shaped only when serialized
+            result = self._fetch_rows(cursor, with_body, layout)
             
             # Commit changes if necessary
             self._commit_changes(query)
+        except DatabaseConnectionError as e:
+            # The connection couldn't be opened, the next query tries again
+            status = self._query_error(e, query)
         except sqlite3.Error as e:
+            # Don't interrupt the rollback
+            self.__deadline.at = None
             self.connection.rollback()
-            status = DATABASE_STATUS_MESSAGES['query_fail'](e, query)
-            self.logger.error(status['message'])
+            status = self._query_error(e, query)
         finally:
             return self._build_get_query_result(
                 query = {
@@ -98,8 +138,10 @@ class SQLiteDatabase(Database):
                 query_arguments = query_arguments,
                 is_meta_query = is_meta_query,
                 status = status,
-                affected_rows = len(result),
-                result_group = len(result) > 0,
+                # SQLite reports -1 as the rowcount of SELECT statements
+                affected_rows = (cursor.rowcount if cursor.rowcount != -1 else len(result)) if cursor else 0,
+                result_group = bool(result.columns),
                 data = result,
-                with_body = with_body
+                with_body = with_body,
+                layout = layout
             )         
\ No newline at end of file
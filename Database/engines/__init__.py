@@ -1,3 +1,17 @@
-from .MySQL import MySQLDatabase
-from .PostgreSQL import PostgreSQLDatabase
-from .SQLite import SQLiteDatabase
\ No newline at end of file
+# The engines are imported on first use, so only the driver of the configured database is loaded
+import importlib
+
+_ENGINES = {
+    'MySQLDatabase': '.MySQL',
+    'PostgreSQLDatabase': '.PostgreSQL',
+    'SQLiteDatabase': '.SQLite',
+}
+
+__all__ = list(_ENGINES)
+
+def __getattr__(name: str):
+    if name not in _ENGINES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    engine = getattr(importlib.import_module(_ENGINES[name], __name__), name)
+    globals()[name] = engine
+    return engine
@@ -1,18 +1,115 @@
+import atexit
+import json
 import logging
-import logging.config
+import logging.handlers
 import os
+import queue
+import random
+import sys
+import threading
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    '''
+    QueueHandler that drops the records when the queue is full, instead of blocking or raising on the request thread.
+    
+    Attributes:
+        dropped (int): The number of dropped records
+    '''
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Structured (dict) messages are formatted by the listener's handlers
+        if isinstance(record.msg, dict):
+            return record
+        return super().prepare(record)
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class _InfoSampler(logging.Filter):
+    '''
+    Keeps only a `rate` fraction of the INFO records logged with `extra=Logger.SAMPLED` (the per-query events on the hot path).
+    '''
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.INFO or not getattr(record, 'sampled', False):
+            return True
+        return self.rate >= 1 or random.random() < self.rate
+
+class JSONLinesFormatter(logging.Formatter):
+    '''
+    Formats each record as one JSON object per line. A dict message is merged into the object as fields,
+    any other message is written as the `message` field.
+    '''
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'logger': record.name,
+            'level': record.levelname,
+        }
+        if isinstance(record.msg, dict):
+            entry.update(record.msg)
+        else:
+            entry['message'] = record.getMessage()
+        return json.dumps(entry, default = str, separators = (',', ':'))
+
+class _DeferredHandler(logging.Handler):
+    '''
+    Placeholder handler of a logger that isn't set up yet: sets the logger up on its first record, and passes the record on.
+    '''
+    def __init__(self, owner: 'Logger'):
+        super().__init__()
+        self.owner = owner
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        return self.owner._start().handle(record)
 
 class Logger:
     '''
     Logger class is responsible for handling the logging actions.
     
+    The records are put on a bounded queue and written to the console and the log file by a background listener thread,
+    so logging never does I/O on the request threads. When the queue is full, the records are dropped.
+    In the worker processes of the server, each logger writes its own file (`<logger_name>.worker<slot>.log`, see `set_worker`).
+    The log directory, the handlers and the listener thread are only set up when the first record is logged, so creating
+    a logger costs nothing until it is used.
+    
+    The level and the sample rate of the high-frequency INFO records default per `APP_ENV`, and can be overridden with
+    `LOG_LEVEL` and `LOG_INFO_SAMPLE_RATE`. The queue size is set with `LOG_QUEUE_SIZE`.
+    
     Attributes:
         logger_name (str): The name of the logger
         log_dir (str): The directory where log files will be stored
+        json_lines (bool): If the records are written as JSON lines instead of text
         initiated (bool): Flag to indicate if the logger has been initiated
+        listener (QueueListener): The listener writing the records, None until the first record
     '''
     _instances = {}
-    _initialized_loggers = set()
+    # The slot of the worker process, None in the main process
+    _worker = None
+    
+    # Pass as `extra` for the high-frequency INFO records that may be sampled
+    SAMPLED = {'sampled': True}
+    
+    LEVELS = {
+        'development': 'DEBUG',
+        'production': 'INFO',
+    }
+    INFO_SAMPLE_RATES = {
+        'development': 1.0,
+        'production': 0.1,
+    }
+    DEFAULT_QUEUE_SIZE = 10000
+    TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    TEXT_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 
     def __new__(cls, *args, **kwargs):
         logger_name = kwargs.get('logger_name', 'api_logger')
@@ -22,71 +119,154 @@ class Logger:
             cls._instances[logger_name] = instance
         return cls._instances[logger_name]
 
-    def __init__(self, log_dir='logs', logger_name='api_logger'):
+    def __init__(self, log_dir='logs', logger_name='api_logger', json_lines=False):
         if not self.initiated:
             self.log_dir = log_dir
             self.logger_name = logger_name
-            self.__setup_logger()
+            self.json_lines = json_lines
+            self.listener = None
+            self.__lock = threading.Lock()
+            
+            # Only the level is set now, the first record sets up the rest
+            logger = logging.getLogger(self.logger_name)
+            logger.setLevel(self._env_setting('LOG_LEVEL', self.LEVELS, 'DEBUG').upper())
+            logger.propagate = False
+            logger.handlers = [_DeferredHandler(self)]
+            
+            self.initiated = True
 
-    def __setup_logger(self):
-        # Ensure the base log directory exists
-        if not os.path.exists(self.log_dir):
-            os.makedirs(self.log_dir)
+    def _start(self) -> logging.Handler:
+        '''
+        Sets up the log directory, the console and file handlers behind the queue, and the listener thread. Runs once, on the first record.
         
-        # Define the log file path
-        log_file = os.path.join(self.log_dir, f'{self.logger_name}.log')
+        Returns:
+            logging.Handler: The queue handler the records go to
+        '''
+        with self.__lock:
+            if self.listener is not None:
+                return self.queue_handler
+            
+            # Ensure the log directory exists
+            os.makedirs(self.log_dir, exist_ok = True)
+            
+            formatter = JSONLinesFormatter() if self.json_lines else logging.Formatter(self.TEXT_FORMAT, self.TEXT_DATE_FORMAT)
+            handlers = (
+                logging.StreamHandler(sys.stdout),
+                self._file_handler(),
+            )
+            for handler in handlers:
+                handler.setFormatter(formatter)
+            
+            # The handlers are behind a queue, written by the listener thread
+            queue_size = int(os.getenv('LOG_QUEUE_SIZE', self.DEFAULT_QUEUE_SIZE))
+            self.queue_handler = _DroppingQueueHandler(queue.Queue(maxsize = queue_size))
+            self.queue_handler.addFilter(_InfoSampler(float(self._env_setting('LOG_INFO_SAMPLE_RATE', self.INFO_SAMPLE_RATES, 1.0))))
+            
+            logger = logging.getLogger(self.logger_name)
+            logger.handlers = [self.queue_handler]
+            
+            self.listener = logging.handlers.QueueListener(self.queue_handler.queue, *handlers, respect_handler_level = True)
+            self.listener.start()
+            atexit.register(self.stop)
         
-        # Ensure the specific log directory exists
-        specific_log_dir = os.path.dirname(log_file)
-        if not os.path.exists(specific_log_dir):
-            os.makedirs(specific_log_dir)
-
-        # Define the logging configuration
-        logging_config = {
-            'version': 1,
-            'disable_existing_loggers': False,
-            'formatters': {
-                'default': {
-                    'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                    'datefmt': '%Y-%m-%d %H:%M:%S',
-                },
-            },
-            'handlers': {
-                'console': {
-                    'class': 'logging.StreamHandler',
-                    'level': 'DEBUG',
-                    'formatter': 'default',
-                    'stream': 'ext://sys.stdout',
-                },
-                'file': {
-                    'class': 'logging.handlers.RotatingFileHandler',
-                    'level': 'DEBUG',
-                    'formatter': 'default',
-                    'filename': log_file,
-                    'mode': 'a',
-                    'maxBytes': 5*1024*1024,
-                    'backupCount': 2,
-                },
-            },
-            'loggers': {
-                self.logger_name: {
-                    'level': 'DEBUG',
-                    'handlers': ['console', 'file'],
-                    'propagate': False,
-                },
-            },
-        }
+        logger.info(f'{self.logger_name.upper()} successfully initialized.')
+        return self.queue_handler
+    
+    def _file_handler(self) -> logging.Handler:
+        '''
+        Creates the rotating handler of the log file, `<logger_name>.log`, or `<logger_name>.worker<slot>.log` in a worker process.
+        '''
+        suffix = f'.worker{Logger._worker}' if Logger._worker is not None else ''
+        log_file = os.path.join(self.log_dir, f'{self.logger_name}{suffix}.log')
+        return logging.handlers.RotatingFileHandler(log_file, mode = 'a', maxBytes = 5*1024*1024, backupCount = 2)
+    
+    @staticmethod
+    def _env_setting(name: str, defaults: dict, fallback: any) -> any:
+        '''
+        Gets the setting `name` from the environment, or its default for the current `APP_ENV`.
+        
+        Args:
+            name (str): The environment variable
+            defaults (dict): The defaults by `APP_ENV`
+            fallback (any): The value for an unknown `APP_ENV`
+        '''
+        return os.getenv(name) or defaults.get(os.getenv('APP_ENV', 'development'), fallback)
+    
+    def stop(self):
+        '''
+        Writes the queued records and stops the listener thread. Registered to run at exit.
+        '''
+        if self.listener is None or self.listener._thread is None:
+            return
+        
+        self.listener.stop()
+        if self.queue_handler.dropped:
+            # The listener is stopped, so write straight to the handlers
+            record = logging.LogRecord(self.logger_name, logging.WARNING, __file__, 0, f'{self.queue_handler.dropped} log records were dropped (log queue full).', None, None)
+            for handler in self.listener.handlers:
+                handler.handle(record)
 
-        # Apply the logging configuration
-        logging.config.dictConfig(logging_config)
+    @classmethod
+    def stop_all(cls):
+        '''
+        Stops the listener threads of all the loggers, for the processes leaving with `os._exit` (the forked workers).
+        '''
+        for instance in cls._instances.values():
+            if instance.initiated:
+                instance.stop()
+
+    @classmethod
+    def _after_fork(cls):
+        '''
+        Restarts the listener threads in a forked child process: the threads don't survive the fork, and the parent's queue may
+        have been copied locked. The records still queued in the parent are written by the parent.
+        '''
+        for instance in cls._instances.values():
+            if not instance.initiated:
+                continue
+            instance.__lock = threading.Lock()
+            if instance.listener is None:
+                continue
+            log_queue = queue.Queue(maxsize = instance.queue_handler.queue.maxsize)
+            instance.queue_handler.queue = log_queue
+            instance.queue_handler.dropped = 0
+            instance.listener.queue = log_queue
+            instance.listener._thread = None
+            instance.listener.start()
+
+    @classmethod
+    def set_worker(cls, slot: int):
+        '''
+        Gives the loggers of a forked worker process their own log files, suffixed with the worker `slot`: each file is then
+        appended to and rotated by one process only. The loggers already set up switch files, the others start with it.
+        
+        Args:
+            slot (int): The slot of the worker, kept by the worker restarted in its place
+        '''
+        cls._worker = slot
+        for instance in cls._instances.values():
+            if not instance.initiated or instance.listener is None:
+                continue
+            with instance.__lock:
+                # The records logged since the fork are written to the parent's file
+                instance.listener.stop()
+                handlers = []
+                for handler in instance.listener.handlers:
+                    if isinstance(handler, logging.handlers.RotatingFileHandler):
+                        formatter = handler.formatter
+                        handler.close()
+                        handler = instance._file_handler()
+                        handler.setFormatter(formatter)
+                    handlers.append(handler)
+                instance.listener.handlers = tuple(handlers)
+                instance.listener.start()
 
     def get_logger(self):
-        logger = logging.getLogger(self.logger_name)
-        if self.logger_name not in Logger._initialized_loggers:
-            logger.info(f'{self.logger_name.upper()} successfully initialized.')
-            Logger._initialized_loggers.add(self.logger_name)
-        return logger
+        return logging.getLogger(self.logger_name)
     
-def create_logger(logger_name='api_logger', log_dir='logs'):
-    logger_instance = Logger(log_dir=log_dir, logger_name=logger_name)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child = Logger._after_fork)
+
+def create_logger(logger_name='api_logger', log_dir='logs', json_lines=False):
+    logger_instance = Logger(log_dir=log_dir, logger_name=logger_name, json_lines=json_lines)
     return logger_instance.get_logger()
\ No newline at end of file
@@ -1 +1 @@
-from .Logger import Logger, create_logger
\ No newline at end of file
+from .Logger import Logger, JSONLinesFormatter, create_logger
\ No newline at end of file
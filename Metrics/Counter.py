@@ -0,0 +1,32 @@
+# Python deps & external libraries
+from typing import Iterator
+
+# The base class
+from .Metric import Metric
+
+class Counter(Metric):
+    '''
+    Monotonically increasing counter, e.g. requests by status. By convention the name ends with `_total`.
+    '''
+    type = 'counter'
+
+    def __init__(self, name: str, help: str, labels: tuple = tuple()):
+        super().__init__(name, help, labels)
+        self.__values = {}
+
+    def inc(self, *label_values: str, amount: float = 1):
+        '''
+        Increments the series of `label_values` by `amount`.
+
+        Args:
+            *label_values (str): The label values, in the order of the label names
+            amount (float): The increment
+        '''
+        with self._lock:
+            self.__values[label_values] = self.__values.get(label_values, 0) + amount
+
+    def samples(self) -> Iterator[tuple[str, dict, float]]:
+        with self._lock:
+            values = list(self.__values.items())
+        for label_values, value in values:
+            yield '', self._label_dict(label_values), value
@@ -0,0 +1,37 @@
+# Python deps & external libraries
+from typing import Callable, Iterator
+
+# The base class
+from .Metric import Metric
+
+class Gauge(Metric):
+    '''
+    Value that goes up and down, e.g. the queries in flight. Can also be read from a callback at scrape time.
+    '''
+    type = 'gauge'
+
+    def __init__(self, name: str, help: str, labels: tuple = tuple(), callback: Callable[[], float] = None):
+        super().__init__(name, help, labels)
+        self.callback = callback
+        self.__values = {}
+
+    def inc(self, *label_values: str, amount: float = 1):
+        with self._lock:
+            self.__values[label_values] = self.__values.get(label_values, 0) + amount
+
+    def dec(self, *label_values: str, amount: float = 1):
+        self.inc(*label_values, amount = -amount)
+
+    def set(self, value: float, *label_values: str):
+        with self._lock:
+            self.__values[label_values] = value
+
+    def samples(self) -> Iterator[tuple[str, dict, float]]:
+        if self.callback is not None:
+            yield '', {}, self.callback()
+            return
+
+        with self._lock:
+            values = list(self.__values.items())
+        for label_values, value in values:
+            yield '', self._label_dict(label_values), value
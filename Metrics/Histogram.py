@@ -0,0 +1,51 @@
+# Python deps & external libraries
+from bisect import bisect_left
+from typing import Iterator
+
+# The base class
+from .Metric import Metric
+
+class Histogram(Metric):
+    '''
+    Distribution of observed values (e.g. latencies in seconds) in cumulative buckets.
+    '''
+    type = 'histogram'
+
+    DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name: str, help: str, labels: tuple = tuple(), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self.__series = {}
+
+    def observe(self, value: float, *label_values: str):
+        '''
+        Records `value` in the series of `label_values`.
+
+        Args:
+            value (float): The observed value
+            *label_values (str): The label values, in the order of the label names
+        '''
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.__series.get(label_values)
+            if series is None:
+                # Per bucket counts (+ the overflow bucket), the sum and the count
+                series = self.__series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> Iterator[tuple[str, dict, float]]:
+        with self._lock:
+            snapshot = [(label_values, list(counts), total, count) for label_values, (counts, total, count) in self.__series.items()]
+
+        for label_values, counts, total, count in snapshot:
+            labels = self._label_dict(label_values)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield '_bucket', {**labels, 'le': repr(bound)}, cumulative
+            yield '_bucket', {**labels, 'le': '+Inf'}, count
+            yield '_sum', labels, total
+            yield '_count', labels, count
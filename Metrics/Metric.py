@@ -0,0 +1,33 @@
+# Python deps & external libraries
+import threading
+from abc import ABC, abstractmethod
+from typing import Iterator
+
+class Metric(ABC):
+    '''
+    Base class of the in-process metrics. The values are kept per label values tuple, behind a lock,
+    so the waitress threads all aggregate into the same series.
+
+    Attributes:
+        name (str): The metric name
+        help (str): The metric description
+        labels (tuple): The label names
+        type (str): The Prometheus metric type
+    '''
+    type = 'untyped'
+
+    def __init__(self, name: str, help: str, labels: tuple = tuple()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def samples(self) -> Iterator[tuple[str, dict, float]]:
+        '''
+        Yields the samples of the metric as (name suffix, labels, value).
+        '''
+        pass
+
+    def _label_dict(self, values: tuple) -> dict:
+        return dict(zip(self.labels, values))
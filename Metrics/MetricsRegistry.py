@@ -0,0 +1,155 @@
+# Python deps & external libraries
+import os
+import json
+import time
+import threading
+
+# Imports for proper typing
+from typing import Callable
+from .Metric import Metric
+from .Counter import Counter
+from .Gauge import Gauge
+from .Histogram import Histogram
+
+class MetricsRegistry:
+    '''
+    Holds the metrics of the process and renders them in the Prometheus text exposition format.
+    The metrics are created (or fetched, if already registered) by name, so modules can declare them at import time.
+
+    In the worker processes of the server, the metrics are shared (`share`): each worker writes a snapshot of its metrics to
+    a directory every `SHARE_INTERVAL` seconds, and renders its own metrics with the snapshots of the other workers, each series
+    labelled with its `worker`. So a scrape answered by any worker reports all of them (the other workers as of their last
+    snapshot), and each series stays monotonic, but for the reset of a restarted worker.
+
+    Attributes:
+        prefix (str): The prefix added to all the metric names
+        directory (str): The directory of the shared snapshots, None when not shared
+        worker (str): The `worker` label of the metrics of this process, None when not shared
+    '''
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+    SHARE_INTERVAL = 1.0
+
+    def __init__(self, prefix: str = ''):
+        self.prefix = prefix
+        self.directory = None
+        self.worker = None
+        self.__metrics = {}
+
+    def _get_or_create(self, cls: type, name: str, *args, **kwargs) -> Metric:
+        name = f'{self.prefix}{name}'
+        metric = self.__metrics.get(name)
+        if metric is None:
+            metric = self.__metrics[name] = cls(name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f'Metric `{name}` is already registered as a {metric.type}')
+        return metric
+
+    def counter(self, name: str, help: str, labels: tuple = tuple()) -> Counter:
+        return self._get_or_create(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str, labels: tuple = tuple(), callback: Callable[[], float] = None) -> Gauge:
+        gauge = self._get_or_create(Gauge, name, help, labels)
+        if callback is not None:
+            gauge.callback = callback
+        return gauge
+
+    def histogram(self, name: str, help: str, labels: tuple = tuple(), buckets: tuple = Histogram.DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labels, buckets)
+
+    @staticmethod
+    def _escape(value: any) -> str:
+        return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+    def share(self, directory: str, worker: str):
+        '''
+        Shares the metrics of this worker process with the other workers, through the snapshots in `directory`.
+        Starts the thread writing the snapshot of this worker.
+
+        Args:
+            directory (str): The directory of the snapshots, the same for all the workers
+            worker (str): The `worker` label of this process, e.g. its slot
+        '''
+        self.directory = directory
+        self.worker = str(worker)
+        threading.Thread(target = self._share, name = 'metrics-snapshot', daemon = True).start()
+
+    def _share(self):
+        while True:
+            time.sleep(self.SHARE_INTERVAL)
+            self.flush()
+
+    def flush(self):
+        '''
+        Writes the snapshot of this worker, e.g. when it stops. Does nothing when the metrics are not shared.
+        '''
+        if self.directory is None:
+            return
+
+        path = os.path.join(self.directory, f'worker{self.worker}.json')
+        try:
+            with open(f'{path}.tmp', 'w') as file:
+                json.dump(self._collect(), file, separators = (',', ':'))
+            # Atomic, the readers never see a partial snapshot
+            os.replace(f'{path}.tmp', path)
+        except OSError:
+            pass
+
+    def _collect(self) -> list:
+        '''
+        Collects the samples of the metrics of this process, labelled with its `worker` when shared.
+
+        Returns:
+            list: The name, help, type and samples (name suffix, labels, value) of each metric
+        '''
+        worker = {'worker': self.worker} if self.worker is not None else {}
+        return [
+            (metric.name, metric.help, metric.type, [(suffix, {**worker, **labels}, value) for suffix, labels, value in metric.samples()])
+            for metric in list(self.__metrics.values())
+        ]
+
+    def _collect_shared(self) -> list:
+        '''
+        Reads the snapshots of the other workers.
+        '''
+        metrics = []
+        own = f'worker{self.worker}.json'
+        try:
+            names = sorted(name for name in os.listdir(self.directory) if name.endswith('.json') and name != own)
+        except OSError:
+            return metrics
+
+        for name in names:
+            try:
+                with open(os.path.join(self.directory, name)) as file:
+                    metrics.extend(json.load(file))
+            except (OSError, ValueError):
+                # Removed, or replaced meanwhile
+                continue
+        return metrics
+
+    def render(self) -> str:
+        '''
+        Renders all the metrics in the Prometheus text format, with the ones of the other workers when shared.
+
+        Returns:
+            str: The exposition text
+        '''
+        metrics = self._collect()
+        if self.directory is not None:
+            metrics.extend(self._collect_shared())
+
+        # One family per metric name, with the series of all the workers
+        families = {}
+        for name, help, metric_type, samples in metrics:
+            families.setdefault(name, (help, metric_type, []))[2].extend(samples)
+
+        lines = []
+        for name, (help, metric_type, samples) in families.items():
+            lines.append(f'# HELP {name} {help}')
+            lines.append(f'# TYPE {name} {metric_type}')
+
+            for suffix, labels, value in samples:
+                label_str = ','.join(f'{key}="{self._escape(value)}"' for key, value in labels.items())
+                lines.append(f'{name}{suffix}{{{label_str}}} {value}' if label_str else f'{name}{suffix} {value}')
+
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,5 @@
+from .Metric import Metric
+from .Counter import Counter
+from .Gauge import Gauge
+from .Histogram import Histogram
+from .MetricsRegistry import MetricsRegistry
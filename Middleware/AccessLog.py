@@ -0,0 +1,80 @@
+# Python deps & external libraries
+import hashlib
+import logging
+import flask
+
+# Imports for proper typing
+from .RequestContext import RequestContext
+
+class AccessLog:
+    '''
+    Writes one structured record per request, once the response is complete. Meant for the JSON lines access logger.
+
+    The API keys are logged as short hash ids, never as such.
+
+    Attributes:
+        logger (logging.Logger): The access logger
+        api_keys (frozenset): The valid API keys
+    '''
+    def __init__(self, logger: logging.Logger, api_keys: frozenset):
+        self.logger = logger
+        self.api_keys = api_keys
+        self.__key_ids = {}
+
+    def key_id(self, api_key: str) -> str:
+        '''
+        Gets the stable, non-reversible id of `api_key`.
+
+        Args:
+            api_key (str): The API key
+
+        Returns:
+            str: The key id, or None for a missing or invalid key
+        '''
+        if api_key not in self.api_keys:
+            return None
+
+        key_id = self.__key_ids.get(api_key)
+        if key_id is None:
+            key_id = self.__key_ids[api_key] = hashlib.sha256(api_key.encode()).hexdigest()[:12]
+        return key_id
+
+    def record(self, context: RequestContext, response: flask.Response) -> dict:
+        '''
+        Builds the access log record of a finished request. The times are in milliseconds, `peak_bytes` is None unless memory is tracked.
+
+        Args:
+            context (RequestContext): The request context
+            response (flask.Response): The response
+
+        Returns:
+            dict: The access log record
+        '''
+        request = context.request
+        stats = context.stats
+
+        return {
+            'method': context.method,
+            'route': request.url_rule.rule if request.url_rule else None,
+            'path': request.path,
+            'table': (request.view_args or {}).get('table'),
+            'api_key_id': self.key_id(context.api_key),
+            'status': response.status_code,
+            'rows': stats.rows,
+            'queries': stats.queries,
+            'response_bytes': context.response_bytes,
+            'db_ms': round(stats.db_time * 1000, 3),
+            'serialize_ms': round(stats.serialize_time * 1000, 3),
+            'total_ms': round((context.finished - context.started) * 1000, 3),
+            'peak_bytes': context.memory_peak,
+        }
+
+    def write(self, context: RequestContext, response: flask.Response):
+        '''
+        Writes the access log record of a finished request. Registered as a `RequestPipeline.on_finish` callback.
+
+        Args:
+            context (RequestContext): The request context
+            response (flask.Response): The response
+        '''
+        self.logger.info(self.record(context, response))
@@ -0,0 +1,188 @@
+# Python deps & external libraries
+import os
+import time
+import threading
+from limits.storage import Storage, RedisStorage
+
+# Constants
+from constants import API_LOGGER
+
+class _Window:
+    '''
+    Local state of one fixed rate limit window.
+
+    Attributes:
+        count (int): The best known cluster-wide count (last synced count + the local hits since)
+        pending (int): The local hits not yet pushed to the shared store
+        expiry (int): The window length in seconds
+        expires_at (float): The window end as a unix timestamp
+    '''
+    __slots__ = ('count', 'pending', 'expiry', 'expires_at')
+
+    def __init__(self, expiry: int, now: float):
+        self.count = 0
+        self.pending = 0
+        self.expiry = expiry
+        self.expires_at = now + expiry
+
+class HybridLimiterStorage(Storage):
+    '''
+    Rate limit storage that counts locally and reconciles with Redis in the background.
+
+    Every hit increments an in-process counter, so the limit checks do no network I/O.
+    A background thread pushes the pending hits of all live windows to Redis in one pipelined batch every `sync_interval` seconds,
+    and pulls back the cluster-wide counts and window expiries. A window is also synced inline once it has `tolerance` unsynced hits,
+    which bounds how far a single process can overshoot a limit between syncs.
+    If Redis is unreachable the hits are kept and the limits are enforced per process until a background sync succeeds again.
+
+    Only the fixed window strategy (the flask_limiter default) is supported.
+
+    Usage: `API_STORAGE_URI=hybrid+redis://host:6379`, options `sync_interval` (seconds, default 1) and `tolerance` (hits, default 10).
+    '''
+    STORAGE_SCHEME = ['hybrid+redis', 'hybrid+rediss', 'hybrid+redis+unix']
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, sync_interval: float = 1.0, tolerance: int = 10, **options):
+        super().__init__(uri, wrap_exceptions = wrap_exceptions, **options)
+        self.remote = RedisStorage(uri.removeprefix('hybrid+'), wrap_exceptions = wrap_exceptions, **options)
+        self.sync_interval = float(sync_interval)
+        self.tolerance = max(int(tolerance), 1)
+
+        self.__windows = {}
+        self.__healthy = True
+        self.__lock = threading.Lock()
+        self.__sync_lock = threading.Lock()
+        self.__stop = threading.Event()
+        self.__thread = None
+        self.__pid = None
+
+    @property
+    def base_exceptions(self):
+        return self.remote.base_exceptions
+
+    def _ensure_sync_thread(self):
+        '''
+        Starts the background sync thread, also in a forked worker (threads don't survive a fork).
+        '''
+        pid = os.getpid()
+        if self.__pid == pid:
+            return
+
+        with self.__lock:
+            if self.__pid == pid:
+                return
+
+            self.__pid = pid
+            self.__stop.clear()
+            self.__thread = threading.Thread(target = self._sync_loop, name = 'limiter-sync', daemon = True)
+            self.__thread.start()
+
+    def _sync_loop(self):
+        while not self.__stop.wait(self.sync_interval):
+            self.sync()
+
+    def sync(self, keys: list = None):
+        '''
+        Pushes the pending hits to Redis and refreshes the local counts in a single pipelined round trip.
+        Expired windows are dropped.
+
+        Args:
+            keys (list, optional): The keys to sync. Defaults to all the live windows.
+        '''
+        with self.__sync_lock:
+            now = time.time()
+            batch = []
+
+            with self.__lock:
+                for key in list(keys if keys is not None else self.__windows):
+                    window = self.__windows.get(key)
+                    if window is None:
+                        continue
+                    if window.expires_at <= now:
+                        del self.__windows[key]
+                        continue
+
+                    batch.append((key, window, window.pending))
+                    window.pending = 0
+
+            if not batch:
+                return
+
+            try:
+                pipeline = self.remote.get_connection().pipeline(transaction = False)
+                for key, window, amount in batch:
+                    prefixed_key = self.remote.prefixed_key(key)
+                    self.remote.lua_incr_expire([prefixed_key], [window.expiry, amount], client = pipeline)
+                    pipeline.pttl(prefixed_key)
+                results = pipeline.execute()
+            except self.remote.base_exceptions as e:
+                # Give the hits back, they'll be pushed on the next sync
+                with self.__lock:
+                    for key, window, amount in batch:
+                        window.pending += amount
+                if self.__healthy:
+                    API_LOGGER.warning(f'Rate limit sync failed, enforcing local limits until the store is reachable: {e}')
+                self.__healthy = False
+                return
+
+            if not self.__healthy:
+                API_LOGGER.info('Rate limit store reachable again, resuming the sync.')
+            self.__healthy = True
+
+            with self.__lock:
+                for i, (key, window, amount) in enumerate(batch):
+                    total, ttl = int(results[i * 2]), results[i * 2 + 1]
+                    window.count = total + window.pending
+                    if ttl and ttl > 0:
+                        window.expires_at = now + ttl / 1000
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        self._ensure_sync_thread()
+        now = time.time()
+
+        with self.__lock:
+            window = self.__windows.get(key)
+            if window is None or window.expires_at <= now:
+                window = self.__windows[key] = _Window(expiry, now)
+
+            window.count += amount
+            window.pending += amount
+            count, pending = window.count, window.pending
+
+        # While the store is down only the background thread retries, so requests never wait on a dead connection
+        if pending >= self.tolerance and self.__healthy:
+            self.sync([key])
+            return self.get(key)
+
+        return count
+
+    def get(self, key: str) -> int:
+        with self.__lock:
+            window = self.__windows.get(key)
+            if window is None or window.expires_at <= time.time():
+                return 0
+            return window.count
+
+    def get_expiry(self, key: str) -> float:
+        with self.__lock:
+            window = self.__windows.get(key)
+            return window.expires_at if window is not None else time.time()
+
+    def check(self) -> bool:
+        return self.remote.check()
+
+    def reset(self) -> int:
+        with self.__lock:
+            self.__windows.clear()
+        return self.remote.reset()
+
+    def clear(self, key: str):
+        with self.__lock:
+            self.__windows.pop(key, None)
+        self.remote.clear(key)
+
+    def close(self):
+        '''
+        Stops the sync thread and pushes the remaining hits.
+        '''
+        self.__stop.set()
+        self.sync()
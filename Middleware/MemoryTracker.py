@@ -0,0 +1,149 @@
+# Python deps & external libraries
+import os
+import threading
+import tracemalloc
+
+# Imports for proper typing
+from .RequestContext import RequestContext
+from .RequestPipeline import RequestPipeline
+from Metrics import MetricsRegistry
+
+class MemoryTracker:
+    '''
+    Optional memory accounting with `tracemalloc`: the allocation peak of each request, by route and table, and snapshot diffs
+    grouped by source line.
+
+    `tracemalloc` counts the allocations of the whole process, so the peak of a request also includes the allocations of the
+    requests running at the same time. The peak is only reset when no other tracked request is in flight, so it can be
+    overestimated under concurrency, but never underestimated. Tracing slows down allocations noticeably, enable it to investigate.
+
+    Attributes:
+        frames (int): The traceback depth stored per allocation
+        packages (tuple): The packages the snapshot diffs are limited to
+        root (str): The directory of the packages
+    '''
+    PACKAGES = ('Database', 'Routes', 'Logger')
+    # 64 KiB to 1 GiB
+    BUCKETS = tuple(float(2 ** exponent) for exponent in range(16, 31, 2))
+
+    def __init__(self, metrics: MetricsRegistry, frames: int = 1, packages: tuple = PACKAGES, root: str = None):
+        self.frames = max(int(frames), 1)
+        self.packages = packages
+        self.root = root or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+        self.__histogram = metrics.histogram(
+            'http_request_peak_memory_bytes', 'Allocation peak of the requests by route and table', ('route', 'table'), self.BUCKETS
+        )
+        self.__peaks = {}
+        self.__in_flight = 0
+        self.__lock = threading.Lock()
+        self.__snapshot = None
+
+    def init_app(self, pipeline: RequestPipeline):
+        '''
+        Starts tracing and registers the tracking as the first step and the first finish callback of `pipeline`.
+        Call it before the other steps and callbacks are registered.
+
+        Args:
+            pipeline (RequestPipeline): The request pipeline
+        '''
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+        pipeline.step()(self.start)
+        pipeline.on_finish(self.finish)
+
+    def start(self, context: RequestContext):
+        '''
+        Records the traced memory at the start of the request. A pipeline step that never rejects.
+        '''
+        with self.__lock:
+            if self.__in_flight == 0:
+                tracemalloc.reset_peak()
+            self.__in_flight += 1
+        context.memory_start = tracemalloc.get_traced_memory()[0]
+        return None
+
+    def finish(self, context: RequestContext, response):
+        '''
+        Records the allocation peak of the finished request (`context.memory_peak`). A pipeline finish callback.
+        '''
+        if context.memory_start is None:
+            return
+
+        peak = max(tracemalloc.get_traced_memory()[1] - context.memory_start, 0)
+        context.memory_peak = peak
+
+        request = context.request
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        table = (request.view_args or {}).get('table') or ''
+        self.__histogram.observe(peak, route, table)
+
+        with self.__lock:
+            self.__in_flight = max(self.__in_flight - 1, 0)
+            entry = self.__peaks.setdefault((route, table), [0, 0, 0])
+            entry[0] += 1
+            entry[1] += peak
+            entry[2] = max(entry[2], peak)
+
+    def peaks(self) -> list[dict]:
+        '''
+        Gets the allocation peaks by route and table, the largest first.
+
+        Returns:
+            list: The `route`, `table`, `requests`, `avg_peak_bytes` and `max_peak_bytes` of each route and table
+        '''
+        with self.__lock:
+            entries = [(key, tuple(entry)) for key, entry in self.__peaks.items()]
+
+        return sorted((
+            {
+                'route': route,
+                'table': table or None,
+                'requests': requests,
+                'avg_peak_bytes': total // requests,
+                'max_peak_bytes': largest,
+            }
+            for (route, table), (requests, total, largest) in entries
+        ), key = lambda entry: entry['max_peak_bytes'], reverse = True)
+
+    def snapshot_diff(self, limit: int = 25) -> dict:
+        '''
+        Takes a snapshot of the allocations made in the tracked packages, and diffs it with the previous one by source line.
+
+        Args:
+            limit (int, optional): The number of source lines returned. Defaults to 25.
+
+        Returns:
+            dict: The traced memory, the route peaks, and the `top` source lines by size difference (by size for the first snapshot)
+        '''
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(True, os.path.join(self.root, package, '*')) for package in self.packages
+        ])
+
+        with self.__lock:
+            previous, self.__snapshot = self.__snapshot, snapshot
+
+        if previous is None:
+            top = [
+                {'line': self._line(stat.traceback), 'size': stat.size, 'count': stat.count, 'size_diff': stat.size, 'count_diff': stat.count}
+                for stat in snapshot.statistics('lineno')[:limit]
+            ]
+        else:
+            top = [
+                {'line': self._line(stat.traceback), 'size': stat.size, 'count': stat.count, 'size_diff': stat.size_diff, 'count_diff': stat.count_diff}
+                for stat in snapshot.compare_to(previous, 'lineno')[:limit]
+            ]
+
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            'traced_bytes': current,
+            'traced_peak_bytes': peak,
+            'compared': previous is not None,
+            'routes': self.peaks(),
+            'top': top,
+        }
+
+    def _line(self, traceback: tracemalloc.Traceback) -> str:
+        frame = traceback[0]
+        return f'{os.path.relpath(frame.filename, self.root)}:{frame.lineno}'
@@ -0,0 +1,33 @@
+class OriginPolicy:
+    '''
+    Decides if a request origin is allowed. The decisions are memoized per origin.
+
+    Attributes:
+        allowed_origins (frozenset): The allowed origins
+        max_cached (int): The maximum number of memoized origins
+    '''
+    def __init__(self, allowed_origins: set, max_cached: int = 1024):
+        self.allowed_origins = frozenset(allowed_origins)
+        self.max_cached = max_cached
+        self.__decisions = {}
+
+    def is_allowed(self, origin: str) -> bool:
+        '''
+        Checks if `origin` is allowed.
+
+        Args:
+            origin (str): The normalized request origin
+
+        Returns:
+            bool: True if the origin is allowed, False otherwise
+        '''
+        decision = self.__decisions.get(origin)
+        if decision is None:
+            decision = origin is not None and origin in self.allowed_origins
+
+            # Referers carry full urls, so don't let the memo grow without bounds
+            if len(self.__decisions) >= self.max_cached:
+                self.__decisions.clear()
+            self.__decisions[origin] = decision
+
+        return decision
@@ -0,0 +1,79 @@
+# Python deps & external libraries
+import time
+from flask_limiter import Limiter
+from limits import parse_many, RateLimitItem
+
+class QuotaManager:
+    '''
+    Cost-weighted quotas per API key. A request is charged after it has run, by the rows it read or wrote and by the response bytes,
+    and the next requests of the key are rejected once a quota window is used up.
+
+    The counters share the storage (and strategy) of the flask_limiter instance, so the hybrid storage works here too.
+
+    Attributes:
+        limiter (Limiter): The flask_limiter instance
+    '''
+    UNITS = ('rows', 'bytes')
+
+    def __init__(self, limiter: Limiter, quotas: dict):
+        '''
+        Args:
+            limiter (Limiter): The flask_limiter instance
+            quotas (dict): `rows` and `bytes` dicts of `{api_key: 'limit/period;...'}`, and the `default_rows` / `default_bytes` limit strings for the other keys
+        '''
+        self.limiter = limiter
+        self.__quotas = {
+            unit: {key: tuple(parse_many(value)) for key, value in quotas.get(unit, {}).items() if value}
+            for unit in self.UNITS
+        }
+        self.__defaults = {
+            unit: tuple(parse_many(quotas[f'default_{unit}'])) if quotas.get(f'default_{unit}') else tuple()
+            for unit in self.UNITS
+        }
+
+    def limits_for(self, unit: str, api_key: str) -> tuple:
+        '''
+        Gets the quota limits of `api_key` for `unit`.
+
+        Args:
+            unit (str): `rows` or `bytes`
+            api_key (str): The API key
+
+        Returns:
+            tuple: The `RateLimitItem`s, empty if the key has no quota
+        '''
+        return self.__quotas[unit].get(api_key, self.__defaults[unit])
+
+    def exhausted(self, api_key: str) -> tuple[str, RateLimitItem, int]:
+        '''
+        Checks if any quota of `api_key` is used up.
+
+        Args:
+            api_key (str): The API key
+
+        Returns:
+            tuple: The unit, the exhausted limit and the seconds until it resets, or None if the key is within its quotas
+        '''
+        strategy = self.limiter.limiter
+        for unit in self.UNITS:
+            for item in self.limits_for(unit, api_key):
+                if not strategy.test(item, 'quota', unit, api_key):
+                    reset_time = strategy.get_window_stats(item, 'quota', unit, api_key).reset_time
+                    return unit, item, max(int(reset_time - time.time()), 0)
+        return None
+
+    def charge(self, api_key: str, rows: int, response_bytes: int):
+        '''
+        Charges a finished request to the quotas of `api_key`.
+
+        Args:
+            api_key (str): The API key
+            rows (int): The rows read or written by the request
+            response_bytes (int): The size of the response body
+        '''
+        strategy = self.limiter.limiter
+        for unit, cost in (('rows', rows), ('bytes', response_bytes)):
+            if cost <= 0:
+                continue
+            for item in self.limits_for(unit, api_key):
+                strategy.hit(item, 'quota', unit, api_key, cost = cost)
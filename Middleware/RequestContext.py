@@ -0,0 +1,95 @@
+# Python deps & external libraries
+import time
+import flask
+
+# The per-request database usage counters
+from Database import QueryStats
+
+class RequestContext:
+    '''
+    Per-request state shared by the middleware steps and the routes. Stored in `flask.g.request_context`.
+
+    Attributes:
+        request (flask.Request): The request object
+        method (str): The HTTP method
+        api_key (str): The `X-API-KEY` header value
+        authenticated (bool): If the API key and its secret were verified by the middleware
+        origin (str): The normalized request origin (`Origin`, `Referer` or `Host`), or None
+        origin_allowed (bool): If the origin is in the allowed origins
+        table_visibility (str): `all` or `hidden`, based on the origin
+        started (float): The `time.perf_counter` value at the start of the request
+        stats (QueryStats): The database usage of the request
+        response_bytes (int): The size of the response body, known once the response is complete
+        finished (float): The `time.perf_counter` value when the response was complete, or None
+        timings (dict): The phase durations (seconds) when the request is timed for `Server-Timing`, otherwise None
+        memory_start (int): The traced memory (bytes) at the start of the request when memory is tracked, otherwise None
+        memory_peak (int): The allocation peak (bytes) of the request once it has finished, when memory is tracked
+    '''
+    __slots__ = (
+        'request', 'method', 'api_key', 'authenticated', 'origin', 'origin_allowed', 'table_visibility', 'started', 'stats', 'response_bytes', 'finished',
+        'timings', 'memory_start', 'memory_peak'
+    )
+
+    def __init__(self, request: flask.Request):
+        self.request = request
+        self.method = request.method
+        self.api_key = request.headers.get('X-API-KEY')
+        self.authenticated = False
+        self.origin = self._parse_origin(request.environ)
+        self.origin_allowed = False
+        self.table_visibility = 'hidden'
+        self.started = time.perf_counter()
+        self.stats = QueryStats.start(request.url_rule.rule if request.url_rule else None)
+        self.response_bytes = 0
+        self.finished = None
+        self.timings = None
+        self.memory_start = None
+        self.memory_peak = None
+
+    @staticmethod
+    def _parse_origin(environ: dict) -> str:
+        '''
+        Gets the request origin from the WSGI `environ`, prefixed with a scheme.
+
+        Args:
+            environ (dict): The WSGI environment
+
+        Returns:
+            str: The origin, or None if the request has no origin, referer or host
+        '''
+        origin = environ.get('HTTP_ORIGIN') or environ.get('HTTP_REFERER') or environ.get('HTTP_HOST')
+        if not origin:
+            return None
+        if not origin.startswith('http://') and not origin.startswith('https://'):
+            origin = f'http://{origin}'
+        return origin
+
+    @staticmethod
+    def verify_key(request: flask.Request, api_keys: frozenset, secrets: dict) -> bool:
+        '''
+        Checks if the `request` is made with a valid API key and its secret.
+
+        Args:
+            request (flask.Request): The request object
+            api_keys (frozenset): The valid API keys
+            secrets (dict): The API secrets by key
+        '''
+        api_key = request.headers.get('X-API-KEY')
+        return api_key in api_keys and secrets.get(api_key) == request.headers.get('X-API-SECRET')
+
+    def is_admin(self, admin_keys: frozenset, secrets: dict) -> bool:
+        '''
+        Checks if the request is made with an admin API key and its secret.
+
+        Args:
+            admin_keys (frozenset): The admin API keys
+            secrets (dict): The API secrets by key
+        '''
+        return self.verify_key(self.request, admin_keys, secrets)
+
+    @staticmethod
+    def current() -> 'RequestContext':
+        '''
+        Gets the context of the current request, or None outside of a request (or before the middleware has run).
+        '''
+        return flask.g.get('request_context') if flask.has_app_context() else None
@@ -0,0 +1,150 @@
+# Python deps & external libraries
+import time
+import flask
+
+# Imports for proper typing
+from typing import Callable, Iterator
+from .RequestContext import RequestContext
+
+# Constants
+from constants import API_LOGGER
+
+class RequestPipeline:
+    '''
+    Ordered chain of the request middleware steps, run by a single `before_request` hook.
+
+    The steps are compiled into a tuple per HTTP method on first use, so each request only runs the steps that apply to its method.
+    A step receives the `RequestContext` and returns a response to reject the request, or None to continue.
+
+    The `on_finish` callbacks run once the response is complete: right after the view for regular responses, and when the stream
+    has been consumed (or closed) for streamed ones, so the size and the total time are known in both cases.
+
+    Attributes:
+        app (flask.Flask): The Flask app
+        timing (Callable): Decides if a request is timed (`context.timings` is set, and each step is timed), or None
+    '''
+    def __init__(self, app: flask.Flask, timing: Callable[[RequestContext], bool] = None):
+        self.app = app
+        self.timing = timing
+        self.__steps = []
+        self.__chains = {}
+        self.__exempt_paths = set()
+        self.__finish_callbacks = []
+
+        app.before_request(self._run)
+        app.after_request(self._after)
+
+    def step(self, methods: tuple = None) -> Callable:
+        '''
+        Decorator for registering a middleware step. The steps run in the order they are registered.
+
+        Args:
+            methods (tuple, optional): The HTTP methods the step applies to. Defaults to all methods.
+        '''
+        def decorator(func: Callable) -> Callable:
+            self.__steps.append((func, frozenset(methods) if methods else None))
+            self.__chains = {}
+            return func
+        return decorator
+
+    def on_finish(self, func: Callable) -> Callable:
+        '''
+        Decorator for registering a callback `func(context, response)` to run when the response is complete.
+
+        Args:
+            func (Callable): The callback
+        '''
+        self.__finish_callbacks.append(func)
+        return func
+
+    def exempt(self, path: str):
+        '''
+        Excludes `path` from the middleware steps (e.g. health checks). The request context is still created.
+
+        Args:
+            path (str): The exact request path
+        '''
+        self.__exempt_paths.add(path)
+
+    def _compile(self, method: str) -> tuple:
+        '''
+        Builds the chain of steps for `method`.
+
+        Args:
+            method (str): The HTTP method
+
+        Returns:
+            tuple: The step functions
+        '''
+        chain = tuple(func for func, methods in self.__steps if methods is None or method in methods)
+        self.__chains[method] = chain
+        return chain
+
+    def _run(self) -> flask.Response:
+        '''
+        Runs the compiled chain for the current request, stopping at the first rejection.
+        '''
+        request = flask.request._get_current_object()
+        context = RequestContext(request)
+        flask.g.request_context = context
+
+        if request.path in self.__exempt_paths:
+            return None
+
+        if self.timing is not None and self.timing(context):
+            context.timings = {}
+
+        chain = self.__chains.get(context.method) or self._compile(context.method)
+        timings = context.timings
+        for step in chain:
+            if timings is None:
+                response = step(context)
+            else:
+                started = time.perf_counter()
+                response = step(context)
+                timings[f'mw.{step.__name__}'] = time.perf_counter() - started
+
+            if response is not None:
+                return response
+
+        return None
+
+    def _after(self, response: flask.Response) -> flask.Response:
+        '''
+        Runs the finish callbacks, deferred to the end of the stream for streamed responses.
+        '''
+        context = flask.g.get('request_context')
+        if context is None or not self.__finish_callbacks:
+            return response
+
+        if response.is_streamed:
+            response.response = self._finish_stream(context, response, response.response)
+        else:
+            context.response_bytes = response.content_length or 0
+            self._finish(context, response)
+
+        return response
+
+    def _finish_stream(self, context: RequestContext, response: flask.Response, body) -> Iterator:
+        '''
+        Wraps the streamed response `body`, counting its bytes and running the finish callbacks once it ends.
+        '''
+        try:
+            for chunk in body:
+                context.response_bytes += len(chunk)
+                yield chunk
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+            self._finish(context, response)
+
+    def _finish(self, context: RequestContext, response: flask.Response):
+        '''
+        Runs the finish callbacks. A failing callback is logged, it never breaks the response.
+        '''
+        context.finished = time.perf_counter()
+        for callback in self.__finish_callbacks:
+            try:
+                callback(context, response)
+            except Exception as e:
+                API_LOGGER.error(f'Request finish callback `{callback.__name__}` failed: {e}')
@@ -0,0 +1,182 @@
+# Python deps & external libraries
+import os
+import re
+import sys
+import time
+import random
+import cProfile
+import threading
+import flask
+from collections import Counter
+
+# cProfile hooks the process-wide `sys.monitoring` (Python 3.12+): only one profile can run at a time
+_CPROFILE_LOCK = threading.Lock()
+
+class _StackSampler:
+    '''
+    Samples the stack of one thread at a fixed interval, from a background thread.
+
+    Attributes:
+        thread_id (int): The sampled thread id
+        interval (float): The sampling interval in seconds
+        stacks (Counter): The sample counts by collapsed stack (`outer;...;inner`)
+    '''
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.__stop = threading.Event()
+        self.__thread = threading.Thread(target = self._run, name = 'request-profiler', daemon = True)
+
+    def start(self):
+        self.__thread.start()
+
+    def stop(self):
+        self.__stop.set()
+        self.__thread.join()
+
+    def _run(self):
+        while not self.__stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+class RequestProfiler:
+    '''
+    Profiles single requests, on demand, and saves the profiles under `directory`.
+
+    A request is profiled when an admin API key (with its secret) sends the `X-Profile` header (`cprofile` or `sample`),
+    or at random with the `sample_rate` of the config. `cprofile` is deterministic and saved as a pstats file (`.pstats`),
+    `sample` samples the request thread's stack every `interval_ms` and is saved in the collapsed stack format of flamegraph.pl
+    and speedscope (`.collapsed`). Only the newest `retention` profiles are kept.
+
+    Only one `cprofile` profile runs at a time: it records the whole process, so it also holds the work of the other server
+    threads. A request asking for `cprofile` while another one is profiled is sampled instead, and the `X-Profile` response
+    header tells the mode used.
+
+    The hooks are only registered by `init_app` when profiling is enabled, so there is no overhead otherwise.
+
+    Attributes:
+        admin_keys (frozenset): The API keys allowed to request profiles
+        secrets (dict): The API secrets by key
+        sample_rate (float): The fraction of requests profiled without the header
+        mode (str): The profiler of the sampled requests (`cprofile` or `sample`)
+        interval (float): The stack sampling interval in seconds
+        retention (int): The number of profiles kept
+        directory (str): The profiles directory
+    '''
+    HEADER = 'X-Profile'
+    MODES = ('cprofile', 'sample')
+
+    def __init__(self, config: dict, admin_keys: frozenset, secrets: dict, directory: str = 'logs/profiles'):
+        self.admin_keys = admin_keys
+        self.secrets = secrets
+        self.sample_rate = float(config.get('sample_rate') or 0)
+        self.mode = config.get('mode') if config.get('mode') in self.MODES else 'sample'
+        self.interval = float(config.get('interval_ms') or 5) / 1000
+        self.retention = int(config.get('retention') or 50)
+        self.directory = directory
+
+    def init_app(self, app: flask.Flask):
+        '''
+        Registers the profiling hooks. Register before the other `before_request` hooks to profile them too.
+
+        Args:
+            app (flask.Flask): The Flask app
+        '''
+        os.makedirs(self.directory, exist_ok = True)
+        app.before_request(self._start)
+        app.after_request(self._annotate)
+        # Teardown runs for every request, after the stream for the streamed ones (`stream_with_context`)
+        app.teardown_request(self._stop)
+
+    def _requested_mode(self, request: flask.Request) -> str:
+        '''
+        Gets the profiler for the request, or None if it should not be profiled.
+        '''
+        requested = request.headers.get(self.HEADER)
+        if requested is not None:
+            api_key = request.headers.get('X-API-KEY')
+            if api_key in self.admin_keys and self.secrets.get(api_key) == request.headers.get('X-API-SECRET'):
+                return requested if requested in self.MODES else 'cprofile'
+
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return self.mode
+
+        return None
+
+    def _start(self):
+        mode = self._requested_mode(flask.request)
+        if mode is None:
+            return None
+
+        profiler = None
+        if mode == 'cprofile' and _CPROFILE_LOCK.acquire(blocking = False):
+            try:
+                profiler = cProfile.Profile()
+                profiler.enable()
+            except ValueError:
+                # The profiling hooks are held by another tool (e.g. a debugger)
+                _CPROFILE_LOCK.release()
+                profiler = None
+
+        if profiler is None:
+            mode = 'sample'
+            profiler = _StackSampler(threading.get_ident(), self.interval)
+            profiler.start()
+
+        flask.g.profiler = (mode, profiler, time.time())
+        return None
+
+    def _annotate(self, response: flask.Response) -> flask.Response:
+        '''
+        Tells the client the profiler used for its request.
+        '''
+        profiling = flask.g.get('profiler')
+        if profiling is not None:
+            response.headers[self.HEADER] = profiling[0]
+        return response
+
+    def _stop(self, error: BaseException = None):
+        profiling = flask.g.pop('profiler', None)
+        if profiling is None:
+            return
+
+        mode, profiler, started = profiling
+        if mode == 'cprofile':
+            profiler.disable()
+            _CPROFILE_LOCK.release()
+        else:
+            profiler.stop()
+
+        route = flask.request.url_rule.rule if flask.request.url_rule else 'unmatched'
+        name = re.sub(r'[^A-Za-z0-9_.-]+', '_', f'{flask.request.method}_{route}').strip('_')
+        stamp = f'{time.strftime("%Y%m%d-%H%M%S", time.localtime(started))}.{int(started * 1000) % 1000:03d}'
+        path = os.path.join(self.directory, f'{stamp}_{os.getpid()}_{threading.get_ident()}_{name}')
+
+        if mode == 'cprofile':
+            profiler.dump_stats(f'{path}.pstats')
+        else:
+            with open(f'{path}.collapsed', 'w') as file:
+                file.writelines(f'{stack} {count}\n' for stack, count in profiler.stacks.items())
+
+        self._prune()
+
+    def _prune(self):
+        '''
+        Deletes the oldest profiles over the retention limit.
+        '''
+        profiles = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.is_file()),
+            key = lambda entry: entry.stat().st_mtime
+        )
+        for entry in profiles[:max(len(profiles) - self.retention, 0)]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
@@ -0,0 +1,91 @@
+# Python deps & external libraries
+import time
+import functools
+import flask
+from typing import Callable
+
+# Imports for proper typing
+from .RequestContext import RequestContext
+
+class ServerTiming:
+    '''
+    Opt-in per-phase timing of the requests, reported in the standard `Server-Timing` response header.
+
+    Enabled for all the requests by config, or per request with the `X-Server-Timing` header and an admin API key (with its secret).
+    The phases are the middleware steps, the table lookup (`resolve`), the query argument parsing (`parse`), the request data
+    validation (`validate`), the SQL execution and fetching (`db`, with the number of round trips), the response encoding
+    (`serialize`) and the `total`. The phases can overlap (e.g. `validate` runs queries), the durations are in milliseconds.
+
+    Attributes:
+        enabled (bool): If all the requests are timed
+        admin_keys (frozenset): The API keys allowed to request the timings
+        secrets (dict): The API secrets by key
+    '''
+    HEADER = 'X-Server-Timing'
+
+    def __init__(self, enabled: bool, admin_keys: frozenset, secrets: dict):
+        self.enabled = enabled
+        self.admin_keys = admin_keys
+        self.secrets = secrets
+
+    def wants(self, context: RequestContext) -> bool:
+        '''
+        Checks if the request should be timed.
+
+        Args:
+            context (RequestContext): The request context
+        '''
+        if self.enabled:
+            return True
+
+        return self.HEADER in context.request.headers and context.is_admin(self.admin_keys, self.secrets)
+
+    @staticmethod
+    def record(context: RequestContext, name: str, seconds: float):
+        '''
+        Adds `seconds` to the phase `name` of a timed request.
+        '''
+        context.timings[name] = context.timings.get(name, 0.0) + seconds
+
+    @staticmethod
+    def timed(name: str) -> Callable:
+        '''
+        Decorator timing the decorated function as the phase `name`. Only a context lookup when the request isn't timed.
+
+        Args:
+            name (str): The phase name
+        '''
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                context = RequestContext.current()
+                if context is None or context.timings is None:
+                    return func(*args, **kwargs)
+
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    ServerTiming.record(context, name, time.perf_counter() - started)
+            return wrapper
+        return decorator
+
+    def apply(self, response: flask.Response) -> flask.Response:
+        '''
+        Adds the `Server-Timing` header to the response of a timed request. Registered as an `after_request` hook.
+
+        Args:
+            response (flask.Response): The response
+        '''
+        context = RequestContext.current()
+        if context is None or context.timings is None:
+            return response
+
+        stats = context.stats
+        metrics = [f'{name};dur={seconds * 1000:.3f}' for name, seconds in context.timings.items()]
+        metrics.append(f'db;desc="{stats.queries} queries";dur={stats.db_time * 1000:.3f}')
+        metrics.append(f'serialize;dur={stats.serialize_time * 1000:.3f}')
+        metrics.append(f'total;dur={(time.perf_counter() - context.started) * 1000:.3f}')
+
+        response.headers['Server-Timing'] = ', '.join(metrics)
+        return response
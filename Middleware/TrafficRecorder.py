@@ -0,0 +1,128 @@
+# Python deps & external libraries
+import time
+import random
+import logging
+import flask
+
+# Imports for proper typing
+from .RequestContext import RequestContext
+
+class TrafficRecorder:
+    '''
+    Records a sample of the requests as sanitized shapes, for replaying a production-like workload (`benchmarks/replay.py`).
+
+    A record holds the method, the route, the table, the primary key (numbers only), the query arguments (`args`, and the shapes of
+    `where` and the column filters in `filters`), the body size and shape,
+    the API key class (`admin`, `key`, `invalid` or `none`), the status and the duration. The keys and secrets are never recorded,
+    the filter values are reduced to their type and length and the body values to their types, e.g. `{"name": "str:8"}`.
+
+    Attributes:
+        logger (logging.Logger): The capture logger (JSON lines)
+        sample_rate (float): The fraction of the requests recorded
+        api_keys (frozenset): The valid API keys
+        admin_keys (frozenset): The admin API keys
+    '''
+    # The query arguments recorded as such, the other ones (`where` and the column filters) as shapes
+    STRUCTURAL_ARGS = frozenset(('order_by', 'sort', 'limit', 'offset', 'layout', 'format'))
+
+    def __init__(self, logger: logging.Logger, sample_rate: float, api_keys: frozenset, admin_keys: frozenset):
+        self.logger = logger
+        self.sample_rate = float(sample_rate)
+        self.api_keys = api_keys
+        self.admin_keys = admin_keys
+
+    @staticmethod
+    def shape(value: any) -> any:
+        '''
+        Reduces `value` to its type (and length for strings), keeping the structure of the dicts and lists.
+
+        Args:
+            value (any): The value
+
+        Returns:
+            any: The shape, e.g. `str:8`, `int` or `{"name": "str:8"}`
+        '''
+        match value:
+            case dict():
+                return {str(key): TrafficRecorder.shape(item) for key, item in value.items()}
+            case list() | tuple():
+                # The shape of the first item and the length, the items of a body are alike
+                return [len(value), TrafficRecorder.shape(value[0])] if value else [0]
+            case None:
+                return 'null'
+            case bool():
+                return 'bool'
+            case str():
+                return f'str:{len(value)}'
+            case _:
+                return type(value).__name__
+
+    def key_class(self, api_key: str) -> str:
+        if not api_key:
+            return 'none'
+        if api_key in self.admin_keys:
+            return 'admin'
+        return 'key' if api_key in self.api_keys else 'invalid'
+
+    def record(self, context: RequestContext, response: flask.Response) -> dict:
+        '''
+        Builds the capture record of a finished request.
+
+        Args:
+            context (RequestContext): The request context
+            response (flask.Response): The response
+
+        Returns:
+            dict: The capture record
+        '''
+        request = context.request
+        view_args = dict(request.view_args or {})
+        id = view_args.pop('id', None)
+
+        args = {key: value for key, value in request.args.items() if key in self.STRUCTURAL_ARGS}
+        filters = {key: self.shape(self._typed(value)) for key, value in request.args.items() if key not in self.STRUCTURAL_ARGS}
+
+        body = request.get_data(cache = True) if request.method in ('POST', 'PUT', 'PATCH') else b''
+        decoded = flask.g.get('decoded_body')
+
+        return {
+            # The start of the request (epoch seconds), the replay keeps the gaps between the requests
+            't': round(time.time() - (context.finished - context.started), 4),
+            'method': context.method,
+            'route': request.url_rule.rule if request.url_rule else None,
+            'path': request.path if request.url_rule is None else None,
+            'table': view_args.get('table'),
+            'id': id if id is None or str(id).isdigit() else self.shape(id),
+            'args': args,
+            'filters': filters,
+            'content_type': request.mimetype or None,
+            'body_bytes': len(body),
+            'body': self.shape(decoded) if decoded is not None else None,
+            'accept': request.headers.get('Accept'),
+            'key': self.key_class(context.api_key),
+            'status': response.status_code,
+            'ms': round((context.finished - context.started) * 1000, 3),
+        }
+
+    @staticmethod
+    def _typed(value: str) -> any:
+        '''
+        Gets the type a query argument value is meant as (the values are all strings).
+        '''
+        for cast in (int, float):
+            try:
+                return cast(value)
+            except ValueError:
+                pass
+        return value
+
+    def write(self, context: RequestContext, response: flask.Response):
+        '''
+        Records a sample of the finished requests. Registered as a `RequestPipeline.on_finish` callback.
+
+        Args:
+            context (RequestContext): The request context
+            response (flask.Response): The response
+        '''
+        if random.random() < self.sample_rate:
+            self.logger.info(self.record(context, response))
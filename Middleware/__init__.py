@@ -0,0 +1,10 @@
+from .RequestContext import RequestContext
+from .RequestPipeline import RequestPipeline
+from .OriginPolicy import OriginPolicy
+from .HybridLimiterStorage import HybridLimiterStorage
+from .QuotaManager import QuotaManager
+from .AccessLog import AccessLog
+from .ServerTiming import ServerTiming
+from .RequestProfiler import RequestProfiler
+from .MemoryTracker import MemoryTracker
+from .TrafficRecorder import TrafficRecorder
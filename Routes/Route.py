@@ -1,18 +1,28 @@
 # Python deps & external libraries
 from abc import ABC
+from typing import TYPE_CHECKING
 import flask
-from flask import jsonify
 
 # Imports for proper typing
-from Database import DatabaseManager
+from Database import DatabaseManager, DatabaseConnectionError
 from Logger import Logger
+from Codecs import CodecRegistry
+from .TableDescriptor import TableDescriptor
+
+# Imports for proper typing (RouteRegistry imports this module)
+if TYPE_CHECKING:
+    from .RouteRegistry import RouteRegistry
+
+# Server-Timing phases
+from Middleware import ServerTiming
 
 # Status codes
 from status import DATABASE_STATUS_MESSAGES as DB_STATUS_MESSAGES
 from status import API_STATUS_MESSAGES as API_STATUS_MESSAGES
+from status import DATABASE_STATUS_CODES as DB_STATUS_CODES
 
 # Constants
-from constants import API_PROTECTED_TABLES
+from constants import API_VALID_QUERY_ARGS
 
 class Route(ABC):
     '''
@@ -24,63 +34,79 @@ class Route(ABC):
         path (str): The route path
         callback (callable): The callback function
         method (str): The HTTP method
+        codecs (CodecRegistry): The request/response body codecs
+        registry (RouteRegistry): The route registry holding the table descriptors
     '''
-    def __init__(self, db_manager: DatabaseManager, db_logger: Logger, api_logger: Logger, path: str, method: str):
+    def __init__(self, db_manager: DatabaseManager, db_logger: Logger, api_logger: Logger, path: str, method: str, codecs: CodecRegistry, registry: 'RouteRegistry'):
         self.db_manager = db_manager
         self.db_logger = db_logger
         self.api_logger = api_logger
         self.path = path
         self.method = method
+        self.codecs = codecs
+        self.registry = registry
     
-    def _block_hidden_table(self, table: str) -> bool:
+    def _response(self, data: dict, status: int = None) -> flask.Response:
         '''
-        Checks if `table` is visible to the current request origin.
+        Encodes `data` in the content type negotiated with the client.
         
         Args:
-            table (str): The table name
+            data (dict): The response data
+            status (int, optional): The HTTP status code
         '''
-        return flask.g.table_visibility == 'hidden' and table in API_PROTECTED_TABLES
+        return self.codecs.make_response(data, status)
     
-    def _check_table_exists(self, table: str) -> bool:
+    def _result_response(self, result: dict) -> flask.Response:
         '''
-        Checks if the `table` exists in the database.
+        Encodes the database action `result`. A query cancelled by its statement timeout answers `504`, a failed connection `503`,
+        the other results keep their status in the body.
         
         Args:
-            table (str): The table name
+            result (dict): The result of the database action
+        '''
+        code = result.get('status', {}).get('code')
+        return self._response(result, code if code in (DB_STATUS_CODES['query_timeout'], DB_STATUS_CODES['connection_fail']) else None)
+    
+    def _request_data(self, request: flask.Request) -> any:
+        '''
+        Gets the decoded body of the `request`.
         
-        Returns:
-            bool: True if the table exists, False otherwise
+        Args:
+            request (flask.Request): The request object
         '''
-        return table in self.db_manager.get_table_names()
+        return self.codecs.decode_request(request)
     
-    def _before_db_action(self, table: str, query_args: dict):
+    @ServerTiming.timed('resolve')
+    def _resolve_table(self, table: str) -> tuple:
         '''
-        Executes common actions before the database action.
+        Looks up the precomputed descriptor of `table` and checks it can be accessed by the current request.
         
         Args:
             table (str): The table name
-            query_args (dict): The query arguments
-        '''
-        checks = [
-            (self._block_hidden_table, API_STATUS_MESSAGES['origin_not_allowed']),
-            (lambda t: not self._check_table_exists(t), DB_STATUS_MESSAGES['table_not_found'](table)),
-            # ... more checks if needed
-        ]
         
-        errors = []
+        Returns:
+            tuple: The `TableDescriptor` (None if the database can't be reached), and an error response or None
+        '''
+        try:
+            descriptor = self.registry.table(table)
+        except DatabaseConnectionError as e:
+            # The tables can't be told apart without the database
+            error_message = e.status
+            self.api_logger.error(error_message['message'])
+            return None, self._response({'success': False, 'status': error_message}, error_message['code'])
+        error_message = None
         
-        for check, error_message in checks:
-            if check(table):
-                self.api_logger.error(error_message['message'])
-                errors.append({'success': False, 'status': error_message})
+        if descriptor.protected and flask.g.request_context.table_visibility == 'hidden':
+            error_message = API_STATUS_MESSAGES['origin_not_allowed']
+        elif not descriptor.exists:
+            error_message = DB_STATUS_MESSAGES['table_not_found'](table)
         
-        if errors:
-            # Return the first found error
-            e = errors[0]
-            return jsonify(e), e['status']['code']
+        if error_message is None:
+            # all good -> continue
+            return descriptor, None
         
-        # all good -> continue
-        return
+        self.api_logger.error(error_message['message'])
+        return descriptor, self._response({'success': False, 'status': error_message}, error_message['code'])
     
     def _handle_query_exceptions(self, query_args: dict, rules: list):
         '''
@@ -94,14 +120,15 @@ class Route(ABC):
             if rule['condition'](query_args):
                 rule['action'](query_args)
     
-    def _parse_query_args(self, request: flask.Request, valid_args: list, table: str) -> dict:
+    @ServerTiming.timed('parse')
+    def _parse_query_args(self, request: flask.Request, valid_args: list, table: TableDescriptor) -> dict:
         '''
         Parses the query arguments from the `request`.
         
         Args:
             request (flask.Request): The request object
             valid_args (list): The list of valid query parameters
-            table (str): The queried table name for validation
+            table (TableDescriptor): The queried table for validation
         
         Returns:
             dict: The query arguments
@@ -115,7 +142,7 @@ class Route(ABC):
                 query_args[arg] = request.args.get(arg)
 
         # Get valid columns for the table
-        valid_columns = self.db_manager.get_column_names(table, self.db_manager.db_type)
+        valid_columns = table.columns
         
         # View all other args (not in valid_args) as parameters for where clauses.
         where_clauses = [
@@ -129,7 +156,7 @@ class Route(ABC):
             if key not in query_args and key not in valid_args_set and key not in valid_columns
         ]
         for key in invalid_keys:
-            error_message = API_STATUS_MESSAGES['invalid_query_arg'](key)
+            error_message = API_STATUS_MESSAGES['invalid_query_arg'](key, self.method, API_VALID_QUERY_ARGS)
             self.api_logger.warning(error_message['message'])
         
         if where_clauses:
@@ -137,13 +164,14 @@ class Route(ABC):
         
         return query_args
     
-    def _parse_data(self, data: dict, table: str, method: str = 'POST', primary_key_value: str = None) -> dict:
+    @ServerTiming.timed('validate')
+    def _parse_data(self, data: dict, table: TableDescriptor, method: str = 'POST', primary_key_value: str = None) -> dict:
         '''
         Parses and validates the incoming request's `data` against the `table`'s columns.
         
         Args:
             data (dict): The data to be validated
-            table (str): The table name for validation
+            table (TableDescriptor): The table for validation
             method (str): The HTTP method (POST, PUT, PATCH)
             primary_key_value (Any): The primary key value for fetching the existing record (PUT, PATCH)
         
@@ -174,7 +202,7 @@ class Route(ABC):
             
             existing_data = existing_record_check['data']
             if self._compare_data(existing_data, data):
-                warning_message = DB_STATUS_MESSAGES['nothing_to_update'](table, primary_key_value)
+                warning_message = DB_STATUS_MESSAGES['nothing_to_update'](table.name, primary_key_value)
                 return {'success': False, 'status': warning_message}
         
         return {'success': True, 'data': data}
@@ -182,54 +210,55 @@ class Route(ABC):
     # ------------------------------
     # Parse data helpers
     # ------------------------------
-    def _check_unique_fields(self, data: dict, table: str) -> dict:
-        unique_columns = self.db_manager.get_column_names(table, unique_fields=True)
-        for column in unique_columns:
+    def _check_unique_fields(self, data: dict, table: TableDescriptor) -> dict:
+        for column in table.unique_columns:
             if column in data:
                 query_args = {'where': f'{column} = {data[column]}'}
                 result = self.db_manager.select(
-                    table_name=table, 
+                    table_name=table.name, 
                     fields=[column], 
-                    query_args=query_args
+                    query_args=query_args,
+                    # A validation read, not rows of the action
+                    charge=False
                 )
                 
                 if result.get('success') and len(result.get('data')) > 0:
-                    error_message = DB_STATUS_MESSAGES['already_used'](column, table)
+                    error_message = DB_STATUS_MESSAGES['already_used'](column, table.name)
                     self.api_logger.error(error_message['message'])
                     return {'success': False, 'status': error_message}
         
         return {'success': True}
     
-    def _check_required_fields(self, data: dict, table: str) -> dict:
-        required_fields = self.db_manager.get_column_names(table, required_fields=True)
-        missing_fields = [field for field in required_fields if field not in data]
+    def _check_required_fields(self, data: dict, table: TableDescriptor) -> dict:
+        missing_fields = [field for field in table.required_columns if field not in data]
         
         if missing_fields:
-            error_message = DB_STATUS_MESSAGES['insert_fail'](data, table, f'Request Data is missing required fields of `{table}`. Missing fields: `{", ".join(missing_fields)}`')
+            error_message = DB_STATUS_MESSAGES['insert_fail'](data, table.name, f'Request Data is missing required fields of `{table.name}`. Missing fields: `{", ".join(missing_fields)}`')
             self.api_logger.error(error_message['message'])
             return {'success': False, 'status': error_message}
         
         return {'success': True}
     
-    def _check_invalid_columns(self, data: dict, table: str) -> dict:
-        valid_columns = self.db_manager.get_column_names(table)
-        invalid_columns = [col for col in data if col not in valid_columns]
+    def _check_invalid_columns(self, data: dict, table: TableDescriptor) -> dict:
+        invalid_columns = [col for col in data if col not in table.columns]
         
         if invalid_columns:
-            error_message = DB_STATUS_MESSAGES['invalid_fields'](invalid_columns, table, f'Columns do not exist in table. `{str(invalid_columns)}`')
+            error_message = DB_STATUS_MESSAGES['invalid_fields'](invalid_columns, table.name, f'Columns do not exist in table. `{str(invalid_columns)}`')
             self.api_logger.error(error_message['message'])
             return {'success': False, 'status': error_message}
         
         return {'success': True}
     
-    def _fetch_existing_record(self, table: str, primary_key_value: str) -> dict:
-        primary_key = self.db_manager.primary_key(table)
+    def _fetch_existing_record(self, table: TableDescriptor, primary_key_value: str) -> dict:
+        primary_key = table.primary_key
     
         query_args = {'where': f'{primary_key} = {primary_key_value}'}
         result = self.db_manager.select(
-            table_name=table,
+            table_name=table.name,
             fields=['*'],
-            query_args=query_args
+            query_args=query_args,
+            # A validation read, not rows of the action
+            charge=False
         )
         
         if result.get('success') and len(result.get('data')) > 0:
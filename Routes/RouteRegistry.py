@@ -0,0 +1,82 @@
+# Imports for proper typing
+from Database import DatabaseManager, IngestQueue
+from Logger import Logger
+from Codecs import CodecRegistry
+from .TableDescriptor import TableDescriptor
+
+# The route classes
+from .routes import Get, Post, Put, Delete, Export
+
+# Constants
+from constants import API_CORE_URL_PREFIX
+
+class RouteRegistry:
+    '''
+    Holds one route instance per HTTP method and the precomputed descriptors of the database tables.
+    Built once at startup, so a request is dispatched with a single lookup. The descriptors are built on the first lookup,
+    so building the registry doesn't connect to the database.
+
+    Attributes:
+        db_manager (DatabaseManager): The database manager
+        protected_tables (frozenset): The tables hidden from non-allowed origins
+        ingest (IngestQueue): The write-behind queue of the tables in async ingestion mode, None if no table is
+        get (Get): The GET & HEAD route
+        post (Post): The POST route
+        put (Put): The PUT & PATCH route
+        delete (Delete): The DELETE route
+        export (Export): The table export route
+    '''
+    def __init__(self, db_manager: DatabaseManager, db_logger: Logger, api_logger: Logger, codecs: CodecRegistry, protected_tables: frozenset, ingest: IngestQueue = None):
+        self.db_manager = db_manager
+        self.protected_tables = frozenset(protected_tables)
+        self.ingest = ingest
+        self.__tables = None
+
+        route_args = (db_logger, api_logger, codecs, self)
+        self.get = Get(db_manager, f'{API_CORE_URL_PREFIX}/<table>/<id>', *route_args)
+        self.post = Post(db_manager, f'{API_CORE_URL_PREFIX}/<table>', *route_args)
+        self.put = Put(db_manager, f'{API_CORE_URL_PREFIX}/<table>/<id>', *route_args)
+        self.delete = Delete(db_manager, f'{API_CORE_URL_PREFIX}/<table>/<id>', *route_args)
+        self.export = Export(db_manager, f'{API_CORE_URL_PREFIX}/<table>/_export', *route_args)
+
+    def refresh(self):
+        '''
+        (Re)builds the descriptors of all the tables in the database.
+        '''
+        self.__tables = {
+            table: TableDescriptor.describe(self.db_manager, table, self.protected_tables)
+            for table in self.db_manager.get_table_names()
+        }
+
+    def table(self, name: str) -> TableDescriptor:
+        '''
+        Gets the descriptor of the table `name`.
+
+        Args:
+            name (str): The table name
+
+        Returns:
+            TableDescriptor: The table descriptor. Unknown tables get a descriptor with `exists` set to False.
+        '''
+        if self.__tables is None:
+            self.refresh()
+
+        descriptor = self.__tables.get(name)
+
+        if descriptor is None:
+            descriptor = TableDescriptor.describe(self.db_manager, name, self.protected_tables)
+
+            # Only cache existing tables, so arbitrary table names in urls can't grow the cache
+            if descriptor.exists:
+                self.__tables[name] = descriptor
+
+        return descriptor
+
+    @property
+    def tables(self) -> dict:
+        '''
+        The descriptors of the known tables, keyed by the table names.
+        '''
+        if self.__tables is None:
+            self.refresh()
+        return dict(self.__tables)
@@ -0,0 +1,54 @@
+# Imports for proper typing
+from Database import DatabaseManager
+
+class TableDescriptor:
+    '''
+    Precomputed metadata of a table for the route dispatch.
+
+    Attributes:
+        name (str): The table name
+        exists (bool): If the table exists in the database
+        protected (bool): If the table is hidden from non-allowed origins
+        primary_key (str): The primary key column, or None
+        columns (frozenset): All the columns of the table
+        required_columns (tuple): The columns required on insert
+        unique_columns (tuple): The columns with a unique constraint
+    '''
+    __slots__ = ('name', 'exists', 'protected', 'primary_key', 'columns', 'required_columns', 'unique_columns')
+
+    def __init__(self, name: str, exists: bool, protected: bool, primary_key: str = None, columns: frozenset = frozenset(), required_columns: tuple = tuple(), unique_columns: tuple = tuple()):
+        self.name = name
+        self.exists = exists
+        self.protected = protected
+        self.primary_key = primary_key
+        self.columns = columns
+        self.required_columns = required_columns
+        self.unique_columns = unique_columns
+
+    @classmethod
+    def describe(cls, db_manager: DatabaseManager, table: str, protected_tables: frozenset) -> 'TableDescriptor':
+        '''
+        Builds the descriptor of `table` from the (cached) database metadata.
+
+        Args:
+            db_manager (DatabaseManager): The database manager
+            table (str): The table name
+            protected_tables (frozenset): The protected table names
+        '''
+        protected = table in protected_tables
+
+        if table not in db_manager.get_table_names():
+            return cls(table, False, protected)
+
+        return cls(
+            name = table,
+            exists = True,
+            protected = protected,
+            primary_key = db_manager.primary_key(table),
+            columns = frozenset(db_manager.get_column_names(table)),
+            required_columns = tuple(db_manager.get_column_names(table, required_fields=True)),
+            unique_columns = tuple(db_manager.get_column_names(table, unique_fields=True))
+        )
+
+    def __repr__(self) -> str:
+        return f'TableDescriptor(name={self.name!r}, exists={self.exists}, protected={self.protected}, primary_key={self.primary_key!r})'
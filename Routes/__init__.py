@@ -1 +1,3 @@
-from .Route import Route
\ No newline at end of file
+from .Route import Route
+from .TableDescriptor import TableDescriptor
+from .RouteRegistry import RouteRegistry
\ No newline at end of file
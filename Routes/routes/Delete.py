@@ -1,16 +1,22 @@
 # Python deps & external libraries
 import flask
-from flask import jsonify, request, g
+from typing import TYPE_CHECKING
+from flask import request, g
 
 # The abstract class for the routes
-from .. import Route
+from .. import Route, TableDescriptor
 
 # Imports for proper typing
 from Logger import Logger
 from Database import DatabaseManager
+from Codecs import CodecRegistry
+
+# Imports for proper typing (RouteRegistry imports this module)
+if TYPE_CHECKING:
+    from ..RouteRegistry import RouteRegistry
 
 # Constants
-from constants import API_VALID_QUERY_ARGS, API_PROTECTED_TABLES
+from constants import API_VALID_QUERY_ARGS
 
 class Delete(Route):
     '''
@@ -21,27 +27,26 @@ class Delete(Route):
         path (str): The route path
         db_logger (Logger): The database logger instance
         api_logger (Logger): The API logger instance
+        codecs (CodecRegistry): The request/response body codecs
+        registry (RouteRegistry): The route registry holding the table descriptors
     '''
-    def __init__(self, db_manager: DatabaseManager, path: str, db_logger: Logger, api_logger: Logger):
-        super().__init__(db_manager, db_logger, api_logger, path, 'DELETE')
+    def __init__(self, db_manager: DatabaseManager, path: str, db_logger: Logger, api_logger: Logger, codecs: CodecRegistry, registry: 'RouteRegistry'):
+        super().__init__(db_manager, db_logger, api_logger, path, 'DELETE', codecs, registry)
         
-    def _delete(self, table: str, query_args: dict):
+    def _delete(self, table: TableDescriptor, query_args: dict):
         '''
         Common logic for handling DELETE requests.
         
         Args:
-            table (str): The table name
-            pk (str): The primary key value
+            table (TableDescriptor): The table
+            query_args (dict): The query arguments
         '''
-        if self._before_db_action(table, query_args):
-            return self._before_db_action(table, query_args)
-
         result = self.db_manager.delete(
-            table_name = table, 
+            table_name = table.name, 
             query_args = query_args
         )
         
-        return jsonify(result)
+        return self._result_response(result)
     
     def delete_one(self, table: str, pk: str):
         '''
@@ -51,16 +56,20 @@ class Delete(Route):
             table (str): The table name
             pk (str): The primary key value
         '''
-        if not self.db_manager.primary_key(table) or not pk:
-            return jsonify({
+        descriptor, error = self._resolve_table(table)
+        if error:
+            return error
+        
+        if not descriptor.primary_key or not pk:
+            return self._response({
                 'success': False,
                 'message': 'Primary key not found for the table'
             })
             
         return self._delete(
-            table = table, 
+            table = descriptor, 
             query_args = {
                 # Only delete the record with the primary key for safety
-                'where': f'{self.db_manager.primary_key(table)} = {pk}'
+                'where': f'{descriptor.primary_key} = {pk}'
             }
         )
\ No newline at end of file
@@ -0,0 +1,88 @@
+# Python deps & external libraries
+import flask
+from typing import TYPE_CHECKING
+from flask import request, stream_with_context
+
+# The abstract class for the routes
+from .. import Route
+
+# Imports for proper typing
+from Logger import Logger
+from Database import DatabaseManager, QueryStats
+from Codecs import CodecRegistry, ArrowExport
+
+# Imports for proper typing (RouteRegistry imports this module)
+if TYPE_CHECKING:
+    from ..RouteRegistry import RouteRegistry
+
+from status import API_STATUS_MESSAGES
+
+# Constants
+from constants import API_VALID_EXPORT_ARGS, API_EXPORT_FORMATS, API_EXPORT_BATCH_SIZE
+
+class Export(Route):
+    '''
+    Handles the table export (Arrow IPC / Parquet) requests for the API.
+
+    Attributes:
+        db_manager (DatabaseManager): The database manager
+        path (str): The route path
+        db_logger (Logger): The database logger instance
+        api_logger (Logger): The API logger instance
+        codecs (CodecRegistry): The request/response body codecs
+        registry (RouteRegistry): The route registry holding the table descriptors
+    '''
+    def __init__(self, db_manager: DatabaseManager, path: str, db_logger: Logger, api_logger: Logger, codecs: CodecRegistry, registry: 'RouteRegistry'):
+        super().__init__(db_manager, db_logger, api_logger, path, 'GET', codecs, registry)
+
+    def _error(self, error_message: dict):
+        '''
+        Logs and returns the `error_message` response.
+
+        Args:
+            error_message (dict): The status message
+        '''
+        self.api_logger.error(error_message['message'])
+        return self._response({'success': False, 'status': error_message}, error_message['code'])
+
+    def export_table(self, table: str):
+        '''
+        Streams the whole `table` (optionally filtered and ordered) as an Arrow IPC stream or a Parquet file.
+
+        Args:
+            table (str): The table name
+        '''
+        descriptor, error = self._resolve_table(table)
+        if error:
+            return error
+
+        query_args = self._parse_query_args(request, API_VALID_EXPORT_ARGS, descriptor)
+
+        export_format = query_args.pop('format', None)
+        if export_format not in API_EXPORT_FORMATS:
+            return self._error(API_STATUS_MESSAGES['invalid_export_format'](export_format, API_EXPORT_FORMATS))
+
+        if not ArrowExport.available():
+            return self._error(API_STATUS_MESSAGES['export_unavailable'](export_format))
+
+        batches = self.db_manager.select_batches(
+            table_name = table,
+            fields = ['*'],
+            query_args = query_args,
+            batch_size = API_EXPORT_BATCH_SIZE
+        )
+        body = ArrowExport.export(export_format, batches, self.db_manager.get_column_types(table))
+
+        # The stream is consumed after the request, so keep reporting to this request's stats
+        stats = QueryStats.current()
+        if stats is not None:
+            body = stats.bind(body)
+
+        export_settings = ArrowExport.FORMATS[export_format]
+        return flask.Response(
+            stream_with_context(body),
+            mimetype = export_settings['mimetype'],
+            headers = {
+                'Content-Disposition': f'attachment; filename="{table}.{export_settings["extension"]}"'
+            }
+        )
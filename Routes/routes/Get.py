@@ -1,6 +1,7 @@
 # Python deps & external libraries
 import flask
-from flask import jsonify, request, g
+from typing import TYPE_CHECKING
+from flask import request, g
 
 # The abstract class for the routes
 from .. import Route
@@ -8,9 +9,15 @@ from .. import Route
 # Imports for proper typing
 from Logger import Logger
 from Database import DatabaseManager
+from Codecs import CodecRegistry
+
+# Imports for proper typing (RouteRegistry imports this module)
+if TYPE_CHECKING:
+    from ..RouteRegistry import RouteRegistry
 
 # Constants
-from constants import API_VALID_QUERY_ARGS, API_PROTECTED_TABLES
+from constants import API_VALID_QUERY_ARGS, API_RESPONSE_LAYOUTS
+from status import API_STATUS_MESSAGES
 
 class Get(Route):
     '''
@@ -21,9 +28,24 @@ class Get(Route):
         path (str): The route path
         db_logger (Logger): The database logger instance
         api_logger (Logger): The API logger instance
+        codecs (CodecRegistry): The request/response body codecs
+        registry (RouteRegistry): The route registry holding the table descriptors
     '''
-    def __init__(self, db_manager: DatabaseManager, path: str, db_logger: Logger, api_logger: Logger):
-        super().__init__(db_manager, db_logger, api_logger, path, 'GET')
+    def __init__(self, db_manager: DatabaseManager, path: str, db_logger: Logger, api_logger: Logger, codecs: CodecRegistry, registry: 'RouteRegistry'):
+        super().__init__(db_manager, db_logger, api_logger, path, 'GET', codecs, registry)
+        
+        # Query argument rules, applied in order
+        self.query_rules = (
+            { # Remove offset if limit is not provided
+                'condition': self._offset_without_limit_condition, 
+                'action': self._remove_offset_action
+            }, 
+            { # Set limit to None if limit is 0 or -1 (bypass hardcoded default limit)
+                'condition': self._limit_is_zero_condition,
+                'action': self._set_limit_to_none_action
+            }
+            # ... add more rules here
+        )
                 
     def _offset_without_limit_condition(self, query_args: dict) -> bool:
         '''
@@ -61,39 +83,36 @@ class Get(Route):
             query_args (dict): The query arguments
             pk (str, optional): The primary key value. Defaults to None.
         '''
-        if self._before_db_action(table, query_args):
-            return self._before_db_action(table, query_args)
+        descriptor, error = self._resolve_table(table)
+        if error:
+            return error
+        
+        query_args = self._parse_query_args(request, API_VALID_QUERY_ARGS['GET'], descriptor)
         
-        query_args = self._parse_query_args(request, API_VALID_QUERY_ARGS['GET'], table)
+        # The layout only shapes the response, it is not a query clause
+        layout = query_args.pop('layout', 'rows')
+        if layout not in API_RESPONSE_LAYOUTS:
+            error_message = API_STATUS_MESSAGES['invalid_layout'](layout, API_RESPONSE_LAYOUTS)
+            self.api_logger.error(error_message['message'])
+            return self._response({'success': False, 'status': error_message}, error_message['code'])
         
         if pk is not None:
-            primary_key = self.db_manager.primary_key(table)
-            if primary_key is None:
-                return jsonify({'error': 'Primary key not found'}), 400
-            query_args['where'] = f'{primary_key} = {pk}'
+            if descriptor.primary_key is None:
+                return self._response({'error': 'Primary key not found'}, 400)
+            query_args['where'] = f'{descriptor.primary_key} = {pk}'
         
         # Handle query exceptions
-        rules = [
-            { # Remove offset if limit is not provided
-                'condition': self._offset_without_limit_condition, 
-                'action': self._remove_offset_action
-            }, 
-            { # Set limit to None if limit is 0 or -1 (bypass hardcoded default limit)
-                'condition': self._limit_is_zero_condition,
-                'action': self._set_limit_to_none_action
-            }
-            # ... add more rules here
-        ]
-        self._handle_query_exceptions(query_args, rules)
+        self._handle_query_exceptions(query_args, self.query_rules)
         
         result = self.db_manager.select(
             table_name=table, 
             fields=['*'], 
             query_args=query_args,
-            with_fetch = True
+            with_fetch = True,
+            layout = layout
         )
         
-        return jsonify(result)
+        return self._result_response(result)
     
     def get_all(self, table: str, head: bool = True):
         '''
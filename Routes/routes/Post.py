@@ -1,16 +1,25 @@
 # Python deps & external libraries
 import flask
-from flask import jsonify, request, g
+from typing import TYPE_CHECKING
+from flask import request, g
 
 # The abstract class for the routes
-from .. import Route
+from .. import Route, TableDescriptor
 
 # Imports for proper typing
 from Logger import Logger
 from Database import DatabaseManager
+from Codecs import CodecRegistry
+
+# Imports for proper typing (RouteRegistry imports this module)
+if TYPE_CHECKING:
+    from ..RouteRegistry import RouteRegistry
+
+# Status codes
+from status import DATABASE_STATUS_MESSAGES as DB_STATUS_MESSAGES
 
 # Constants
-from constants import API_VALID_QUERY_ARGS, API_PROTECTED_TABLES
+from constants import API_VALID_QUERY_ARGS
 
 class Post(Route):
     '''
@@ -21,9 +30,11 @@ class Post(Route):
         path (str): The route path
         db_logger (Logger): The database logger instance
         api_logger (Logger): The API logger instance
+        codecs (CodecRegistry): The request/response body codecs
+        registry (RouteRegistry): The route registry holding the table descriptors
     '''
-    def __init__(self, db_manager: DatabaseManager, path: str, db_logger: Logger, api_logger: Logger):
-        super().__init__(db_manager, db_logger, api_logger, path, 'POST')
+    def __init__(self, db_manager: DatabaseManager, path: str, db_logger: Logger, api_logger: Logger, codecs: CodecRegistry, registry: 'RouteRegistry'):
+        super().__init__(db_manager, db_logger, api_logger, path, 'POST', codecs, registry)
         
     def _insert(self, table: str, query_args: dict, data: dict):
         '''
@@ -34,16 +45,21 @@ class Post(Route):
             query_args (dict): The query arguments
             data (dict): The data to be inserted
         '''
-        if self._before_db_action(table, query_args):
-            return self._before_db_action(table, query_args)
+        descriptor, error = self._resolve_table(table)
+        if error:
+            return error
+        
+        query_args = self._parse_query_args(request, API_VALID_QUERY_ARGS['POST'], descriptor)
         
-        query_args = self._parse_query_args(request, API_VALID_QUERY_ARGS['POST'], table)
+        ingest = self.registry.ingest
+        if ingest is not None and ingest.accepts(table):
+            return self._enqueue(descriptor, data)
         
         # Parse and validate the data
-        parsed_data = self._parse_data(data, table, method = 'POST')
+        parsed_data = self._parse_data(data, descriptor, method = 'POST')
         
         if not parsed_data.get('success'):
-            return jsonify(parsed_data)
+            return self._response(parsed_data)
         
         result = self.db_manager.insert(
             table_name = table,
@@ -51,7 +67,51 @@ class Post(Route):
             query_args = query_args
         )
 
-        return jsonify(result)
+        return self._result_response(result)
+
+    def _enqueue(self, descriptor: TableDescriptor, data: dict):
+        '''
+        Queues the row for the batched insertion of the async ingestion tables, answering `202` with its ticket.
+        The row is validated against the cached table descriptor only: the unique columns are checked on insertion.
+        
+        Args:
+            descriptor (TableDescriptor): The table
+            data (dict): The data to be inserted
+        '''
+        for check in (self._check_invalid_columns, self._check_required_fields):
+            result = check(data, descriptor)
+            if not result['success']:
+                return self._response(result)
+        
+        ticket = self.registry.ingest.submit(descriptor.name, data)
+        if ticket is None:
+            status = DB_STATUS_MESSAGES['ingest_queue_full'](descriptor.name)
+            self.api_logger.error(status['message'])
+            return self._response({'success': False, 'status': status}, status['code'])
+        
+        status = DB_STATUS_MESSAGES['insert_queued'](descriptor.name, ticket)
+        return self._response({'success': True, 'status': status, 'ticket': ticket}, status['code'])
+    
+    def ingest_status(self, table: str, ticket: str):
+        '''
+        Handles the GET requests for the status of a queued row: `committed` once it is durable.
+        
+        Args:
+            table (str): The table name
+            ticket (str): The ticket returned by the POST
+        '''
+        descriptor, error = self._resolve_table(table)
+        if error:
+            return error
+        
+        ingest = self.registry.ingest
+        entry = ingest.status(ticket) if ingest is not None else None
+        if entry is None or entry['table'] != descriptor.name:
+            issued_elsewhere = entry is None and ingest is not None and not ingest.issued_here(ticket)
+            status = DB_STATUS_MESSAGES['ticket_other_process' if issued_elsewhere else 'ticket_not_found'](ticket)
+            return self._response({'success': False, 'status': status}, status['code'])
+        
+        return self._response({'success': True, **entry}, 200)
 
     def insert_one(self, table: str):
         '''
@@ -63,5 +123,5 @@ class Post(Route):
         return self._insert(
             table = table, 
             query_args = request.args,
-            data = request.get_json()
+            data = self._request_data(request)
         )
\ No newline at end of file
@@ -1,18 +1,24 @@
 # Python deps & external libraries
 import flask
-from flask import jsonify, request, g
+from typing import TYPE_CHECKING
+from flask import request, g
 
 # The abstract class for the routes
-from .. import Route
+from .. import Route, TableDescriptor
 
 # Imports for proper typing
 from Logger import Logger
 from Database import DatabaseManager
+from Codecs import CodecRegistry
+
+# Imports for proper typing (RouteRegistry imports this module)
+if TYPE_CHECKING:
+    from ..RouteRegistry import RouteRegistry
 
 from status import API_STATUS_MESSAGES as STATUS_MESSAGES
 
 # Constants
-from constants import API_VALID_QUERY_ARGS, API_PROTECTED_TABLES
+from constants import API_VALID_QUERY_ARGS
 
 class Put(Route):
     '''
@@ -23,34 +29,33 @@ class Put(Route):
         path (str): The route path
         db_logger (Logger): The database logger instance
         api_logger (Logger): The API logger instance
+        codecs (CodecRegistry): The request/response body codecs
+        registry (RouteRegistry): The route registry holding the table descriptors
     '''
-    def __init__(self, db_manager: DatabaseManager, path: str, db_logger: Logger, api_logger: Logger):
-        super().__init__(db_manager, db_logger, api_logger, path, 'PUT')
+    def __init__(self, db_manager: DatabaseManager, path: str, db_logger: Logger, api_logger: Logger, codecs: CodecRegistry, registry: 'RouteRegistry'):
+        super().__init__(db_manager, db_logger, api_logger, path, 'PUT', codecs, registry)
         
-    def _update(self, table: str, query_args: dict, data: dict, pk: str = None):
+    def _update(self, table: TableDescriptor, query_args: dict, data: dict, pk: str = None):
         '''
         Common logic for handling PUT requests.
         
         Args:
-            table (str): The table name
+            table (TableDescriptor): The table
             query_args (dict): The query arguments
             data (dict): The data to be updated
         '''
-        if self._before_db_action(table, query_args):
-            return self._before_db_action(table, query_args)
-        
         # Parse and validate the data
         parsed_data = self._parse_data(data, table, method = 'PUT', primary_key_value = pk)
         if not parsed_data['success']:
-            return jsonify(parsed_data)
+            return self._response(parsed_data)
         
         result = self.db_manager.update(
-            table_name = table,
+            table_name = table.name,
             data = parsed_data['data'],
             query_args = query_args
         )
         
-        return jsonify(result)
+        return self._result_response(result)
         
     def update_one(self, table: str, pk: str):
         '''
@@ -60,12 +65,16 @@ class Put(Route):
             table (str): The table name
             pk (str): The primary key value
         '''
+        descriptor, error = self._resolve_table(table)
+        if error:
+            return error
+        
         return self._update(
-            table = table, 
+            table = descriptor, 
             query_args = {
                 # Only update the record with the primary key for safety
-                'where': f'{self.db_manager.primary_key(table)} = {pk}'
+                'where': f'{descriptor.primary_key} = {pk}'
             }, 
-            data = request.get_json(),
+            data = self._request_data(request),
             pk = pk
         )
\ No newline at end of file
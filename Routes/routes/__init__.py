@@ -1,4 +1,5 @@
 from .Delete import Delete
+from .Export import Export
 from .Get import Get
 from .Post import Post
 from .Put import Put
\ No newline at end of file
@@ -0,0 +1,223 @@
+# Python deps & external libraries
+import os
+import sys
+import time
+import signal
+import socket
+import logging
+
+# The listener threads of the loggers are restarted in the workers, and write the files of their worker
+from Logger import Logger
+
+class Supervisor:
+    '''
+    Serves the app with a pool of forked waitress worker processes, sharing one listening socket, so the requests are spread over
+    all the CPU cores instead of being capped by the GIL of one process.
+
+    The parent binds the socket, runs the `before_fork` hooks (e.g. closes its database connection, the parent doesn't serve) and
+    forks the workers. Each worker runs the `after_fork` hooks (e.g. opens its own database connection) and serves with `threads`
+    threads, and the `on_exit` hooks when it stops (e.g. flushes the queued writes: the workers exit without the `atexit` hooks).
+    The loggers restart their listener threads in the workers on their own (`Logger._after_fork`), and each worker writes its own
+    log files, suffixed with its slot (`Logger.set_worker`, e.g. `logs/api/api_logger.worker0.log`): a file is only appended to
+    and rotated by one process, the worker restarted in a slot goes on with its file, and the parent keeps the unsuffixed files.
+    The slot of a worker is also set as `Supervisor.worker_slot` in its process, e.g. for the `worker` label of its metrics.
+    The parent restarts the workers that exit, waiting longer after each crash of a worker that didn't get past its startup,
+    and stops them all on `SIGTERM` / `SIGINT`.
+
+    Forking is only available on POSIX systems.
+
+    Attributes:
+        app (Flask): The WSGI app
+        host (str): The listening host
+        port (int): The listening port
+        workers (int): The number of worker processes
+        threads (int): The waitress threads of each worker
+        logger (logging.Logger): The server logger
+        before_fork (tuple): Callables run in the parent, once, before the first fork
+        after_fork (tuple): Callables run in each worker, after the fork
+        on_exit (tuple): Callables run in each worker, when it stops
+    '''
+    DEFAULT_HOST = '0.0.0.0'
+    DEFAULT_PORT = 8080
+    BACKLOG = 1024
+
+    # The restart delay of a worker crashing on startup, doubled on each crash up to `MAX_BACKOFF`
+    MIN_BACKOFF = 1.0
+    MAX_BACKOFF = 30.0
+    # A worker exiting after running this long is restarted right away
+    STABLE_AFTER = 10.0
+    # The seconds the workers get to finish their requests on shutdown, before they are killed
+    SHUTDOWN_TIMEOUT = 10.0
+    POLL_INTERVAL = 0.2
+
+    # The slot of the worker process, None in the parent
+    worker_slot = None
+
+    def __init__(self, app, host: str, port: int, workers: int, threads: int, logger: logging.Logger, before_fork: tuple = (), after_fork: tuple = (), on_exit: tuple = ()):
+        self.app = app
+        self.host = host or self.DEFAULT_HOST
+        self.port = int(port or self.DEFAULT_PORT)
+        self.workers = workers
+        self.threads = threads
+        self.logger = logger
+        self.before_fork = tuple(before_fork)
+        self.after_fork = tuple(after_fork)
+        self.on_exit = tuple(on_exit)
+
+        self.__socket = None
+        self.__stopping = False
+        # The running workers (pid -> slot, start time), and the restart time and delay of each slot
+        self.__running = {}
+        self.__restart_at = {}
+        self.__backoff = {}
+
+    @staticmethod
+    def worker_count(value: any) -> int:
+        '''
+        Gets the number of worker processes of `WAITRESS_WORKERS`.
+
+        Args:
+            value (any): A number, or `auto` for the number of CPUs
+
+        Returns:
+            int: The number of workers, 1 if the system can't fork
+        '''
+        if not hasattr(os, 'fork'):
+            return 1
+        if value is None or str(value).strip().lower() in ('', 'auto'):
+            return os.cpu_count() or 1
+        return max(int(value), 1)
+
+    def run(self):
+        '''
+        Binds the socket, starts the workers and supervises them until `SIGTERM` / `SIGINT`.
+        '''
+        self.__socket = self._bind()
+        for hook in self.before_fork:
+            hook()
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        self.logger.info(f'Serving on http://{self.host}:{self.port} with {self.workers} workers of {self.threads or "default"} threads.')
+        for slot in range(self.workers):
+            self._spawn(slot)
+
+        try:
+            while not self.__stopping:
+                self._reap()
+                self._restart_due()
+                time.sleep(self.POLL_INTERVAL)
+        finally:
+            self._shutdown()
+            self.__socket.close()
+
+    def _bind(self) -> socket.socket:
+        family = socket.AF_INET6 if ':' in self.host else socket.AF_INET
+        return socket.create_server((self.host, self.port), family = family, backlog = self.BACKLOG)
+
+    def _stop(self, signum: int, frame: any):
+        self.__stopping = True
+
+    def _spawn(self, slot: int):
+        '''
+        Forks the worker of `slot`. The child never returns from here.
+        '''
+        pid = os.fork()
+        if pid == 0:
+            os._exit(self._work(slot))
+
+        self.__running[pid] = (slot, time.monotonic())
+        self.logger.info(f'Worker {slot} started (pid {pid}).')
+
+    def _work(self, slot: int) -> int:
+        '''
+        Runs in the forked worker: serves the app on the shared socket until stopped.
+
+        Returns:
+            int: The exit code of the worker
+        '''
+        # Stop serving (and finish the running requests) on the signals of the parent or the terminal
+        def stop(signum: int, frame: any):
+            raise SystemExit(0)
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        Supervisor.worker_slot = slot
+        Logger.set_worker(slot)
+
+        code = 0
+        try:
+            from waitress import create_server
+
+            for hook in self.after_fork:
+                hook()
+
+            options = {'threads': self.threads} if self.threads else {}
+            create_server(self.app, sockets = [self.__socket], **options).run()
+        except SystemExit:
+            pass
+        except BaseException:
+            self.logger.exception(f'Worker {slot} (pid {os.getpid()}) crashed.')
+            code = 1
+        finally:
+            for hook in self.on_exit:
+                try:
+                    hook()
+                except Exception:
+                    self.logger.exception(f'Worker {slot} (pid {os.getpid()}) exit hook failed.')
+            sys.stdout.flush()
+            Logger.stop_all()
+        return code
+
+    def _reap(self):
+        '''
+        Collects the exited workers and schedules their restarts.
+        '''
+        while self.__running:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+
+            slot, started = self.__running.pop(pid)
+            ran = time.monotonic() - started
+            code = os.waitstatus_to_exitcode(status)
+            if self.__stopping:
+                continue
+
+            # A worker that ran for a while is restarted right away, one crashing on startup waits longer each time
+            delay = 0.0 if ran >= self.STABLE_AFTER else self.__backoff.get(slot, self.MIN_BACKOFF)
+            self.__backoff[slot] = self.MIN_BACKOFF if ran >= self.STABLE_AFTER else min(delay * 2, self.MAX_BACKOFF)
+            self.__restart_at[slot] = time.monotonic() + delay
+            self.logger.warning(f'Worker {slot} (pid {pid}) exited with code {code} after {ran:.1f}s, restarting in {delay:.1f}s.')
+
+    def _restart_due(self):
+        now = time.monotonic()
+        for slot, restart_at in list(self.__restart_at.items()):
+            if restart_at <= now:
+                del self.__restart_at[slot]
+                self._spawn(slot)
+
+    def _shutdown(self):
+        '''
+        Stops the workers: `SIGTERM` first, `SIGKILL` for the ones still running after `SHUTDOWN_TIMEOUT`.
+        '''
+        self.logger.info(f'Stopping {len(self.__running)} workers.')
+        for pid in self.__running:
+            self._signal(pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + self.SHUTDOWN_TIMEOUT
+        while self.__running and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(self.POLL_INTERVAL)
+
+        for pid in self.__running:
+            self._signal(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self.__running.clear()
+
+    @staticmethod
+    def _signal(pid: int, signum: int):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
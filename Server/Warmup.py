@@ -0,0 +1,103 @@
+# Python deps & external libraries
+import time
+import logging
+import threading
+
+# Imports for proper typing
+from Database import Database, DatabaseManager
+from Routes import RouteRegistry
+
+class Warmup:
+    '''
+    Warms the app up before it takes traffic, so the first requests after a deploy don't pay for the cold paths: opens the
+    database connection, loads the metadata of every table (the route registry's table descriptors), renders the common query
+    templates of each table and runs the configured warm queries (e.g. to load the hot tables into the database's caches).
+
+    `ready` is set once the warmup has run (right away when it's disabled), `/ready` answers 503 until then.
+    A failed warmup is logged and can be run again.
+
+    Attributes:
+        database (Database): The database
+        db_manager (DatabaseManager): The database manager
+        routes (RouteRegistry): The route registry
+        logger (logging.Logger): The logger
+        queries (tuple): The warm queries, SELECT statements only
+        ready (threading.Event): Set once the warmup has run
+        report (dict): The duration of each step, None until the warmup has run
+    '''
+    def __init__(self, database: Database, db_manager: DatabaseManager, routes: RouteRegistry, logger: logging.Logger, queries: tuple = (), enabled: bool = True):
+        self.database = database
+        self.db_manager = db_manager
+        self.routes = routes
+        self.logger = logger
+        self.queries = tuple(query.strip() for query in queries if query.strip() and self._is_select(query))
+        self.ready = threading.Event()
+        self.report = None
+
+        self.__lock = threading.Lock()
+        self.__thread = None
+
+        if not enabled:
+            self.report = {'enabled': False}
+            self.ready.set()
+
+    def run(self) -> dict:
+        '''
+        Runs the warmup, once: the calls after a successful run return its report.
+
+        Returns:
+            dict: The report, None if the warmup failed
+        '''
+        with self.__lock:
+            if self.ready.is_set():
+                return self.report
+
+            started = time.perf_counter()
+            try:
+                report = {
+                    'connect_ms': self._timed(lambda: self.database.connection),
+                    'metadata_ms': self._timed(self.routes.refresh),
+                    'templates_ms': self._timed(self._render_templates),
+                    'queries_ms': self._timed(self._run_queries),
+                }
+            except Exception as e:
+                self.logger.error(f'Warmup failed after {(time.perf_counter() - started) * 1000:.1f}ms: {e}')
+                return None
+
+            report['tables'] = len(self.routes.tables)
+            report['queries'] = len(self.queries)
+            report['total_ms'] = round((time.perf_counter() - started) * 1000, 3)
+            self.report = report
+            self.ready.set()
+
+        self.logger.info(f'Warmup done in {report["total_ms"]:.1f}ms ({report["tables"]} tables, {report["queries"]} warm queries).')
+        return report
+
+    def start(self):
+        '''
+        Runs the warmup in a background thread, unless it has run or is running.
+        '''
+        if self.ready.is_set() or (self.__thread is not None and self.__thread.is_alive()):
+            return
+        self.__thread = threading.Thread(target = self.run, name = 'warmup', daemon = True)
+        self.__thread.start()
+
+    @staticmethod
+    def _timed(step: callable) -> float:
+        started = time.perf_counter()
+        step()
+        return round((time.perf_counter() - started) * 1000, 3)
+
+    def _render_templates(self):
+        for descriptor in self.routes.tables.values():
+            self.db_manager.render_query_templates(descriptor.name, sorted(descriptor.columns), descriptor.primary_key)
+
+    def _is_select(self, query: str) -> bool:
+        if query.split(None, 1)[0].lower() != 'select':
+            self.logger.warning(f'Skipped the warm query `{query.strip()}`, only SELECT statements are run.')
+            return False
+        return True
+
+    def _run_queries(self):
+        for query in self.queries:
+            self.database.query(query, query_arguments = {}, with_body = False)
@@ -0,0 +1,2 @@
+from .Supervisor import Supervisor
+from .Warmup import Warmup
@@ -0,0 +1,7 @@
+# ------------------------------------- #
+#                                       #
+# Benchmarks of the API.                #
+# Run from the repository root, e.g.    #
+# python -m benchmarks.e2e --help       #
+#                                       #
+# ------------------------------------- #
@@ -0,0 +1,306 @@
+'''
+End-to-end HTTP benchmarks: every route of `index.py`, against the seeded SQLite fixture, through the WSGI test client
+(the app alone) and through a real waitress server (the app, the WSGI server and the HTTP stack).
+
+Each scenario runs for `--duration` seconds per table and concurrency level, with one thread and one connection per concurrent
+client. The throughput and the p50/p95/p99 latencies are printed and written as JSON, to compare across releases.
+
+    python -m benchmarks.e2e --sizes 10k,1m --transports client,waitress --concurrency 1,4,16 --out benchmarks/results/e2e.json
+'''
+# Python deps & external libraries
+import os
+import sys
+import json
+import time
+import logging
+import queue
+import uuid
+import random
+import sqlite3
+import argparse
+import threading
+import itertools
+import http.client
+
+from . import fixture
+from .stats import summarize, write_results
+
+API_KEY = 'bench'
+API_SECRET = 'bench-secret'
+ORIGIN = 'http://localhost'
+HEADERS = {'X-API-KEY': API_KEY, 'X-API-SECRET': API_SECRET, 'Origin': ORIGIN}
+JSON_HEADERS = {**HEADERS, 'Content-Type': 'application/json'}
+
+# Some failures are answered with a 200 and `"success": false`, both count as errors
+FAILED_BODY = b'"success":false'
+
+# In order: the writes reuse the ids of the reads' table, `delete` removes the rows created by `post`
+SCENARIOS = ('list', 'list_columnar', 'one', 'head', 'export', 'put', 'patch', 'post', 'delete')
+
+def configure(db_path: str, environ: dict = None):
+    '''
+    Sets the environment of the app for the benchmarks. Must run before `index` is imported, the config is read on import.
+
+    Args:
+        db_path (str): The fixture database
+        environ (dict, optional): Extra environment variables, overriding the defaults
+    '''
+    os.environ.update({
+        'APP_ENV': 'production',
+        'APP_NAME': 'crud-benchmarks',
+        'LOG_LEVEL': 'WARNING',
+        'DB_CONNECTION': 'sqlite',
+        'DB_DATABASE': os.path.abspath(db_path),
+        'API_KEYS': API_KEY,
+        'API_SECRETS': f'{API_KEY}:{API_SECRET}',
+        'API_ADMIN_KEYS': API_KEY,
+        'API_ALLOWED_ORIGINS': ORIGIN,
+        'API_PROTECTED_TABLES': '',
+        'API_STORAGE_URI': '',
+        'API_LIMITS_PER_MINUTE': '100000000',
+        'API_LIMITS_PER_HOUR': '100000000',
+        'API_LIMITS_PER_DAY': '100000000',
+        **(environ or {}),
+    })
+
+def load_app(db_path: str, environ: dict = None):
+    '''
+    Builds the Flask app against the fixture database.
+
+    Returns:
+        flask.Flask: The app
+    '''
+    configure(db_path, environ)
+    # The repository root holds the top level modules of the app
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import index
+    return index.app
+
+class TestClientTransport:
+    '''
+    Sends the requests through the Flask test client, in process: measures the app without any HTTP stack.
+    '''
+    name = 'client'
+
+    def __init__(self, app):
+        self.app = app
+
+    def session(self):
+        client = self.app.test_client()
+
+        def send(method: str, path: str, body: bytes = None) -> tuple[int, bytes]:
+            response = client.open(path, method = method, headers = JSON_HEADERS if body is not None else HEADERS, data = body)
+            data = response.get_data()
+            response.close()
+            return response.status_code, data
+
+        return send
+
+    def close(self):
+        pass
+
+class WaitressTransport:
+    '''
+    Serves the app with waitress on a free local port, and sends the requests over keep-alive HTTP connections.
+    '''
+    name = 'waitress'
+
+    def __init__(self, app, threads: int):
+        from waitress import create_server
+
+        # Queued requests are expected under load, don't warn about each one
+        logging.getLogger('waitress.queue').setLevel(logging.ERROR)
+        self.server = create_server(app, host = '127.0.0.1', port = 0, threads = threads, connection_limit = max(threads * 2, 100))
+        self.port = self.server.effective_port
+        self.closing = False
+        self.thread = threading.Thread(target = self._serve, name = 'bench-waitress', daemon = True)
+        self.thread.start()
+
+    def _serve(self):
+        try:
+            self.server.run()
+        except OSError:
+            # The listening socket is closed under the event loop on `close`
+            if not self.closing:
+                raise
+
+    def session(self):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout = 60)
+
+        def send(method: str, path: str, body: bytes = None) -> tuple[int, bytes]:
+            connection.request(method, path, body = body, headers = JSON_HEADERS if body is not None else HEADERS)
+            response = connection.getresponse()
+            return response.status, response.read()
+
+        return send
+
+    def close(self):
+        self.closing = True
+        self.server.close()
+        self.thread.join(timeout = 5)
+
+class Scenarios:
+    '''
+    Builds the requests of each scenario for one table.
+
+    Attributes:
+        table (str): The table name
+        size (int): The number of fixture rows
+        prefix (str): The prefix of the emails of the rows created by `post`
+    '''
+    def __init__(self, table: str, size: int, db_path: str):
+        self.table = table
+        self.size = size
+        self.db_path = db_path
+        self.prefix = f'bench-{uuid.uuid4().hex[:12]}'
+        self.__counter = itertools.count()
+        self.__deletable = queue.SimpleQueue()
+
+    def prepare(self, scenario: str):
+        '''
+        Collects the rows created by `post`, before running `delete`.
+        '''
+        if scenario != 'delete':
+            return
+        self.__deletable = queue.SimpleQueue()
+        connection = sqlite3.connect(self.db_path)
+        try:
+            for (id,) in connection.execute(f"SELECT id FROM {self.table} WHERE email LIKE ?", (f'{self.prefix}-%',)):
+                self.__deletable.put(id)
+        finally:
+            connection.close()
+
+    def request(self, scenario: str, rng: random.Random) -> tuple:
+        '''
+        Gets the next request of `scenario`.
+
+        Returns:
+            tuple: The method, path and body, or None when the scenario has no requests left
+        '''
+        base = f'/api/v1/{self.table}'
+        match scenario:
+            case 'list':
+                return 'GET', f'{base}?limit=100&offset={rng.randrange(max(self.size - 100, 1))}', None
+            case 'list_columnar':
+                return 'GET', f'{base}?limit=100&offset={rng.randrange(max(self.size - 100, 1))}&layout=columnar', None
+            case 'one':
+                return 'GET', f'{base}/{rng.randint(1, self.size)}', None
+            case 'head':
+                return 'HEAD', f'{base}?limit=100', None
+            case 'export':
+                # 1% of the table, so the 10M row table doesn't turn one request into the whole run
+                return 'GET', f'{base}/_export?format=arrow&bucket={rng.randrange(fixture.BUCKETS)}', None
+            case 'put':
+                body = {'name': f'put {rng.random()}', 'score': 1.0, 'active': 1}
+                return 'PUT', f'{base}/{rng.randint(1, self.size)}', json.dumps(body).encode()
+            case 'patch':
+                return 'PATCH', f'{base}/{rng.randint(1, self.size)}', json.dumps({'score': rng.random()}).encode()
+            case 'post':
+                body = {'name': 'post', 'email': f'{self.prefix}-{next(self.__counter)}@example.com', 'score': 0.0, 'active': 1}
+                return 'POST', base, json.dumps(body).encode()
+            case 'delete':
+                try:
+                    return 'DELETE', f'{base}/{self.__deletable.get_nowait()}', None
+                except queue.Empty:
+                    return None
+        raise ValueError(f'Unknown scenario `{scenario}`')
+
+def run_scenario(transport, scenarios: Scenarios, scenario: str, concurrency: int, duration: float, warmup: float) -> dict:
+    '''
+    Runs `scenario` with `concurrency` clients for `duration` seconds, after `warmup` seconds of unmeasured requests.
+
+    Returns:
+        dict: The summary of the run
+    '''
+    scenarios.prepare(scenario)
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency + 1)
+    window = {}
+
+    def client(number: int):
+        send = transport.session()
+        # Seeded per run: repeating the values of a previous run would turn the updates into `nothing_to_update` warnings
+        rng = random.Random(f'{scenarios.prefix}-{scenario}-{concurrency}-{number}')
+        local, failed = [], 0
+        barrier.wait()
+
+        while time.perf_counter() < window['end']:
+            request = scenarios.request(scenario, rng)
+            if request is None:
+                break
+            started = time.perf_counter()
+            status, body = send(*request)
+            finished = time.perf_counter()
+            if started >= window['start']:
+                local.append(finished - started)
+                failed += status >= 400 or FAILED_BODY in body
+
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target = client, args = (number,), daemon = True) for number in range(concurrency)]
+    for thread in threads:
+        thread.start()
+
+    # The writes are not warmed up: `delete` only has the rows created by `post`
+    warmup = warmup if scenario not in ('post', 'delete') else 0
+    window['start'] = time.perf_counter() + warmup
+    window['end'] = window['start'] + duration
+    barrier.wait()
+    for thread in threads:
+        thread.join()
+
+    elapsed = min(time.perf_counter(), window['end']) - window['start']
+    return summarize(latencies, elapsed, errors[0])
+
+def print_result(result: dict):
+    latency = result['latency_ms']
+    print(
+        f"{result['transport']:<9} {result['table']:<11} {result['scenario']:<14} c={result['concurrency']:<3} "
+        f"{result['throughput'] or 0:>9.1f} req/s  p50 {latency['p50'] or 0:>8.2f}ms  p95 {latency['p95'] or 0:>8.2f}ms  "
+        f"p99 {latency['p99'] or 0:>8.2f}ms  errors {result['errors']}"
+    )
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description = 'End-to-end HTTP benchmarks of the API against a seeded SQLite fixture.')
+    parser.add_argument('--db', default = 'benchmarks/bench.db', help = 'The fixture database (default: %(default)s)')
+    parser.add_argument('--sizes', default = '10k', help = 'Comma separated table sizes (default: %(default)s), e.g. 10k,1m,10m')
+    parser.add_argument('--transports', default = 'client,waitress', help = 'client and/or waitress (default: %(default)s)')
+    parser.add_argument('--scenarios', default = ','.join(SCENARIOS), help = 'Comma separated scenarios (default: all)')
+    parser.add_argument('--concurrency', default = '1,4,16', help = 'Comma separated concurrency levels (default: %(default)s)')
+    parser.add_argument('--duration', type = float, default = 5.0, help = 'Measured seconds per run (default: %(default)s)')
+    parser.add_argument('--warmup', type = float, default = 1.0, help = 'Unmeasured seconds before each run (default: %(default)s)')
+    parser.add_argument('--out', default = None, help = 'The JSON results file (default: benchmarks/results/e2e-<time>.json)')
+    args = parser.parse_args(argv)
+
+    tables = fixture.create_fixture(args.db, args.sizes.split(','))
+    app = load_app(args.db)
+
+    concurrency_levels = [int(level) for level in args.concurrency.split(',')]
+    scenario_names = [name for name in SCENARIOS if name in args.scenarios.split(',')]
+    results = []
+
+    for transport_name in args.transports.split(','):
+        transport = TestClientTransport(app) if transport_name == 'client' else WaitressTransport(app, max(concurrency_levels))
+        try:
+            for table, size in tables.items():
+                scenarios = Scenarios(table, size, args.db)
+                for scenario in scenario_names:
+                    for concurrency in concurrency_levels:
+                        result = {
+                            'transport': transport.name, 'table': table, 'rows': size, 'scenario': scenario, 'concurrency': concurrency,
+                            **run_scenario(transport, scenarios, scenario, concurrency, args.duration, args.warmup)
+                        }
+                        print_result(result)
+                        results.append(result)
+        finally:
+            transport.close()
+
+    out = args.out or f'benchmarks/results/e2e-{time.strftime("%Y%m%d-%H%M%S")}.json'
+    write_results(out, 'e2e', vars(args), results)
+    print(f'Results written to {out}')
+
+if __name__ == '__main__':
+    main()
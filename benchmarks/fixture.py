@@ -0,0 +1,125 @@
+'''
+Seeded SQLite fixture of the benchmarks: one `bench_<size>` table per size, e.g. `bench_10k`, `bench_1m` and `bench_10m`, and
+`bench_<size>_x<extra>` tables with `extra` more text columns for the wide table cases.
+
+The rows are generated from a fixed seed, so every run (and every release) is benchmarked against the same data.
+An existing table is reused when it has the expected number of rows.
+
+    python -m benchmarks.fixture --db benchmarks/bench.db --sizes 10k,1m,10m
+'''
+# Python deps & external libraries
+import sqlite3
+import random
+import argparse
+import time
+from itertools import islice
+
+SEED = 1234
+CHUNK_SIZE = 100000
+SIZE_SUFFIXES = {'k': 1000, 'm': 1000000}
+# `bucket = id % BUCKETS`, an unindexed column to filter on (1% of the rows per bucket)
+BUCKETS = 100
+
+def parse_size(label: str) -> int:
+    '''
+    Parses a size label, e.g. `10k` or `1m`.
+
+    Args:
+        label (str): The size label
+
+    Returns:
+        int: The number of rows
+    '''
+    label = label.strip().lower()
+    if label[-1:] in SIZE_SUFFIXES:
+        return int(float(label[:-1]) * SIZE_SUFFIXES[label[-1]])
+    return int(label)
+
+def table_name(label: str, extra_columns: int = 0) -> str:
+    return f'bench_{label.strip().lower()}' + (f'_x{extra_columns}' if extra_columns else '')
+
+def _rows(size: int, extra_columns: int = 0):
+    rng = random.Random(SEED)
+    for id in range(1, size + 1):
+        yield (
+            id, f'user {id}', f'user{id}@example.com', round(rng.uniform(0, 1000), 2), id % BUCKETS, rng.randint(0, 1), f'2024-01-01 00:00:{id % 60:02d}',
+            *(f'value {column} of {id}' for column in range(1, extra_columns + 1))
+        )
+
+def create_table(connection: sqlite3.Connection, table: str, size: int, extra_columns: int = 0) -> bool:
+    '''
+    Creates and fills `table` with `size` rows, unless it already has them.
+
+    Args:
+        connection (sqlite3.Connection): The fixture connection
+        table (str): The table name
+        size (int): The number of rows
+        extra_columns (int, optional): The number of `extra_<n>` text columns after the base columns
+
+    Returns:
+        bool: If the table was (re)created
+    '''
+    try:
+        if connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] == size:
+            return False
+    except sqlite3.OperationalError:
+        pass
+
+    connection.execute(f'DROP TABLE IF EXISTS {table}')
+    connection.execute(
+        f'CREATE TABLE {table} ('
+        'id INTEGER PRIMARY KEY, name TEXT NOT NULL, email TEXT NOT NULL, score REAL, bucket INTEGER NOT NULL DEFAULT 0, '
+        'active INTEGER NOT NULL DEFAULT 1, created_at TEXT'
+        + ''.join(f', extra_{column} TEXT' for column in range(1, extra_columns + 1)) +
+        ')'
+    )
+
+    rows = _rows(size, extra_columns)
+    placeholders = ', '.join('?' * (7 + extra_columns))
+    while chunk := list(islice(rows, CHUNK_SIZE)):
+        connection.executemany(f'INSERT INTO {table} VALUES ({placeholders})', chunk)
+    # Built after the inserts, much faster than maintaining it row by row
+    connection.execute(f'CREATE UNIQUE INDEX {table}_email ON {table} (email)')
+    connection.commit()
+    return True
+
+def create_fixture(path: str, sizes: list[str], extra_columns: list[int] = (0,)) -> dict:
+    '''
+    Creates the fixture database at `path`: a table per size and number of extra columns.
+
+    Args:
+        path (str): The SQLite database file, ending in `.db`
+        sizes (list): The size labels of the tables
+        extra_columns (list, optional): The numbers of extra columns. Defaults to the base columns only.
+
+    Returns:
+        dict: The number of rows by table name
+    '''
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA journal_mode = WAL')
+    connection.execute('PRAGMA synchronous = OFF')
+
+    tables = {}
+    try:
+        for label, extra in ((label, extra) for label in sizes for extra in extra_columns):
+            table, size = table_name(label, extra), parse_size(label)
+            started = time.perf_counter()
+            if create_table(connection, table, size, extra):
+                print(f'Created `{table}` ({size} rows) in {time.perf_counter() - started:.1f}s')
+            tables[table] = size
+    finally:
+        connection.close()
+
+    return tables
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Create the seeded SQLite fixture of the benchmarks.')
+    parser.add_argument('--db', default = 'benchmarks/bench.db', help = 'The SQLite database file (default: %(default)s)')
+    parser.add_argument('--sizes', default = '10k', help = 'Comma separated table sizes (default: %(default)s), e.g. 10k,1m,10m')
+    parser.add_argument('--extra-columns', default = '0', help = 'Comma separated numbers of extra columns (default: %(default)s), e.g. 0,40')
+    args = parser.parse_args()
+
+    create_fixture(args.db, args.sizes.split(','), [int(extra) for extra in args.extra_columns.split(',')])
+
+if __name__ == '__main__':
+    main()
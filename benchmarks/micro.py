@@ -0,0 +1,208 @@
+'''
+Micro-benchmarks of the per-request hot paths, each in isolation: the query building (`QueryBuilder.apply_clause` and
+PyPika's `get_sql()`), `Route._parse_query_args`, `Database._build_get_query_result` and the response encoding (the JSON codec,
+which matches `jsonify`, and MessagePack). The inputs cover narrow (5 columns) and wide (50 columns) tables, many where clauses
+and large row lists.
+
+Each case reports the time per call (the best and the median of `--repeat` runs, in ns/op), the peak memory allocated during one
+call and the memory blocks still allocated after it (`tracemalloc` / `sys.getallocatedblocks`, CPython doesn't count the
+allocations themselves). The allocations are measured in a separate pass, so tracing doesn't slow down the timings.
+
+    python -m benchmarks.micro --filter query --repeat 7 --out benchmarks/results/micro.json
+'''
+# Python deps & external libraries
+import gc
+import os
+import sys
+import time
+import timeit
+import logging
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+
+from .stats import write_results
+
+NARROW = tuple(['id', 'name', 'email', 'score', 'created_at'])
+WIDE = tuple(['id'] + [f'column_{index}' for index in range(1, 50)])
+
+def _rows(columns: tuple, count: int) -> list:
+    return [
+        tuple(index if column == 'id' else f'{column} value {index}' if index % 2 else index * 1.5 for column in columns)
+        for index in range(count)
+    ]
+
+def _where(columns: tuple, count: int) -> str:
+    # The format built by `Route._parse_query_args` from the column query arguments
+    return ' AND '.join(f'{column}=value {index}' for index, column in enumerate(columns[:count]))
+
+def build_cases(workdir: str) -> dict:
+    '''
+    Builds the benchmark cases. The app modules are only imported here, once the logs and the database are set up.
+
+    Args:
+        workdir (str): A scratch directory for the SQLite database
+
+    Returns:
+        dict: The zero argument callables by case name
+    '''
+    import flask
+    from pypika import Table
+    from pypika.dialects import MySQLQuery as Query
+
+    from Database import DatabaseFactory, DatabaseManager, RowSet
+    from Database.Helpers import QueryBuilder
+    from Routes import TableDescriptor
+    from Routes.routes import Get
+    from Codecs import CodecRegistry
+    from Codecs.codecs import JSONCodec, MessagePackCodec
+    from constants import API_VALID_QUERY_ARGS
+
+    logger = logging.getLogger('benchmarks')
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    database = DatabaseFactory.create_database({'type': 'sqlite', 'database': os.path.join(workdir, 'micro.db')}, logger)
+    db_manager = DatabaseManager(database, logger)
+    codecs = CodecRegistry(JSONCodec(), MessagePackCodec())
+    route = Get(db_manager, '/api/v1/<table>', logger, logger, codecs, None)
+
+    app = flask.Flask('benchmarks')
+    cases = {}
+
+    # Query building
+    for width, columns in (('narrow', NARROW), ('wide', WIDE)):
+        table = Table(f'{width}_table')
+        base = Query.from_(table).select(*columns)
+
+        for where_count in sorted({1, min(10, len(columns)), len(columns)}):
+            where = _where(columns, where_count)
+            cases[f'query.apply_clause.where.{width}.{where_count}'] = (
+                lambda base = base, where = where: QueryBuilder.apply_clause(base, 'where', where, {})
+            )
+
+        query_args = {'where': _where(columns, 5), 'order_by': 'id', 'sort': 'desc', 'limit': '100', 'offset': '200'}
+        cases[f'query.build_select.{width}'] = (
+            lambda width = width, columns = columns, query_args = query_args: db_manager._build_select_query(f'{width}_table', columns, query_args)
+        )
+
+        built = db_manager._build_select_query(f'{width}_table', columns, query_args)
+        cases[f'query.get_sql.{width}'] = built.get_sql
+
+    # Query argument parsing
+    for width, columns in (('narrow', NARROW), ('wide', WIDE)):
+        descriptor = TableDescriptor(f'{width}_table', True, False, 'id', frozenset(columns), ('name',), ('email',))
+        filters = '&'.join(f'{column}=value' for column in columns[:10])
+        request_context = app.test_request_context(f'/api/v1/{width}_table?limit=100&offset=200&order_by=id&sort=desc&{filters}')
+        request_context.push()
+        request = flask.request._get_current_object()
+        request_context.pop()
+
+        cases[f'route.parse_query_args.{width}'] = (
+            lambda request = request, descriptor = descriptor: route._parse_query_args(request, API_VALID_QUERY_ARGS['GET'], descriptor)
+        )
+
+    # Result envelope and encoding
+    json_codec, msgpack_codec = JSONCodec(), MessagePackCodec()
+    for width, columns, counts in (('narrow', NARROW, (100, 10000)), ('wide', WIDE, (100, 1000))):
+        for count in counts:
+            rows = _rows(columns, count)
+            query_args = {'limit': str(count), 'offset': '0'}
+            query = {'query': f'SELECT * FROM `{width}_table` LIMIT {count}', 'type': 'select'}
+
+            cases[f'db.build_get_query_result.{width}.{count}'] = (
+                lambda rows = rows, columns = columns, query = query, query_args = query_args: database._build_get_query_result(
+                    query, f'{width}_table', query_args, affected_rows = len(rows), result_group = True, data = RowSet(columns, rows)
+                )
+            )
+
+            for layout in ('rows', 'columnar'):
+                result = database._build_get_query_result(
+                    query, f'{width}_table', query_args, affected_rows = count, result_group = True, data = RowSet(columns, rows, layout), layout = layout
+                )
+                cases[f'codec.json.{layout}.{width}.{count}'] = lambda result = result: json_codec.encode(result)
+                cases[f'codec.msgpack.{layout}.{width}.{count}'] = lambda result = result: msgpack_codec.encode(result)
+
+    # The codecs read the app config (e.g. the debug mode) from the app context, pushed for the whole run
+    app.app_context().push()
+    return cases
+
+def measure(func, repeat: int, min_time: float) -> dict:
+    '''
+    Times `func` and measures its allocations.
+
+    Args:
+        func (Callable): The benchmarked zero argument callable
+        repeat (int): The number of timed runs
+        min_time (float): The minimum duration of a timed run, in seconds
+
+    Returns:
+        dict: The calls per run, the best and median ns/op, the peak bytes allocated by one call and the blocks left after it
+    '''
+    timer = timeit.Timer(func)
+    loops, elapsed = timer.autorange()
+    loops = max(int(loops * min_time / elapsed), 1)
+    runs = [elapsed / loops * 1e9 for elapsed in timer.repeat(repeat, loops)]
+
+    gc.collect()
+    gc.disable()
+    try:
+        tracemalloc.start()
+        func()
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        blocks = sys.getallocatedblocks()
+        result = func()
+        peak = tracemalloc.get_traced_memory()[1] - start
+        # The result is referenced until here, it's part of what a call allocates
+        retained = sys.getallocatedblocks() - blocks
+        del result
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+
+    return {
+        'loops': loops,
+        'best_ns': round(min(runs), 1),
+        'median_ns': round(statistics.median(runs), 1),
+        'peak_bytes': peak,
+        'blocks': retained,
+    }
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description = 'Micro-benchmarks of the request hot paths.')
+    parser.add_argument('--filter', default = '', help = 'Only run the cases whose name contains this (default: all)')
+    parser.add_argument('--repeat', type = int, default = 5, help = 'Timed runs per case (default: %(default)s)')
+    parser.add_argument('--min-time', type = float, default = 0.1, help = 'Minimum seconds per timed run (default: %(default)s)')
+    parser.add_argument('--out', default = None, help = 'The JSON results file (default: benchmarks/results/micro-<time>.json)')
+    parser.add_argument('--list', action = 'store_true', help = 'List the cases and exit')
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('APP_ENV', 'production')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cases = build_cases(workdir)
+        names = [name for name in cases if args.filter in name]
+
+        if args.list:
+            print('\n'.join(names))
+            return
+
+        results = []
+        for name in names:
+            result = {'case': name, **measure(cases[name], args.repeat, args.min_time)}
+            print(
+                f"{name:<45} {result['best_ns']:>14,.0f} ns/op  (median {result['median_ns']:>14,.0f})  "
+                f"peak {result['peak_bytes']:>11,} B  blocks {result['blocks']:>7,}"
+            )
+            results.append(result)
+
+    out = args.out or f'benchmarks/results/micro-{time.strftime("%Y%m%d-%H%M%S")}.json'
+    write_results(out, 'micro', vars(args), results)
+    print(f'Results written to {out}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+'''
+Replays the requests recorded by the traffic capture (`API_CAPTURE`, `logs/capture/capture_logger.log`) against a running instance,
+at the original pace, scaled (`--speed 2` is twice as fast) or as fast as possible (`--speed 0`), and reports the latency
+distributions, overall and by route.
+
+The captured shapes are turned back into requests: the filter values and the bodies are generated from their types and lengths
+(unique strings, so the inserts don't collide), the API key classes are mapped to the keys given on the command line.
+
+    python -m benchmarks.replay logs/capture/capture_logger.log --target http://localhost:5000 --api-key KEY --api-secret SECRET
+'''
+# Python deps & external libraries
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+import itertools
+import http.client
+from urllib.parse import urlsplit, urlencode, quote
+
+from .stats import summarize, write_results
+
+def load(path: str, limit: int = None) -> list[dict]:
+    '''
+    Loads the capture records of `path`, oldest first. The other log lines (e.g. the logger's startup line) are skipped.
+
+    Args:
+        path (str): The capture file
+        limit (int, optional): The maximum number of records
+
+    Returns:
+        list: The records
+    '''
+    records = []
+    with open(path) as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and 'method' in record and 't' in record:
+                records.append(record)
+
+    records.sort(key = lambda record: record['t'])
+    return records[:limit] if limit else records
+
+class RequestBuilder:
+    '''
+    Turns the capture records back into requests.
+
+    Attributes:
+        credentials (dict): The `X-API-KEY` / `X-API-SECRET` headers by key class
+        origin (str): The `Origin` header
+    '''
+    def __init__(self, credentials: dict, origin: str = None):
+        self.credentials = credentials
+        self.origin = origin
+        self.__counter = itertools.count()
+
+    def value(self, shape: any) -> any:
+        '''
+        Generates a value of `shape` (see `TrafficRecorder.shape`).
+        '''
+        match shape:
+            case dict():
+                return {key: self.value(item) for key, item in shape.items()}
+            case [count, item]:
+                return [self.value(item) for _ in range(count)]
+            case [_]:
+                return []
+            case 'int':
+                return 1
+            case 'float':
+                return 1.5
+            case 'bool':
+                return True
+            case 'null':
+                return None
+            case str() if shape.startswith('str:'):
+                # Unique, so the unique columns don't collide, and as long as the original when possible
+                unique = f'r{next(self.__counter)}'
+                return unique.ljust(int(shape[4:]), 'x')
+            case _:
+                return None
+
+    def build(self, record: dict) -> tuple[str, str, bytes, dict]:
+        '''
+        Builds the request of `record`.
+
+        Returns:
+            tuple: The method, path, body and headers
+        '''
+        if record.get('route'):
+            path = record['route'].replace('<table>', quote(str(record.get('table') or ''), safe = ''))
+            id = record.get('id')
+            path = path.replace('<id>', quote(str(id if id is None or str(id).isdigit() else self.value(id)), safe = ''))
+        else:
+            path = record.get('path') or '/'
+
+        args = {**(record.get('args') or {}), **{key: self.value(shape) for key, shape in (record.get('filters') or {}).items()}}
+        if args:
+            path = f'{path}?{urlencode(args)}'
+
+        headers = dict(self.credentials.get(record.get('key'), {}))
+        if self.origin:
+            headers['Origin'] = self.origin
+        if record.get('accept'):
+            headers['Accept'] = record['accept']
+
+        body = None
+        if record['method'] in ('POST', 'PUT', 'PATCH'):
+            data = self.value(record['body']) if record.get('body') is not None else {}
+            body = json.dumps(data).encode()
+            headers['Content-Type'] = 'application/json'
+
+        return record['method'], path, body, headers
+
+def replay(records: list, builder: RequestBuilder, target: str, speed: float, concurrency: int) -> list[dict]:
+    '''
+    Sends the requests of `records` to `target`, keeping the gaps between them divided by `speed` (no gaps if `speed` is 0).
+
+    Returns:
+        list: The outcome of each request (the record, the status, the latency and how late it was sent)
+    '''
+    url = urlsplit(target)
+    connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+    jobs = queue.Queue(maxsize = concurrency * 4)
+    outcomes = []
+    lock = threading.Lock()
+
+    def worker():
+        connection = connection_class(url.hostname, url.port, timeout = 60)
+        while (job := jobs.get()) is not None:
+            record, scheduled = job
+            method, path, body, headers = builder.build(record)
+            started = time.perf_counter()
+            try:
+                connection.request(method, f'{url.path.rstrip("/")}{path}', body = body, headers = headers)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                status = None
+            finished = time.perf_counter()
+
+            with lock:
+                outcomes.append({
+                    'record': record,
+                    'status': status,
+                    'latency': finished - started,
+                    'late': max(started - scheduled, 0.0),
+                })
+        connection.close()
+
+    threads = [threading.Thread(target = worker, daemon = True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+
+    first = records[0]['t'] if records else 0
+    start = time.perf_counter()
+    for record in records:
+        scheduled = start + ((record['t'] - first) / speed if speed > 0 else 0)
+        if (delay := scheduled - time.perf_counter()) > 0:
+            time.sleep(delay)
+        jobs.put((record, scheduled))
+
+    for _ in threads:
+        jobs.put(None)
+    for thread in threads:
+        thread.join()
+
+    return outcomes
+
+def report(outcomes: list, elapsed: float) -> dict:
+    '''
+    Summarizes the outcomes, overall and by method and route.
+
+    Returns:
+        dict: The overall summary, the summaries by route and the requests whose status differs from the recorded one
+    '''
+    groups = {}
+    for outcome in outcomes:
+        record = outcome['record']
+        groups.setdefault(f"{record['method']} {record.get('route') or record.get('path')}", []).append(outcome)
+
+    def summary(items: list) -> dict:
+        return {
+            **summarize([item['latency'] for item in items], elapsed, sum(1 for item in items if item['status'] is None or item['status'] >= 500)),
+            'recorded_ms_p50': sorted(item['record'].get('ms') or 0 for item in items)[len(items) // 2],
+            'status_mismatches': sum(1 for item in items if item['status'] != item['record'].get('status')),
+        }
+
+    lateness = sorted(outcome['late'] for outcome in outcomes)
+    return {
+        'overall': summary(outcomes) if outcomes else None,
+        'routes': {name: summary(items) for name, items in sorted(groups.items(), key = lambda group: -len(group[1]))},
+        # The requests sent later than scheduled, when all the workers were busy (raise `--concurrency`)
+        'late_over_10ms': sum(1 for late in lateness if late > 0.01),
+    }
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description = 'Replay a traffic capture against a running instance of the API.')
+    parser.add_argument('capture', help = 'The capture file (logs/capture/capture_logger.log)')
+    parser.add_argument('--target', default = 'http://127.0.0.1:5000', help = 'The base URL of the instance (default: %(default)s)')
+    parser.add_argument('--speed', type = float, default = 1.0, help = 'Pace multiplier, 0 for as fast as possible (default: %(default)s)')
+    parser.add_argument('--concurrency', type = int, default = 16, help = 'Concurrent connections (default: %(default)s)')
+    parser.add_argument('--limit', type = int, default = None, help = 'Replay only the first N records')
+    parser.add_argument('--api-key', required = True, help = 'The key sent for the `key` records')
+    parser.add_argument('--api-secret', required = True, help = 'The secret of --api-key')
+    parser.add_argument('--admin-key', default = None, help = 'The key sent for the `admin` records (default: --api-key)')
+    parser.add_argument('--admin-secret', default = None, help = 'The secret of --admin-key')
+    parser.add_argument('--origin', default = None, help = 'The Origin header sent with every request')
+    parser.add_argument('--out', default = None, help = 'The JSON results file (default: benchmarks/results/replay-<time>.json)')
+    args = parser.parse_args(argv)
+
+    records = load(args.capture, args.limit)
+    if not records:
+        sys.exit(f'No capture records in {args.capture}')
+
+    credentials = {
+        'key': {'X-API-KEY': args.api_key, 'X-API-SECRET': args.api_secret},
+        'admin': {'X-API-KEY': args.admin_key or args.api_key, 'X-API-SECRET': args.admin_secret or args.api_secret},
+        'invalid': {'X-API-KEY': 'invalid-replay-key', 'X-API-SECRET': 'invalid'},
+        'none': {},
+    }
+
+    recorded = records[-1]['t'] - records[0]['t']
+    print(f'Replaying {len(records)} requests recorded over {recorded:.1f}s against {args.target} (speed {args.speed or "max"})')
+
+    started = time.perf_counter()
+    outcomes = replay(records, RequestBuilder(credentials, args.origin), args.target, args.speed, args.concurrency)
+    results = report(outcomes, time.perf_counter() - started)
+
+    for name, summary in [('overall', results['overall']), *results['routes'].items()]:
+        latency = summary['latency_ms']
+        print(
+            f"{name:<45} {summary['ops']:>7} req  p50 {latency['p50']:>8.2f}ms  p95 {latency['p95']:>8.2f}ms  p99 {latency['p99']:>8.2f}ms  "
+            f"(recorded p50 {summary['recorded_ms_p50']:>8.2f}ms)  errors {summary['errors']}  status mismatches {summary['status_mismatches']}"
+        )
+    if args.speed > 0 and results['late_over_10ms']:
+        print(f"{results['late_over_10ms']} requests were sent over 10ms late, all the connections were busy: raise --concurrency")
+
+    out = args.out or f'benchmarks/results/replay-{time.strftime("%Y%m%d-%H%M%S")}.json'
+    write_results(out, 'replay', {key: value for key, value in vars(args).items() if 'secret' not in key and 'key' not in key}, [results])
+    print(f'Results written to {out}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+'''
+Scaling curves and regression gate: sweeps the table size (rows), the table width (extra columns) and the waitress threads
+(`WAITRESS_THREADS`) for the `Get` (list and one), `Post`, `Put` and `Delete` routes, served by a real waitress server.
+
+A run can be saved as the baseline (`benchmarks/baselines/scaling.json`, kept in the repository), and later runs checked against
+it: the check fails (exit code 1) with a readable diff when the throughput of a point drops, or its p95 latency grows, beyond the
+tolerance. The baselines are only comparable on the machine they were recorded on, record them where the gate runs.
+
+    python -m benchmarks.scaling --sizes 1k,10k,100k --extra-columns 0,40 --threads 1,4,8 --save-baseline
+    python -m benchmarks.scaling --sizes 1k,10k,100k --extra-columns 0,40 --threads 1,4,8 --check
+'''
+# Python deps & external libraries
+import sys
+import json
+import time
+import argparse
+
+from . import fixture
+from .e2e import load_app, Scenarios, WaitressTransport, run_scenario
+from .stats import write_results
+
+BASELINE = 'benchmarks/baselines/scaling.json'
+
+# The e2e scenarios of each route
+ROUTES = {
+    'Get': ('list', 'one'),
+    'Post': ('post',),
+    'Put': ('put',),
+    'Delete': ('delete',),
+}
+
+def point_key(result: dict) -> tuple:
+    return result['scenario'], result['rows'], result['extra_columns'], result['threads']
+
+def sweep(args: argparse.Namespace) -> list[dict]:
+    '''
+    Runs every scenario at every size, width and thread count.
+
+    Returns:
+        list: The result of each point
+    '''
+    extra_columns = [int(extra) for extra in args.extra_columns.split(',')]
+    sizes = args.sizes.split(',')
+    fixture.create_fixture(args.db, sizes, extra_columns)
+    app = load_app(args.db)
+
+    scenarios = [scenario for route in args.routes.split(',') for scenario in ROUTES[route]]
+    results = []
+
+    for threads in (int(threads) for threads in args.threads.split(',')):
+        transport = WaitressTransport(app, threads)
+        try:
+            for label in sizes:
+                for extra in extra_columns:
+                    table, size = fixture.table_name(label, extra), fixture.parse_size(label)
+                    table_scenarios = Scenarios(table, size, args.db)
+                    for scenario in scenarios:
+                        result = {
+                            'scenario': scenario, 'rows': size, 'extra_columns': extra, 'threads': threads, 'clients': args.clients,
+                            **run_scenario(transport, table_scenarios, scenario, args.clients, args.duration, args.warmup)
+                        }
+                        latency = result['latency_ms']
+                        print(
+                            f"{scenario:<7} rows={size:<9} extra={extra:<3} threads={threads:<3} {result['throughput'] or 0:>9.1f} req/s  "
+                            f"p50 {latency['p50'] or 0:>8.2f}ms  p95 {latency['p95'] or 0:>8.2f}ms  p99 {latency['p99'] or 0:>8.2f}ms  errors {result['errors']}"
+                        )
+                        results.append(result)
+        finally:
+            transport.close()
+
+    return results
+
+def print_curves(results: list):
+    '''
+    Prints the throughput of each scenario as curves over the threads, one line per size and width.
+    '''
+    threads = sorted({result['threads'] for result in results})
+    print(f"\n{'req/s':<36}" + ''.join(f'{f"threads={count}":>14}' for count in threads))
+
+    curves = {}
+    for result in results:
+        curves.setdefault((result['scenario'], result['rows'], result['extra_columns']), {})[result['threads']] = result['throughput']
+    for (scenario, rows, extra), points in curves.items():
+        label = f'{scenario} rows={rows} extra={extra}'
+        print(f'{label:<36}' + ''.join(f'{points[count] or 0:>14.1f}' if count in points else f'{"-":>14}' for count in threads))
+
+def compare(results: list, baseline: list, tolerance: float, latency_tolerance: float) -> list[str]:
+    '''
+    Compares the points of `results` with the same points of `baseline`, and prints the diff.
+
+    Args:
+        results (list): The current results
+        baseline (list): The baseline results
+        tolerance (float): The accepted throughput drop, as a fraction
+        latency_tolerance (float): The accepted p95 latency growth, as a fraction
+
+    Returns:
+        list: The regressions, as readable lines (empty if none)
+    '''
+    baseline_points = {point_key(result): result for result in baseline}
+    regressions = []
+
+    print(f"\n{'point':<44}{'req/s':>22}{'change':>9}{'p95 ms':>22}{'change':>9}")
+    for result in results:
+        base = baseline_points.get(point_key(result))
+        scenario, rows, extra, threads = point_key(result)
+        label = f'{scenario} rows={rows} extra={extra} threads={threads}'
+        if base is None:
+            print(f'{label:<44}  (not in the baseline)')
+            continue
+
+        throughput, base_throughput = result['throughput'] or 0, base['throughput'] or 0
+        p95, base_p95 = result['latency_ms']['p95'] or 0, base['latency_ms']['p95'] or 0
+        throughput_change = throughput / base_throughput - 1 if base_throughput else 0.0
+        p95_change = p95 / base_p95 - 1 if base_p95 else 0.0
+
+        problems = []
+        if throughput_change < -tolerance:
+            problems.append(f'throughput {base_throughput:.1f} -> {throughput:.1f} req/s ({throughput_change:+.1%}, tolerance -{tolerance:.0%})')
+        if p95_change > latency_tolerance:
+            problems.append(f'p95 {base_p95:.2f} -> {p95:.2f} ms ({p95_change:+.1%}, tolerance +{latency_tolerance:.0%})')
+
+        marker = '  << REGRESSION' if problems else ''
+        print(
+            f'{label:<44}{f"{base_throughput:.1f} -> {throughput:.1f}":>22}{throughput_change:>+9.1%}'
+            f'{f"{base_p95:.2f} -> {p95:.2f}":>22}{p95_change:>+9.1%}{marker}'
+        )
+        regressions.extend(f'{label}: {problem}' for problem in problems)
+
+    return regressions
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description = 'Scaling curves of the routes and the regression gate against a baseline.')
+    parser.add_argument('--db', default = 'benchmarks/bench.db', help = 'The fixture database (default: %(default)s)')
+    parser.add_argument('--sizes', default = '1k,10k,100k', help = 'Comma separated table sizes (default: %(default)s)')
+    parser.add_argument('--extra-columns', default = '0,40', help = 'Comma separated numbers of extra columns (default: %(default)s)')
+    parser.add_argument('--threads', default = '1,4,8', help = 'Comma separated waitress thread counts (default: %(default)s)')
+    parser.add_argument('--clients', type = int, default = 16, help = 'Concurrent clients at every point (default: %(default)s)')
+    parser.add_argument('--routes', default = ','.join(ROUTES), help = 'Comma separated routes (default: %(default)s)')
+    parser.add_argument('--duration', type = float, default = 3.0, help = 'Measured seconds per point (default: %(default)s)')
+    parser.add_argument('--warmup', type = float, default = 0.5, help = 'Unmeasured seconds before each point (default: %(default)s)')
+    parser.add_argument('--results', default = None, help = 'Check or save these results instead of running the sweep')
+    parser.add_argument('--out', default = None, help = 'The JSON results file (default: benchmarks/results/scaling-<time>.json)')
+    parser.add_argument('--baseline', default = BASELINE, help = 'The baseline file (default: %(default)s)')
+    parser.add_argument('--save-baseline', action = 'store_true', help = 'Save the results as the baseline')
+    parser.add_argument('--check', action = 'store_true', help = 'Fail if the results regress from the baseline')
+    parser.add_argument('--tolerance', type = float, default = 0.15, help = 'Accepted throughput drop (default: %(default)s)')
+    parser.add_argument('--latency-tolerance', type = float, default = 0.25, help = 'Accepted p95 latency growth (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    config = {key: value for key, value in vars(args).items() if key not in ('results', 'save_baseline', 'check')}
+
+    if args.results:
+        with open(args.results) as file:
+            results = json.load(file)['results']
+    else:
+        results = sweep(args)
+        out = args.out or f'benchmarks/results/scaling-{time.strftime("%Y%m%d-%H%M%S")}.json'
+        write_results(out, 'scaling', config, results)
+        print(f'Results written to {out}')
+
+    print_curves(results)
+
+    if args.save_baseline:
+        write_results(args.baseline, 'scaling', config, results)
+        print(f'\nBaseline saved to {args.baseline}')
+
+    if args.check:
+        try:
+            with open(args.baseline) as file:
+                baseline = json.load(file)
+        except FileNotFoundError:
+            sys.exit(f'No baseline at {args.baseline}, save one with --save-baseline')
+
+        print(f"\nBaseline: commit {baseline['environment'].get('commit')}, {baseline['environment'].get('time')}")
+        regressions = compare(results, baseline['results'], args.tolerance, args.latency_tolerance)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s):\n' + '\n'.join(f'  - {regression}' for regression in regressions))
+            sys.exit(1)
+        print('\nNo regressions.')
+
+if __name__ == '__main__':
+    main()
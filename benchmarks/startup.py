@@ -0,0 +1,130 @@
+'''
+Startup benchmark: the import-time cost of the app, measured in fresh interpreters against the seeded SQLite fixture.
+
+Each run starts a new Python process and times, in order: importing `index`, building the app (`create_app()`), and the
+first request (which opens the database connection, builds the table descriptors and sets up the loggers it logs to).
+The interpreter startup alone (`python -c pass`) is measured too, to subtract it. `--importtime` adds the slowest imports
+of `index`, from `python -X importtime`.
+
+    python -m benchmarks.startup --runs 10 --importtime --out benchmarks/results/startup.json
+'''
+# Python deps & external libraries
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+from . import fixture
+from .e2e import configure, HEADERS
+from .stats import write_results
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the fresh interpreter, prints the timings as JSON on its last line
+PROBE = '''
+import sys, time, json
+started = time.perf_counter()
+import index
+imported = time.perf_counter()
+app = index.create_app()
+created = time.perf_counter()
+response = app.test_client().get(sys.argv[1], headers = json.loads(sys.argv[2]))
+requested = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (requested - created) * 1000,
+    'status': response.status_code,
+    'modules': len(sys.modules),
+}))
+'''
+
+def probe(env: dict, path: str) -> dict:
+    '''
+    Runs the probe in a fresh interpreter.
+
+    Returns:
+        dict: The timings of the import, `create_app()` and the first request, the total wall time of the process and the loaded modules
+    '''
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, '-c', PROBE, path, json.dumps(HEADERS)], cwd = ROOT, env = env, capture_output = True, text = True, check = True
+    )
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    result['process_ms'] = (time.perf_counter() - started) * 1000
+    return result
+
+def interpreter_ms(env: dict) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'], cwd = ROOT, env = env, check = True)
+    return (time.perf_counter() - started) * 1000
+
+def slowest_imports(env: dict, count: int) -> list[dict]:
+    '''
+    Gets the slowest imports done by `index` itself (`python -X importtime`), by cumulative time.
+
+    Returns:
+        list: The module names with their self and cumulative microseconds
+    '''
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import index'], cwd = ROOT, env = env, capture_output = True, text = True, check = True
+    )
+    # The children of a module are listed before it, indented by two more spaces: collect the direct children until `index`
+    imports, children = [], []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix('import time:').split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            if name.strip() == 'index':
+                imports = children
+            children = []
+        elif depth == 1:
+            children.append({'module': name.strip(), 'self_us': int(self_us), 'cumulative_us': int(cumulative_us)})
+
+    return sorted(imports, key = lambda item: -item['cumulative_us'])[:count]
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description = 'Startup (import, app factory and first request) benchmark of the API.')
+    parser.add_argument('--db', default = 'benchmarks/bench.db', help = 'The fixture database (default: %(default)s)')
+    parser.add_argument('--size', default = '1k', help = 'The size of the queried fixture table (default: %(default)s)')
+    parser.add_argument('--runs', type = int, default = 10, help = 'Fresh interpreters to time (default: %(default)s)')
+    parser.add_argument('--importtime', action = 'store_true', help = 'Also list the slowest imports of `index`')
+    parser.add_argument('--top', type = int, default = 15, help = 'The number of imports listed (default: %(default)s)')
+    parser.add_argument('--out', default = None, help = 'The JSON results file (default: benchmarks/results/startup-<time>.json)')
+    args = parser.parse_args(argv)
+
+    table = next(iter(fixture.create_fixture(args.db, [args.size])))
+    configure(args.db)
+    env = dict(os.environ)
+    path = f'/api/v1/{table}?limit=10'
+
+    # One unmeasured run, so the bytecode caches are written
+    probe(env, path)
+    runs = [probe(env, path) for _ in range(args.runs)]
+    baseline = statistics.median(interpreter_ms(env) for _ in range(args.runs))
+
+    results = {'interpreter_ms': round(baseline, 2), 'modules': runs[-1]['modules'], 'status': runs[-1]['status']}
+    print(f'{"python -c pass":<18} median {baseline:>8.2f}ms')
+    for key in ('import_ms', 'create_app_ms', 'first_request_ms', 'process_ms'):
+        values = [run[key] for run in runs]
+        results[key] = {'median': round(statistics.median(values), 2), 'min': round(min(values), 2), 'max': round(max(values), 2)}
+        print(f'{key:<18} median {results[key]["median"]:>8.2f}ms  min {results[key]["min"]:>8.2f}ms  max {results[key]["max"]:>8.2f}ms')
+    print(f'{results["modules"]} modules loaded, first request status {results["status"]}')
+
+    if args.importtime:
+        results['imports'] = slowest_imports(env, args.top)
+        print(f'\n{"module":<40}{"cumulative ms":>15}{"self ms":>10}')
+        for item in results['imports']:
+            print(f'{item["module"]:<40}{item["cumulative_us"] / 1000:>15.2f}{item["self_us"] / 1000:>10.2f}')
+
+    out = args.out or f'benchmarks/results/startup-{time.strftime("%Y%m%d-%H%M%S")}.json'
+    write_results(out, 'startup', vars(args), [results])
+    print(f'Results written to {out}')
+
+if __name__ == '__main__':
+    main()
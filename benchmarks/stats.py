@@ -0,0 +1,102 @@
+'''
+Shared helpers of the benchmarks: latency summaries, the run environment and the JSON results files.
+'''
+# Python deps & external libraries
+import os
+import sys
+import math
+import json
+import time
+import platform
+import subprocess
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    '''
+    Gets the nearest-rank percentile of `sorted_values`.
+
+    Args:
+        sorted_values (list): The values, sorted ascending
+        fraction (float): The percentile as a fraction, e.g. 0.95
+
+    Returns:
+        float: The percentile, or None if there are no values
+    '''
+    if not sorted_values:
+        return None
+    return sorted_values[min(max(math.ceil(fraction * len(sorted_values)) - 1, 0), len(sorted_values) - 1)]
+
+def summarize(latencies: list, elapsed: float, errors: int = 0) -> dict:
+    '''
+    Summarizes the latencies (seconds) of a timed run.
+
+    Args:
+        latencies (list): The latency of each operation, in seconds
+        elapsed (float): The wall time of the run, in seconds
+        errors (int, optional): The failed operations (included in `latencies`)
+
+    Returns:
+        dict: The operations, errors, throughput (per second) and the latencies in milliseconds
+    '''
+    values = sorted(latencies)
+    ms = lambda value: round(value * 1000, 3) if value is not None else None
+
+    return {
+        'ops': len(values),
+        'errors': errors,
+        'elapsed_s': round(elapsed, 3),
+        'throughput': round(len(values) / elapsed, 1) if elapsed > 0 else None,
+        'latency_ms': {
+            'mean': ms(sum(values) / len(values)) if values else None,
+            'p50': ms(percentile(values, 0.50)),
+            'p95': ms(percentile(values, 0.95)),
+            'p99': ms(percentile(values, 0.99)),
+            'max': ms(values[-1]) if values else None,
+        },
+    }
+
+def environment() -> dict:
+    '''
+    Describes the run, so the results of different releases and machines can be told apart.
+    '''
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output = True, text = True, timeout = 5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+
+    return {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+def write_results(path: str, benchmark: str, config: dict, results: list) -> dict:
+    '''
+    Writes the results of a benchmark run as JSON.
+
+    Args:
+        path (str): The results file
+        benchmark (str): The benchmark name
+        config (dict): The run options
+        results (list): The result entries
+
+    Returns:
+        dict: The written document
+    '''
+    document = {
+        'benchmark': benchmark,
+        'environment': environment(),
+        'config': config,
+        'results': results,
+    }
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok = True)
+    with open(path, 'w') as file:
+        json.dump(document, file, indent = 2)
+
+    return document
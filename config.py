@@ -22,7 +22,18 @@ DATABASE_CONFIG = {
     'port': os.getenv('DB_PORT'),
     'database': os.getenv('DB_DATABASE'),
     'charset': os.getenv('DB_CHARSET', 'utf8mb4'),
-    'collation': os.getenv('DB_COLLATION', 'utf8mb4_unicode_ci')
+    'collation': os.getenv('DB_COLLATION', 'utf8mb4_unicode_ci'),
+    # Slow query log, disabled when the threshold is not set
+    'slow_query_ms': os.getenv('DB_SLOW_QUERY_MS'),
+    'slow_query_log_per_minute': os.getenv('DB_SLOW_QUERY_LOG_PER_MINUTE', 10),
+    'slow_query_explain': os.getenv('DB_SLOW_QUERY_EXPLAIN', 'true').lower() == 'true',
+    # Group commit of the concurrent writes, disabled when the window is not set
+    'group_commit_ms': os.getenv('DB_GROUP_COMMIT_MS'),
+    'group_commit_max': os.getenv('DB_GROUP_COMMIT_MAX', 64),
+    # Statement timeouts in milliseconds (0: no limit), the table's over the route's over the default
+    'statement_timeout_ms': os.getenv('DB_STATEMENT_TIMEOUT_MS'),
+    'route_timeouts': ParseUtils.parse_timeouts(os.getenv('DB_ROUTE_TIMEOUTS', ''), DB_LOGGER),
+    'table_timeouts': ParseUtils.parse_timeouts(os.getenv('DB_TABLE_TIMEOUTS', ''), DB_LOGGER)
 }
 
 # API config
@@ -33,10 +44,58 @@ API_CONFIG = {
     'id': os.getenv('API_CLIENT_ID'),
     'secret': os.getenv('API_CLIENT_SECRET'),
     'keys': os.getenv('API_KEYS', '').split(','),
+    'admin_keys': os.getenv('API_ADMIN_KEYS', '').split(','),
     'secrets': ParseUtils.parse_secrets(os.getenv('API_SECRETS', ''), API_LOGGER),
     'allowed_origins': os.getenv('API_ALLOWED_ORIGINS', '').split(','),
     'protected_tables': os.getenv('API_PROTECTED_TABLES', '').split(','),
     'storage_uri': os.getenv('API_STORAGE_URI'),
+    'server_timing': os.getenv('API_SERVER_TIMING', 'false').lower() == 'true',
+    'storage_sync': {
+        # Only used by the `hybrid+redis://` limiter storage
+        'sync_interval': os.getenv('API_STORAGE_SYNC_INTERVAL', 1.0),
+        'tolerance': os.getenv('API_STORAGE_TOLERANCE', 10)
+    },
+    'quotas': {
+        # Per API key budgets, e.g. `key:100000/hour;1000000/day,other:1000/minute`
+        'rows': ParseUtils.parse_quotas(os.getenv('API_ROW_QUOTAS', ''), API_LOGGER),
+        'bytes': ParseUtils.parse_quotas(os.getenv('API_BYTE_QUOTAS', ''), API_LOGGER),
+        # Budgets for the keys not listed above
+        'default_rows': os.getenv('API_DEFAULT_ROW_QUOTA'),
+        'default_bytes': os.getenv('API_DEFAULT_BYTE_QUOTA')
+    },
+    'memory_tracking': {
+        # Traces the allocations with tracemalloc (slows down the allocations, off by default)
+        'enabled': os.getenv('API_MEMORY_TRACKING', 'false').lower() == 'true',
+        'frames': os.getenv('API_MEMORY_TRACE_FRAMES', 1)
+    },
+    'warmup': {
+        # Loads the table metadata and warms the query paths (and the database, with the warm queries) before serving
+        'enabled': os.getenv('API_WARMUP', 'true').lower() == 'true',
+        # `;` separated SELECT statements
+        'queries': os.getenv('API_WARMUP_QUERIES', '').split(';')
+    },
+    'ingest': {
+        # The tables whose POSTs are queued and inserted in batches (202 + ticket), none by default
+        'tables': os.getenv('API_INGEST_TABLES', '').split(','),
+        'queue_size': os.getenv('API_INGEST_QUEUE_SIZE', 10000),
+        'batch_size': os.getenv('API_INGEST_BATCH_SIZE', 500),
+        'flush_ms': os.getenv('API_INGEST_FLUSH_MS', 200),
+        # The number of tickets kept for the status lookups
+        'retention': os.getenv('API_INGEST_RETENTION', 100000)
+    },
+    'capture': {
+        # Records a sample of the requests as sanitized shapes, for `benchmarks/replay.py`
+        'enabled': os.getenv('API_CAPTURE', 'false').lower() == 'true',
+        'sample_rate': os.getenv('API_CAPTURE_SAMPLE_RATE', 0.01)
+    },
+    'profiling': {
+        # Registers the profiler hooks at all (off: no overhead)
+        'enabled': os.getenv('API_PROFILING', 'false').lower() == 'true',
+        'sample_rate': os.getenv('API_PROFILE_SAMPLE_RATE', 0),
+        'mode': os.getenv('API_PROFILE_MODE', 'sample'),
+        'interval_ms': os.getenv('API_PROFILE_INTERVAL_MS', 5),
+        'retention': os.getenv('API_PROFILE_RETENTION', 50)
+    },
     'limits': {
         'per_minute': os.getenv('API_LIMITS_PER_MINUTE'),
         'per_hour': os.getenv('API_LIMITS_PER_HOUR'),
@@ -48,5 +107,7 @@ API_CONFIG = {
 WAITRESS_CONFIG = {
     'host': os.getenv('WAITRESS_HOST', None),
     'port': os.getenv('WAITRESS_PORT', None),
-    'threads': os.getenv('WAITRESS_THREADS', None)
+    'threads': os.getenv('WAITRESS_THREADS', None),
+    # The worker processes sharing the socket, a number or `auto` for the CPU count (1 on systems without fork)
+    'workers': os.getenv('WAITRESS_WORKERS', 'auto')
 }
\ No newline at end of file
@@ -18,12 +18,23 @@ from Logger import create_logger
 APP_LOGGER          = create_logger(logger_name='app_logger', log_dir='logs/app')
 DB_LOGGER           = create_logger(logger_name='db_logger', log_dir='logs/db')
 API_LOGGER          = create_logger(logger_name='api_logger', log_dir='logs/api')
+ACCESS_LOGGER       = create_logger(logger_name='access_logger', log_dir='logs/access', json_lines=True)
+SLOW_QUERY_LOGGER   = create_logger(logger_name='slow_query_logger', log_dir='logs/slow_queries', json_lines=True)
+CAPTURE_LOGGER      = create_logger(logger_name='capture_logger', log_dir='logs/capture', json_lines=True)
 WAITRESS_LOGGER     = None
 
 # Initialize the waitress logger if the APP_ENV is not development
 if os.getenv('APP_ENV') != 'development' and os.getenv('APP_ENV') in APP_ENVS:
     WAITRESS_LOGGER     = create_logger(logger_name='waitress_logger', log_dir='logs/waitress')
 
+# ------------------------------ #
+# Metrics constants              #
+# ------------------------------ #
+from Metrics import MetricsRegistry
+
+# The in-process metrics, exposed at `/metrics`
+METRICS             = MetricsRegistry()
+
 # ------------------------------ #
 # Database constants             #
 # ------------------------------ #
@@ -32,16 +43,25 @@ ALLOWED_DATABASES = ('mysql', 'postgresql', 'mongodb', 'sqlite')
 # ------------------------------ #
 # API constants                  #
 # ------------------------------ #
-def initialize_api_constants(config: dict):
+def build_api_constants(config: dict) -> dict:
     '''
-    Initialize the constants from the config files.
-    '''
-    global API_KEYS, API_SECRETS, API_PROTECTED_TABLES, API_ALLOWED_ORIGINS
+    Builds the key, secret, table and origin constants of an app from its API config.
+    
+    Args:
+        config (dict): The API config (see `API_CONFIG`)
     
-    API_KEYS            = set(config.get('keys'))
-    API_SECRETS         = config.get('secrets')
-    API_PROTECTED_TABLES= config.get('protected_tables')
-    API_ALLOWED_ORIGINS = config.get('allowed_origins')
+    Returns:
+        dict: The `keys`, `admin_keys`, `secrets`, `protected_tables` and `allowed_origins`
+    '''
+    keys = frozenset(config.get('keys'))
+    return {
+        'keys':             keys,
+        # Admin keys are regular API keys with access to the diagnostics (e.g. `Server-Timing`)
+        'admin_keys':       frozenset(key for key in config.get('admin_keys') if key) & keys,
+        'secrets':          config.get('secrets'),
+        'protected_tables': frozenset(config.get('protected_tables')),
+        'allowed_origins':  frozenset(config.get('allowed_origins')),
+    }
 
 # ------------------------------ #
 # API Route constants            #
@@ -52,14 +72,22 @@ API_REQUEST_METHODS     = ('GET', 'POST', 'PUT', 'DELETE', 'HEAD', 'PATCH')
 API_ACTION_METHODS      = ('POST', 'PUT', 'DELETE', 'PATCH')
 API_DATA_METHODS        = ('POST', 'PUT', 'PATCH')
 API_VALID_QUERY_ARGS    = {
-    'GET':      ('where', 'order_by', 'sort', 'limit', 'offset'),
+    'GET':      ('where', 'order_by', 'sort', 'limit', 'offset', 'layout'),
     'POST':     tuple(),
     'PUT':      ('where'),
     'DELETE':   ('where',),
-    'HEAD':     ('where', 'order_by', 'sort', 'limit', 'offset'),
+    'HEAD':     ('where', 'order_by', 'sort', 'limit', 'offset', 'layout'),
     'PATCH':    ('where'),
 }
+API_VALID_EXPORT_ARGS   = ('where', 'order_by', 'sort', 'format')
+API_EXPORT_FORMATS      = ('arrow', 'parquet')
+API_EXPORT_BATCH_SIZE   = 10000
+API_RESPONSE_LAYOUTS    = (
+    'rows',         # [{"column": value, ...}, ...] (default)
+    'columnar',     # {"columns": [...], "rows": [[...], ...]}
+    'columns',      # {"column": [value, ...], ...}
+)
 API_VALID_CONTENT_TYPES = (
     'application/json',
-    # TODO maybe in the future...
+    'application/msgpack',
 )
\ No newline at end of file
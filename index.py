@@ -5,11 +5,13 @@
 # ------------------------------------ -#
 
 # Python dependencies & external libraries
-from flask import Flask, request, jsonify, g, abort
+import atexit
+import shutil
+import tempfile
+from flask import Flask, Response, request, abort
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-from redis import Redis
 
 # ------------------------------------- #
 # Constants & configurations            #
@@ -17,208 +19,382 @@ from redis import Redis
 
 # Configurations
 from config import DATABASE_CONFIG, API_CONFIG, APP_CONFIG, WAITRESS_CONFIG
-from constants import APP_ENVS, API_CORE_URL_PREFIX, API_REQUEST_METHODS, API_ACTION_METHODS, API_DATA_METHODS, API_VALID_CONTENT_TYPES, initialize_api_constants
-
-# Initialize API constants
-initialize_api_constants(API_CONFIG)
-from constants import API_KEYS, API_SECRETS, API_ALLOWED_ORIGINS, API_PROTECTED_TABLES
+from constants import APP_ENVS, API_CORE_URL_PREFIX, API_REQUEST_METHODS, API_ACTION_METHODS, API_DATA_METHODS, API_VALID_CONTENT_TYPES, build_api_constants
 
 # Logger
-from constants import APP_LOGGER, DB_LOGGER, API_LOGGER, WAITRESS_LOGGER
+from constants import APP_LOGGER, DB_LOGGER, API_LOGGER, WAITRESS_LOGGER, ACCESS_LOGGER, CAPTURE_LOGGER
+
+# Metrics
+from constants import METRICS
 
 # Database modules
-from Database import DatabaseFactory, DatabaseManager
+from Database import DatabaseFactory, DatabaseManager, IngestQueue
 
 # Routes
-from Routes.routes import Get as GetRoute, Post as PostRoute, Put as PutRoute, Delete as DeleteRoute
+from Routes import RouteRegistry
+
+# Request middleware
+from Middleware import RequestContext, RequestPipeline, OriginPolicy, QuotaManager, AccessLog, ServerTiming, RequestProfiler, MemoryTracker, TrafficRecorder
+
+# Request & response body codecs
+from Codecs import CodecRegistry
+from Codecs.codecs import JSONCodec, MessagePackCodec
 
 # API status messages
 from status import API_STATUS_MESSAGES
 
-# Create the Database instance and the DatabaseManager
-database = DatabaseFactory.create_database(DATABASE_CONFIG, DB_LOGGER)
-db = DatabaseManager(database, DB_LOGGER)
-
-# Initialize the Flask app
-app = Flask(APP_CONFIG.get('name', __name__))
-
-# Enable CORS
-CORS(
-    app = app, 
-    resources = {
-        f'{API_CORE_URL_PREFIX}/*': {
-                'origins': API_ALLOWED_ORIGINS,
-                'methods': list(API_REQUEST_METHODS)
-            }
-        }, 
-    supports_credentials = True
-)
-
-# Initialize API limiter
-limiter = Limiter(
-    app = app,
-    key_func = get_remote_address,
-    storage_uri = API_CONFIG.get('storage_uri', 'memory://'),
-    default_limits = [
-        f'{API_CONFIG["limits"]["per_minute"]}/minute',
-        f'{API_CONFIG["limits"]["per_hour"]}/hour',
-        f'{API_CONFIG["limits"]["per_day"]}/day'
-    ]
-)
+# Production server & warmup
+from Server import Supervisor, Warmup
 
 # ------------------------------------- #
-# Helper functions                      #
-# ------------------------------------- #
-def json_result(success: bool, status_message: dict):
-    response = {
-        'success': success,
-        'status': status_message
-    }
-    return jsonify(response), status_message['code']
-
+# App factory                           #
 # ------------------------------------- #
-# Middleware (before_request)           #
-# ------------------------------------- #
-
-# 1. Check the API key and secret
-@app.before_request
-def check_api_key():
-    api_key = request.headers.get('X-API-KEY')
-    api_secret = request.headers.get('X-API-SECRET')
+REQUESTS_TOTAL      = METRICS.counter('http_requests_total', 'Requests by method, route and status', ('method', 'route', 'status'))
+REQUEST_SECONDS     = METRICS.histogram('http_request_duration_seconds', 'Request latency by method and route', ('method', 'route'))
+RATE_LIMITED_TOTAL  = METRICS.counter('rate_limit_rejections_total', 'Requests rejected by the rate limits and the quotas', ('kind',))
+
+def create_app(config: dict = None) -> Flask:
+    '''
+    Builds the API app. The database connection, the table descriptors and the loggers are only set up once a request
+    (or a log record) needs them, so building an app is cheap, e.g. for tests or in each server worker.
+    
+    Args:
+        config (dict, optional): The `app`, `api` and `database` configs, each defaults to the one read from the environment (`config.py`)
+    
+    Returns:
+        Flask: The app
+    '''
+    config = config or {}
+    app_config = config.get('app', APP_CONFIG)
+    api_config = config.get('api', API_CONFIG)
+    database_config = config.get('database', DATABASE_CONFIG)
+    
+    api_constants = build_api_constants(api_config)
+    api_keys, admin_keys, secrets = api_constants['keys'], api_constants['admin_keys'], api_constants['secrets']
+    allowed_origins, protected_tables = api_constants['allowed_origins'], api_constants['protected_tables']
     
-    if api_key not in API_KEYS or API_SECRETS.get(api_key) != api_secret:
-        return json_result(False, API_STATUS_MESSAGES['unauthorized'])
-
-# 2. Check the request method is allowed
-@app.before_request
-def check_allowed_method():
-    if request.method not in API_REQUEST_METHODS:
-        return json_result(False, API_STATUS_MESSAGES['invalid_method'](request.method, API_REQUEST_METHODS, f'Request method {request.method} is not allowed.'))
-
-# 3. Check the content type
-@app.before_request
-def check_content_type():
-    if not request.content_type and request.method in API_DATA_METHODS:
-        data_types = [ct.split('/')[-1].upper() for ct in API_VALID_CONTENT_TYPES]
-        return json_result(False, API_STATUS_MESSAGES['no_content_type'](data_types))
+    # Create the Database instance and the DatabaseManager
+    database = DatabaseFactory.create_database(database_config, DB_LOGGER)
+    db = DatabaseManager(database, DB_LOGGER)
+
+    # Create the codec registry shared by the middleware and the routes (JSON is the default)
+    codecs = CodecRegistry(JSONCodec(), MessagePackCodec())
+
+    # Queue the POSTs of the async ingestion tables, inserted in batches by a background flusher
+    ingest = None
+    ingest_tables = frozenset(table.strip() for table in api_config['ingest']['tables'] if table.strip())
+    if ingest_tables:
+        ingest = IngestQueue(
+            database = database,
+            db_manager = db,
+            logger = DB_LOGGER,
+            tables = ingest_tables,
+            queue_size = api_config['ingest']['queue_size'],
+            batch_size = api_config['ingest']['batch_size'],
+            flush_ms = api_config['ingest']['flush_ms'],
+            retention = api_config['ingest']['retention']
+        )
+
+    # Create the route instances once (the table descriptors are built on the first request)
+    routes = RouteRegistry(db, DB_LOGGER, API_LOGGER, codecs, protected_tables, ingest)
+
+    # Initialize the Flask app
+    app = Flask(app_config.get('name', __name__))
+
+    # Enable CORS
+    CORS(
+        app = app, 
+        resources = {
+            f'{API_CORE_URL_PREFIX}/*': {
+                    'origins': allowed_origins,
+                    'methods': list(API_REQUEST_METHODS)
+                }
+            }, 
+        supports_credentials = True
+    )
+
+    # Initialize API limiter
+    # -> the limits are counted per API key, the clients without a valid key and secret per address
+    #    (checked here, the limiter runs before the middleware), so a leaked key id can't use up the key's limits
+    def limiter_key():
+        if RequestContext.verify_key(request, api_keys, secrets):
+            return request.headers.get('X-API-KEY')
+        return get_remote_address()
+
+    storage_uri = api_config.get('storage_uri') or 'memory://'
+    limiter = Limiter(
+        app = app,
+        key_func = limiter_key,
+        storage_uri = storage_uri,
+        storage_options = api_config['storage_sync'] if storage_uri.startswith('hybrid+') else {},
+        default_limits = [
+            f'{api_config["limits"]["per_minute"]}/minute',
+            f'{api_config["limits"]["per_hour"]}/hour',
+            f'{api_config["limits"]["per_day"]}/day'
+        ]
+    )
+
+    # Rows & bytes quotas per API key, counted in the limiter storage
+    quotas = QuotaManager(limiter, api_config['quotas'])
+
+    # Warm up before taking traffic (run by the server before serving, `/ready` reports it)
+    warmup = Warmup(database, db, routes, APP_LOGGER, api_config['warmup']['queries'], api_config['warmup']['enabled'])
+
+    # ------------------------------------- #
+    # Helper functions                      #
+    # ------------------------------------- #
+    def json_result(success: bool, status_message: dict):
+        response = {
+            'success': success,
+            'status': status_message
+        }
+        return codecs.make_response(response, status_message['code'])
+
+    # ------------------------------------- #
+    # Middleware (before_request)           #
+    # ------------------------------------- #
+    # Profile the requests on demand (registered first, so the middleware is profiled too)
+    if api_config['profiling']['enabled']:
+        RequestProfiler(api_config['profiling'], admin_keys, secrets).init_app(app)
+
+    # All the steps run in one compiled chain, in the order they are registered.
+    # The request body is only decoded after the request has passed all other checks.
+    server_timing = ServerTiming(api_config['server_timing'], admin_keys, secrets)
+    pipeline = RequestPipeline(app, server_timing.wants)
+    origin_policy = OriginPolicy(allowed_origins)
+    access_log = AccessLog(ACCESS_LOGGER, api_keys)
+
+    # Track the allocation peak of each request (registered first, so the peak is known to the other finish callbacks)
+    memory_tracker = None
+    if api_config['memory_tracking']['enabled']:
+        memory_tracker = MemoryTracker(METRICS, api_config['memory_tracking']['frames'])
+        memory_tracker.init_app(pipeline)
+
+    # 1. Check the API key and secret
+    @pipeline.step()
+    def check_api_key(context: RequestContext):
+        if not RequestContext.verify_key(context.request, api_keys, secrets):
+            return json_result(False, API_STATUS_MESSAGES['unauthorized'])
+        context.authenticated = True
+
+    # 2. Check the API key has quota left
+    @pipeline.step()
+    def check_quota(context: RequestContext):
+        exhausted = quotas.exhausted(context.api_key)
     
-    if request.method in API_DATA_METHODS and str(request.content_type.split(';')[0]).lower() not in API_VALID_CONTENT_TYPES:
-        return json_result(False, API_STATUS_MESSAGES['invalid_content_type'](str(request.content_type), API_VALID_CONTENT_TYPES))
-
-# 4. Check if there is any data in the request
-@app.before_request
-def check_data_exists():
-    if request.method in API_DATA_METHODS and not request.json:
-        APP_LOGGER.warning(f'No data provided for request: {request.url}')
-        return json_result(False, API_STATUS_MESSAGES['no_data_provided'](API_VALID_CONTENT_TYPES))
-
-# 5. Check, and set the table visibility based on the origin
-@app.before_request
-def check_allowed_origin():
-    try:
-        origin = request.environ.get('HTTP_ORIGIN') or request.environ.get('HTTP_REFERER') or request.environ.get('HTTP_HOST')
-        if not origin.startswith('http://') and not origin.startswith('https://'):
-            origin = f'http://{origin}'
-        g.table_visibility = 'all' if origin in API_ALLOWED_ORIGINS else 'hidden'
-    except Exception as e:
-        API_LOGGER.warning(f'Error checking hidden table permission: {e}')
-        g.table_visibility = 'hidden'
-
-# 6. Restrict methods for disallowed origins
-@app.before_request
-def restrict_methods_for_disallowed_origins():
-    try:
-        origin = request.environ.get('HTTP_ORIGIN') or request.environ.get('HTTP_REFERER') or request.environ.get('HTTP_HOST')
-        if not origin.startswith('http://') and not origin.startswith('https://'):
-            origin = f'http://{origin}'
-        
-        if origin not in API_ALLOWED_ORIGINS and request.method != 'GET':
+        if exhausted:
+            unit, quota, retry_after = exhausted
+            RATE_LIMITED_TOTAL.inc(f'{unit}_quota')
+            return json_result(False, API_STATUS_MESSAGES['quota_exceeded'](unit, str(quota), retry_after))
+
+    # 3. Check the request method is allowed
+    @pipeline.step()
+    def check_allowed_method(context: RequestContext):
+        if context.method not in API_REQUEST_METHODS:
+            return json_result(False, API_STATUS_MESSAGES['invalid_method'](context.method, API_REQUEST_METHODS, f'Request method {context.method} is not allowed.'))
+
+    # 4. Check the content type
+    @pipeline.step(methods = API_DATA_METHODS)
+    def check_content_type(context: RequestContext):
+        content_type = context.request.content_type
+    
+        if not content_type:
+            data_types = [ct.split('/')[-1].upper() for ct in API_VALID_CONTENT_TYPES]
+            return json_result(False, API_STATUS_MESSAGES['no_content_type'](data_types))
+    
+        if codecs.get(content_type) is None:
+            return json_result(False, API_STATUS_MESSAGES['invalid_content_type'](str(content_type), API_VALID_CONTENT_TYPES))
+
+    # 5. Set the table visibility based on the origin, and restrict methods for disallowed origins
+    @pipeline.step()
+    def check_allowed_origin(context: RequestContext):
+        context.origin_allowed = origin_policy.is_allowed(context.origin)
+        context.table_visibility = 'all' if context.origin_allowed else 'hidden'
+    
+        if not context.origin_allowed and context.method != 'GET':
             return json_result(False, API_STATUS_MESSAGES['origin_not_allowed'])
-    except Exception as e:
-        return json_result(False, API_STATUS_MESSAGES['software_error'](str(e)))
-
-# ------------------------------------- #
-# Error handlers                        #
-# ------------------------------------- #
-@app.errorhandler(400)
-def bad_request(error):
-    return json_result(False, API_STATUS_MESSAGES['bad_request'](str(error)))
-
-@app.errorhandler(404)
-def not_found(error):
-    return json_result(False, API_STATUS_MESSAGES['not_found'](request.url, str(error)))
-
-@app.errorhandler(405)
-def method_not_allowed(error):
-    return json_result(False, API_STATUS_MESSAGES['invalid_method'](request.method, API_REQUEST_METHODS, str(error)))
-
-@app.errorhandler(429)
-def too_many_requests(error):
-    return json_result(False, API_STATUS_MESSAGES['too_many_requests'](str(error), f'{API_CONFIG["limits"]["per_minute"]}/minute'))
-
-@app.errorhandler(500)
-def internal_error(error):
-    return json_result(False, API_STATUS_MESSAGES['software_error'](str(error)))
 
-# ------------------------------------- #
-# GET - routes                          #
-# ------------------------------------- #
-@app.get(f'{API_CORE_URL_PREFIX}/<table>')
-def select_all(table):
-    route = GetRoute(db, f'{API_CORE_URL_PREFIX}/{table}', DB_LOGGER, API_LOGGER)
-    return route.get_all(table)
-
-@app.get(f'{API_CORE_URL_PREFIX}/<table>/', defaults={'id': None})
-@app.get(f'{API_CORE_URL_PREFIX}/<table>/<id>')
-def select_one(table, id):
-    route = GetRoute(db, f'{API_CORE_URL_PREFIX}/{table}/{id}', DB_LOGGER, API_LOGGER)
-    return route.get_one(table, id) 
-
-# ------------------------------------- #
-# POST - routes                         #
-# ------------------------------------- #
-@app.post(f'{API_CORE_URL_PREFIX}/<table>')
-def insert(table):
-    route = PostRoute(db, f'{API_CORE_URL_PREFIX}/{table}', DB_LOGGER, API_LOGGER)
-    return route.insert_one(table)
-
-# ------------------------------------- #
-# PUT - routes                          #
-# ------------------------------------- #
-@app.put(f'{API_CORE_URL_PREFIX}/<table>/<id>')
-def update(table, id):
-    route = PutRoute(db, f'{API_CORE_URL_PREFIX}/{table}/{id}', DB_LOGGER, API_LOGGER)
-    return route.update_one(table, id)
-
-# ------------------------------------- #
-# PATCH - routes                        #
-# ------------------------------------- #
-@app.patch(f'{API_CORE_URL_PREFIX}/<table>/<id>')
-def patch(table, id):
-    # Virtually same logic as PUT
-    route = PutRoute(db, f'{API_CORE_URL_PREFIX}/{table}/{id}', DB_LOGGER, API_LOGGER)
-    return route.update_one(table, id)
-
-# ------------------------------------- #
-# DELETE - routes                       #
-# ------------------------------------- #
-@app.delete(f'{API_CORE_URL_PREFIX}/<table>/<id>')
-def delete(table, id):
-    route = DeleteRoute(db, f'{API_CORE_URL_PREFIX}/{table}/{id}', DB_LOGGER, API_LOGGER)
-    return route.delete_one(table, id)
-
-# ------------------------------------- #
-# HEAD - routes                         #
-# ------------------------------------- #
-@app.route(f'{API_CORE_URL_PREFIX}/<table>', methods=['HEAD'])
-def head(table):
-    route = GetRoute(db, f'{API_CORE_URL_PREFIX}/{table}', DB_LOGGER, API_LOGGER)
-    return route.get_all(table, True)
-
-@app.route(f'{API_CORE_URL_PREFIX}/<table>/<id>', methods=['HEAD'])
-def head_one(table, id):
-    route = GetRoute(db, f'{API_CORE_URL_PREFIX}/{table}/{id}', DB_LOGGER, API_LOGGER)
-    return route.get_one(table, id, True)
+    # 6. Check if there is any data in the request
+    @pipeline.step(methods = API_DATA_METHODS)
+    def check_data_exists(context: RequestContext):
+        if not codecs.decode_request(context.request):
+            APP_LOGGER.warning(f'No data provided for request: {context.request.url}')
+            return json_result(False, API_STATUS_MESSAGES['no_data_provided'](API_VALID_CONTENT_TYPES))
+
+    # ------------------------------------- #
+    # Middleware (after_request)            #
+    # ------------------------------------- #
+    # Add the Server-Timing header to the timed requests
+    app.after_request(server_timing.apply)
+
+    # ------------------------------------- #
+    # Middleware (on finish)                #
+    # ------------------------------------- #
+    # Run once the response is complete (streamed responses once the stream ends)
+
+    # 1. Charge the request to the quotas of its API key
+    @pipeline.on_finish
+    def charge_quota(context: RequestContext, response):
+        # Only the verified keys are charged: a request with a wrong secret must not use up the key's quotas
+        if context.authenticated:
+            quotas.charge(context.api_key, context.stats.rows, context.response_bytes)
+
+    # 2. Write the access log record
+    pipeline.on_finish(access_log.write)
+
+    # 3. Record the request metrics
+    @pipeline.on_finish
+    def record_request_metrics(context: RequestContext, response):
+        # Label by the route rule, not the path, to keep the number of series bounded
+        route = context.request.url_rule.rule if context.request.url_rule else 'unmatched'
+        REQUESTS_TOTAL.inc(context.method, route, str(response.status_code))
+        REQUEST_SECONDS.observe(context.finished - context.started, context.method, route)
+
+    # 4. Record a sample of the requests for the replay tool
+    if api_config['capture']['enabled']:
+        pipeline.on_finish(TrafficRecorder(CAPTURE_LOGGER, api_config['capture']['sample_rate'], api_keys, admin_keys).write)
+
+    # ------------------------------------- #
+    # Error handlers                        #
+    # ------------------------------------- #
+    @app.errorhandler(400)
+    def bad_request(error):
+        return json_result(False, API_STATUS_MESSAGES['bad_request'](str(error)))
+
+    @app.errorhandler(404)
+    def not_found(error):
+        return json_result(False, API_STATUS_MESSAGES['not_found'](request.url, str(error)))
+
+    @app.errorhandler(405)
+    def method_not_allowed(error):
+        return json_result(False, API_STATUS_MESSAGES['invalid_method'](request.method, API_REQUEST_METHODS, str(error)))
+
+    @app.errorhandler(429)
+    def too_many_requests(error):
+        RATE_LIMITED_TOTAL.inc('requests')
+        return json_result(False, API_STATUS_MESSAGES['too_many_requests'](str(error), f'{api_config["limits"]["per_minute"]}/minute'))
+
+    @app.errorhandler(500)
+    def internal_error(error):
+        return json_result(False, API_STATUS_MESSAGES['software_error'](str(error)))
+
+    # ------------------------------------- #
+    # Metrics                               #
+    # ------------------------------------- #
+    # Scraped by Prometheus, so no API key and no rate limits
+    pipeline.exempt('/metrics')
+
+    @app.get('/metrics')
+    @limiter.exempt
+    def metrics():
+        return Response(METRICS.render(), content_type = METRICS.CONTENT_TYPE)
+
+    # ------------------------------------- #
+    # Readiness                             #
+    # ------------------------------------- #
+    # Polled by the load balancer: 503 until the warmup has run, so a cold instance gets no traffic
+    pipeline.exempt('/ready')
+
+    @app.get('/ready')
+    @limiter.exempt
+    def ready():
+        if not warmup.ready.is_set():
+            # Served by a WSGI server that didn't run the warmup: run it in the background
+            warmup.start()
+            return json_result(False, API_STATUS_MESSAGES['not_ready'])
+
+        return codecs.make_response({'success': True, 'ready': True, 'warmup': warmup.report}, 200)
+
+    # ------------------------------------- #
+    # Memory diagnostics                    #
+    # ------------------------------------- #
+    # Each call diffs a new tracemalloc snapshot with the previous one. Admin keys only.
+    if memory_tracker is not None:
+        @app.get('/debug/memory')
+        def memory_snapshot():
+            if not RequestContext.current().is_admin(admin_keys, secrets):
+                return json_result(False, API_STATUS_MESSAGES['unauthorized'])
+
+            try:
+                limit = int(request.args.get('limit', 25))
+            except ValueError:
+                return json_result(False, API_STATUS_MESSAGES['bad_request'](f'Invalid `limit`: {request.args.get("limit")}'))
+
+            return codecs.make_response(memory_tracker.snapshot_diff(limit), 200)
+
+    # ------------------------------------- #
+    # GET - routes                          #
+    # ------------------------------------- #
+    @app.get(f'{API_CORE_URL_PREFIX}/<table>')
+    def select_all(table):
+        return routes.get.get_all(table)
+
+    @app.get(f'{API_CORE_URL_PREFIX}/<table>/', defaults={'id': None})
+    @app.get(f'{API_CORE_URL_PREFIX}/<table>/<id>')
+    def select_one(table, id):
+        return routes.get.get_one(table, id) 
+
+    @app.get(f'{API_CORE_URL_PREFIX}/<table>/_export')
+    def export(table):
+        return routes.export.export_table(table)
+
+    # ------------------------------------- #
+    # POST - routes                         #
+    # ------------------------------------- #
+    @app.post(f'{API_CORE_URL_PREFIX}/<table>')
+    def insert(table):
+        return routes.post.insert_one(table)
+
+    # The status of a row queued by the POST of an async ingestion table
+    @app.get(f'{API_CORE_URL_PREFIX}/<table>/_ingest/<ticket>')
+    def ingest_status(table, ticket):
+        return routes.post.ingest_status(table, ticket)
+
+    # ------------------------------------- #
+    # PUT - routes                          #
+    # ------------------------------------- #
+    @app.put(f'{API_CORE_URL_PREFIX}/<table>/<id>')
+    def update(table, id):
+        return routes.put.update_one(table, id)
+
+    # ------------------------------------- #
+    # PATCH - routes                        #
+    # ------------------------------------- #
+    @app.patch(f'{API_CORE_URL_PREFIX}/<table>/<id>')
+    def patch(table, id):
+        # Virtually same logic as PUT
+        return routes.put.update_one(table, id)
+
+    # ------------------------------------- #
+    # DELETE - routes                       #
+    # ------------------------------------- #
+    @app.delete(f'{API_CORE_URL_PREFIX}/<table>/<id>')
+    def delete(table, id):
+        return routes.delete.delete_one(table, id)
+
+    # ------------------------------------- #
+    # HEAD - routes                         #
+    # ------------------------------------- #
+    @app.route(f'{API_CORE_URL_PREFIX}/<table>', methods=['HEAD'])
+    def head(table):
+        return routes.get.get_all(table, True)
+
+    @app.route(f'{API_CORE_URL_PREFIX}/<table>/<id>', methods=['HEAD'])
+    def head_one(table, id):
+        return routes.get.get_one(table, id, True)
+    
+    # The server supervisor closes and reopens the connection around the worker forks, and warms the workers up
+    app.extensions['database'] = database
+    app.extensions['warmup'] = warmup
+    app.extensions['ingest'] = ingest
+    return app
+
+# `index:app` (e.g. for a WSGI server), built on first access so importing `index` stays cheap
+def __getattr__(name: str):
+    if name == 'app':
+        globals()['app'] = create_app()
+        return globals()['app']
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 # ------------------------------------- #
 # Main function                         #
@@ -226,24 +402,57 @@ def head_one(table, id):
 if __name__ == '__main__':
     debug = APP_CONFIG.get('debug', True)
     app_env = APP_CONFIG.get('env', 'development')
+    app = create_app()
     
     match app_env:
         case 'development':
             APP_LOGGER.info('API started in development mode.')
+            app.extensions['warmup'].run()
             app.run(debug = debug, port = API_CONFIG['port'])
         case 'production':
             APP_LOGGER.info('API started in production mode.')
             WAITRESS_LOGGER.info('Waitress server started.')
             
-            from waitress import serve
-            
-            # TODO - this requires a bit of testing, cant run it locally (it atleast starts up though, which is good enough for now)
-            serve(
-                app = app, 
-                host = WAITRESS_CONFIG['host'], 
-                port = WAITRESS_CONFIG['port'], 
-                threads = WAITRESS_CONFIG['threads']
-            )
+            workers = Supervisor.worker_count(WAITRESS_CONFIG['workers'])
+            if workers > 1 and app.extensions['ingest']:
+                # The ingestion tickets are kept in the memory of the process that queued the rows
+                WAITRESS_LOGGER.error(f'The async ingestion (API_INGEST_TABLES) needs a single worker, {workers} workers are configured. Exiting...')
+                print('FATAL ERROR:The async ingestion runs in one server process only.\nSet WAITRESS_WORKERS="1" in the .env file, or clear API_INGEST_TABLES.')
+                exit(1)
+            if workers > 1:
+                if not API_CONFIG.get('storage_uri'):
+                    WAITRESS_LOGGER.warning(f'The rate limits and the quotas are counted per worker ({workers} workers) with the memory storage, set API_STORAGE_URI to share them.')
+                
+                # Each worker reports the metrics of all the workers, shared through their snapshots
+                metrics_dir = tempfile.mkdtemp(prefix = 'crud-metrics-')
+                atexit.register(shutil.rmtree, metrics_dir, True)
+                def share_metrics():
+                    METRICS.share(metrics_dir, Supervisor.worker_slot)
+                
+                # The parent doesn't serve, the workers open their own database connections
+                Supervisor(
+                    app = app,
+                    host = WAITRESS_CONFIG['host'],
+                    port = WAITRESS_CONFIG['port'],
+                    workers = workers,
+                    threads = WAITRESS_CONFIG['threads'],
+                    logger = WAITRESS_LOGGER,
+                    before_fork = (app.extensions['database'].close,),
+                    after_fork = (app.extensions['database'].reconnect, share_metrics, app.extensions['warmup'].run),
+                    # Flush the queued rows of the async ingestion tables before the worker exits
+                    on_exit = ((app.extensions['ingest'].close,) if app.extensions['ingest'] else ()) + (METRICS.flush,)
+                ).run()
+            else:
+                from waitress import serve
+                
+                # Warm up before binding, so the port only opens once the instance is warm
+                app.extensions['warmup'].run()
+                serve(
+                    app = app, 
+                    host = WAITRESS_CONFIG['host'], 
+                    port = WAITRESS_CONFIG['port'], 
+                    threads = WAITRESS_CONFIG['threads']
+                )
         case _:
             APP_LOGGER.error(f'Invalid environment variable. Exiting...')
             print(f'FATAL ERROR:Invalid APP_ENV.\nEdit the APP_ENV in the .env file to match one of the following values:\n{", ".join(APP_ENVS)}')
@@ -9,6 +9,11 @@ API_STATUS_CODES = {
     'invalid_method': 405,          # Method Not Allowed
     'invalid_query_arg': 400,       # Bad Request
     'no_data_provided': 400,        # Bad Request
+    'invalid_layout': 400,          # Bad Request
+    'invalid_export_format': 400,   # Bad Request
+    'export_unavailable': 501,      # Not Implemented
+    'quota_exceeded': 429,          # Too Many Requests
+    'not_ready': 503,               # Service Unavailable
     # ...
 }
 
@@ -79,4 +84,30 @@ API_STATUS_MESSAGES = {
         'code': API_STATUS_CODES['no_data_provided'],
         'type': 'error'
     },
+    'invalid_layout': lambda layout, valid_layouts: {
+        'message': f'Response layout `{layout}` is not supported. Use one of the following: {", ".join(valid_layouts)}',
+        'code': API_STATUS_CODES['invalid_layout'],
+        'type': 'error'
+    },
+    'invalid_export_format': lambda export_format, valid_formats: {
+        'message': f'Export format `{export_format}` is not supported. Use one of the following: {", ".join(valid_formats)}',
+        'code': API_STATUS_CODES['invalid_export_format'],
+        'type': 'error'
+    },
+    'export_unavailable': lambda export_format: {
+        'message': f'Exporting as `{export_format}` is not available on this server. The `pyarrow` package is not installed.',
+        'code': API_STATUS_CODES['export_unavailable'],
+        'type': 'error'
+    },
+    'quota_exceeded': lambda unit, quota, retry_after: {
+        'message': f'The {unit} quota of this API key ({quota}) is used up. Please try again in {retry_after} seconds.',
+        'code': API_STATUS_CODES['quota_exceeded'],
+        'retry_after': retry_after,
+        'type': 'error'
+    },
+    'not_ready': {
+        'message': 'The server is warming up. Please try again shortly.',
+        'code': API_STATUS_CODES['not_ready'],
+        'type': 'error'
+    },
 }
\ No newline at end of file
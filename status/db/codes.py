@@ -16,7 +16,12 @@ DATABASE_STATUS_CODES = {
     'invalid_fields': 400,          # Bad Request
     'query_fail': 400,              # Bad Request
     'query_success': 200,           # OK
-    'query_not_found': 404          # Not Found
+    'query_not_found': 404,         # Not Found
+    'query_timeout': 504,           # Gateway Timeout
+    'insert_queued': 202,           # Accepted
+    'ingest_queue_full': 503,       # Service Unavailable
+    'ticket_not_found': 404,        # Not Found
+    'ticket_other_process': 421     # Misdirected Request
 }
 
 DATABASE_STATUS_MESSAGES = {
@@ -63,6 +68,11 @@ DATABASE_STATUS_MESSAGES = {
         'error': error,
         'type': 'error'
     },
+    'query_timeout': lambda query: {
+        'message': f'Query `{query}` exceeded its execution time limit and was cancelled. Narrow the filters or lower the `limit` and try again.',
+        'code': DATABASE_STATUS_CODES['query_timeout'],
+        'type': 'error'
+    },
     'query_success': lambda query: {
         'message': f'Successfully executed query `{query}`',
         'code': DATABASE_STATUS_CODES['query_success'],
@@ -100,6 +110,27 @@ DATABASE_STATUS_MESSAGES = {
         'error': error,
         'type': 'error'
     },
+    'insert_queued': lambda table, ticket: {
+        'message': f'Record queued for insertion into `{table}`, not durable yet: check the ticket `{ticket}` for its status',
+        'code': DATABASE_STATUS_CODES['insert_queued'],
+        'ticket': ticket,
+        'type': 'info'
+    },
+    'ingest_queue_full': lambda table: {
+        'message': f'The ingestion queue is full, the record was not queued for insertion into `{table}`. Please try again later.',
+        'code': DATABASE_STATUS_CODES['ingest_queue_full'],
+        'type': 'error'
+    },
+    'ticket_not_found': lambda ticket: {
+        'message': f'Ingestion ticket `{ticket}` was not found (unknown or expired)',
+        'code': DATABASE_STATUS_CODES['ticket_not_found'],
+        'type': 'error'
+    },
+    'ticket_other_process': lambda ticket: {
+        'message': f'Ingestion ticket `{ticket}` was issued by another server process, its status is only known there (a ticket of a stopped process is committed or failed, unless the process crashed)',
+        'code': DATABASE_STATUS_CODES['ticket_other_process'],
+        'type': 'error'
+    },
     'update_success': lambda record, table = None: {
         'message': f'Successfully updated record `{record}` in `{table}`',
         'code': DATABASE_STATUS_CODES['update_success'],
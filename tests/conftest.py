@@ -0,0 +1,55 @@
+# Python deps & external libraries
+import os
+import sys
+import copy
+import sqlite3
+import pytest
+
+# The packages are imported from the repository root, as `index.py` does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ORIGIN = 'http://localhost'
+HEADERS = {'X-API-KEY': 'k', 'X-API-SECRET': 's', 'Origin': ORIGIN}
+SECTIONS = ('storage_sync', 'quotas', 'memory_tracking', 'warmup', 'ingest', 'capture', 'profiling', 'limits')
+
+@pytest.fixture
+def make_app(tmp_path):
+    '''
+    Builds the API app on a SQLite database in `tmp_path`, created with the `schema` statements.
+    The `api` and `database` keyword arguments override the configs read from the environment.
+    '''
+    def make(schema: tuple = (), api: dict = None, database: dict = None):
+        import index
+        from config import API_CONFIG, APP_CONFIG, DATABASE_CONFIG
+
+        db_path = str(tmp_path / 'test.db')
+        connection = sqlite3.connect(db_path)
+        for statement in schema:
+            connection.execute(statement)
+        connection.commit()
+        connection.close()
+
+        api_config = copy.deepcopy(API_CONFIG)
+        api_config.update({
+            'keys': ['k'],
+            'admin_keys': ['k'],
+            'secrets': {'k': 's'},
+            'allowed_origins': [ORIGIN],
+            'protected_tables': [''],
+            'storage_uri': 'memory://',
+            'limits': {'per_minute': 100000, 'per_hour': 100000, 'per_day': 100000}
+        })
+        api_config['quotas'] = {'rows': {}, 'bytes': {}, 'default_rows': None, 'default_bytes': None}
+        api_config['warmup']['enabled'] = False
+        api_config['ingest']['tables'] = ['']
+        for name, value in (api or {}).items():
+            # The sections (e.g. `ingest`) are merged, the other values replaced
+            if name in SECTIONS:
+                api_config[name].update(value)
+            else:
+                api_config[name] = value
+
+        database_config = {**DATABASE_CONFIG, 'type': 'sqlite', 'database': db_path, 'group_commit_ms': None, **(database or {})}
+        return index.create_app({'app': {**APP_CONFIG, 'name': 'crud-tests'}, 'api': api_config, 'database': database_config})
+
+    return make
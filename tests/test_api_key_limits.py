@@ -0,0 +1,77 @@
+# Python deps & external libraries
+import copy
+import sqlite3
+from limits import parse
+
+import index
+from config import API_CONFIG, APP_CONFIG, DATABASE_CONFIG
+
+ORIGIN = 'http://localhost'
+VALID = {'X-API-KEY': 'k', 'X-API-SECRET': 's', 'Origin': ORIGIN}
+WRONG_SECRET = {'X-API-KEY': 'k', 'X-API-SECRET': 'wrong', 'Origin': ORIGIN}
+BYTE_QUOTA = '100000/hour'
+
+def create_app(db_path: str):
+    connection = sqlite3.connect(db_path)
+    connection.execute('CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT NOT NULL)')
+    connection.execute("INSERT INTO users (name) VALUES ('alice'), ('bob')")
+    connection.commit()
+    connection.close()
+
+    api_config = copy.deepcopy(API_CONFIG)
+    api_config.update({
+        'keys': ['k'],
+        'admin_keys': [''],
+        'secrets': {'k': 's'},
+        'allowed_origins': [ORIGIN],
+        'protected_tables': [''],
+        'storage_uri': 'memory://',
+        'limits': {'per_minute': 3, 'per_hour': 1000, 'per_day': 1000}
+    })
+    api_config['quotas'] = {'rows': {'k': '1000/hour'}, 'bytes': {'k': BYTE_QUOTA}, 'default_rows': None, 'default_bytes': None}
+    api_config['warmup']['enabled'] = False
+    api_config['ingest']['tables'] = ['']
+    database_config = {**DATABASE_CONFIG, 'type': 'sqlite', 'database': db_path, 'group_commit_ms': None}
+
+    app_config = {**APP_CONFIG, 'name': 'crud-tests'}
+    app = index.create_app({'app': app_config, 'api': api_config, 'database': database_config})
+    limiter = next(iter(app.extensions['limiter']))
+    return app, limiter
+
+def quota_remaining(limiter, unit: str, limit: str) -> int:
+    return limiter.limiter.get_window_stats(parse(limit), 'quota', unit, 'k').remaining
+
+def test_wrong_secret_leaves_key_counters_unchanged(tmp_path):
+    app, limiter = create_app(str(tmp_path / 'test.db'))
+    client = app.test_client()
+
+    # More than the per minute limit: the address is limited, not the key
+    for _ in range(5):
+        response = client.get('/api/v1/users', headers = WRONG_SECRET)
+        assert response.status_code in (403, 429)
+
+    assert quota_remaining(limiter, 'bytes', BYTE_QUOTA) == 100000
+    assert quota_remaining(limiter, 'rows', '1000/hour') == 1000
+
+    # The key still has its full limits, and is charged for its own requests
+    for _ in range(3):
+        assert client.get('/api/v1/users', headers = VALID).status_code == 200
+    assert client.get('/api/v1/users', headers = VALID).status_code == 429
+    assert quota_remaining(limiter, 'bytes', BYTE_QUOTA) < 100000
+    assert quota_remaining(limiter, 'rows', '1000/hour') == 1000 - 3 * 2
+
+def test_update_is_charged_its_own_rows(make_app):
+    app = make_app(
+        schema = (
+            'CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT NOT NULL, badge INTEGER UNIQUE)',
+            "INSERT INTO users (name, badge) VALUES ('alice', 1)"
+        ),
+        api = {'quotas': {'rows': {'k': '1000/hour'}}}
+    )
+    limiter = next(iter(app.extensions['limiter']))
+    client = app.test_client()
+
+    # The reads checking the record and its unique badge aren't rows of the update
+    response = client.put('/api/v1/users/1', json = {'name': 'alicia', 'badge': 2}, headers = VALID)
+    assert response.status_code == 200, response.get_json()
+    assert quota_remaining(limiter, 'rows', '1000/hour') == 1000 - 1
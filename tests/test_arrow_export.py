@@ -0,0 +1,47 @@
+# Python deps & external libraries
+import io
+from decimal import Decimal
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from Codecs import ArrowExport
+
+def export(export_format: str, batches: list, column_types: dict) -> bytes:
+    return b''.join(ArrowExport.export(export_format, iter(batches), column_types))
+
+def read_arrow(data: bytes) -> pa.Table:
+    return pa.ipc.open_stream(data).read_all()
+
+def test_unconstrained_decimal_scale_grows_after_first_batch():
+    batches = [
+        (['amount'], [(Decimal('1'),), (Decimal('2'),)]),
+        (['amount'], [(Decimal('1.25'),), (None,)])
+    ]
+    table = read_arrow(export('arrow', batches, {'amount': 'numeric'}))
+
+    assert table.schema.field('amount').type == pa.string()
+    assert table.column('amount').to_pylist() == ['1', '2', '1.25', None]
+
+def test_all_null_first_batch_then_ints():
+    batches = [
+        (['id', 'score'], [(1, None), (2, None)]),
+        (['id', 'score'], [(3, 7), (4, None)])
+    ]
+    # `score` has no declared type, as the SQLite columns declared without one
+    table = pq.read_table(io.BytesIO(export('parquet', batches, {'id': 'integer', 'score': ''})))
+
+    assert table.schema.field('id').type == pa.int64()
+    assert table.schema.field('score').type == pa.string()
+    assert table.column('id').to_pylist() == [1, 2, 3, 4]
+    assert table.column('score').to_pylist() == [None, None, '7', None]
+
+def test_declared_types_hold_for_all_batches():
+    batches = [
+        (['price', 'count'], [(1, None)]),
+        (['price', 'count'], [(2.5, 3)])
+    ]
+    table = read_arrow(export('arrow', batches, {'price': 'decimal(10,2)', 'count': 'int'}))
+
+    assert table.schema.field('price').type == pa.decimal128(10, 2)
+    assert table.column('price').to_pylist() == [Decimal('1.00'), Decimal('2.50')]
+    assert table.column('count').to_pylist() == [None, 3]
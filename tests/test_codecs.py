@@ -0,0 +1,52 @@
+# Python deps & external libraries
+import flask
+import msgpack
+import pytest
+from decimal import Decimal
+from datetime import date, datetime
+
+from Database import RowSet
+from Codecs.codecs import JSONCodec, MessagePackCodec
+
+COLUMNS = ('name', 'id', 'score', 'active', 'price', 'created_at', 'note')
+ROWS = [
+    ('Zoë "z"', 1, 1.5, True, Decimal('1.25'), datetime(2026, 1, 2, 3, 4, 5), None),
+    ('b\\n', 2, float('nan'), False, Decimal('0'), date(2026, 1, 2), 'x,y'),
+    ('', 3, -0.0, None, None, None, '☃')
+]
+
+@pytest.fixture
+def app():
+    app = flask.Flask('codecs')
+    with app.app_context():
+        yield app
+
+def as_dicts(columns: tuple, rows: list) -> list:
+    return [dict(zip(columns, row)) for row in rows]
+
+@pytest.mark.parametrize('columns, rows', [
+    (COLUMNS, ROWS),
+    (COLUMNS, []),
+    (('id',), [(index,) for index in range(2500)]),
+    # Duplicate names (e.g. a join) keep the dictionary semantics
+    (('id', 'id'), [(1, 2)])
+])
+def test_rows_are_encoded_as_their_dictionaries(app, columns, rows):
+    data = {'data': RowSet(columns, rows), 'success': True, 'meta': {'total_records': len(rows)}}
+    expected = {**data, 'data': as_dicts(columns, rows)}
+
+    json_codec = JSONCodec()
+    assert json_codec.encode(data) == json_codec.encode(expected)
+
+    msgpack_codec = MessagePackCodec()
+    assert msgpack_codec.encode(data) == msgpack_codec.encode(expected)
+
+def test_other_layouts_are_unchanged(app):
+    data = {'data': RowSet(COLUMNS, ROWS[:1], 'columnar')}
+    assert msgpack.unpackb(MessagePackCodec().encode(data))['data']['columns'] == list(COLUMNS)
+    assert flask.json.loads(JSONCodec().encode(data))['data']['columns'] == list(COLUMNS)
+
+def test_debug_mode_is_pretty_printed(app):
+    app.debug = True
+    body = JSONCodec().encode({'data': RowSet(('id',), [(1,)])})
+    assert body == flask.json.dumps({'data': [{'id': 1}]}, indent=2).encode('utf-8') + b'\n'
@@ -0,0 +1,21 @@
+from conftest import HEADERS
+
+def test_failed_connection_answers_connection_fail(make_app, tmp_path):
+    app = make_app(database = {'database': str(tmp_path / 'missing' / 'test.db'), 'password': 'hunter2'})
+    database = app.extensions['database']
+
+    result = database.query('SELECT 1', query_arguments = {})
+    assert result['status']['success'] is False
+    assert result['status']['code'] == 503
+
+    # The table lookup answers the failed connection, without the password of the configuration
+    response = app.test_client().get('/api/v1/users', headers = HEADERS)
+    assert response.status_code == 503
+    assert response.get_json()['status']['code'] == 503
+    assert b'hunter2' not in response.data
+
+def test_database_without_tables_answers_table_not_found(make_app):
+    app = make_app()
+
+    response = app.test_client().get('/api/v1/users', headers = HEADERS)
+    assert response.status_code == 404
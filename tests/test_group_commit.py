@@ -0,0 +1,52 @@
+# Python deps & external libraries
+import sqlite3
+import logging
+import threading
+
+from Database import DatabaseFactory
+
+def test_groups_stay_within_max_batch(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    connection = sqlite3.connect(db_path)
+    connection.execute('CREATE TABLE fast (id INTEGER PRIMARY KEY, name TEXT NOT NULL)')
+    connection.close()
+
+    database = DatabaseFactory.create_database({
+        'type': 'sqlite',
+        'database': db_path,
+        'group_commit_ms': 20,
+        'group_commit_max': 2
+    }, logging.getLogger('group_commit_test'))
+    group_commit = database.group_commit
+
+    # Hold the first group, so the next writes pile up behind it
+    sizes, holding, release = [], threading.Event(), threading.Event()
+    commit_group = group_commit._commit_group
+    def record(batch):
+        sizes.append(len(batch))
+        if len(sizes) == 1:
+            holding.set()
+            release.wait()
+        commit_group(batch)
+    group_commit._commit_group = record
+
+    errors = []
+    def submit(index: int):
+        try:
+            group_commit.submit(f"INSERT INTO fast (name) VALUES ('{index}')", 'fast')
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target = submit, args = (index,)) for index in range(8)]
+    threads[0].start()
+    holding.wait()
+    for thread in threads[1:]:
+        thread.start()
+    threading.Timer(0.2, release.set).start()
+    for thread in threads:
+        thread.join(timeout = 5)
+
+    assert not any(thread.is_alive() for thread in threads)
+    assert not errors
+    assert sum(sizes) == 8 and max(sizes) <= 2
+    assert sqlite3.connect(db_path).execute('SELECT count(*) FROM fast').fetchone() == (8,)
@@ -0,0 +1,33 @@
+# Python deps & external libraries
+import time
+
+from conftest import HEADERS
+
+SCHEMA = ('CREATE TABLE events (id INTEGER PRIMARY KEY, name TEXT NOT NULL)',)
+
+def wait_for(client, url: str, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get(url, headers = HEADERS)
+        if response.json.get('status') != 'queued' or time.monotonic() > deadline:
+            return response
+        time.sleep(0.02)
+
+def test_ticket_status(make_app):
+    app = make_app(SCHEMA, api = {'ingest': {'tables': ['events'], 'flush_ms': 10}})
+    client = app.test_client()
+
+    response = client.post('/api/v1/events', json = {'name': 'signup'}, headers = HEADERS)
+    assert response.status_code == 202
+    ticket = response.json['ticket']
+
+    response = wait_for(client, f'/api/v1/events/_ingest/{ticket}')
+    assert response.status_code == 200
+    assert response.json['status'] == 'committed' and response.json['durable']
+
+    # An expired ticket of this process, and one of another process
+    origin = ticket.partition('-')[0]
+    assert client.get(f'/api/v1/events/_ingest/{origin}-{"0" * 32}', headers = HEADERS).status_code == 404
+    response = client.get(f'/api/v1/events/_ingest/00000000-{"0" * 32}', headers = HEADERS)
+    assert response.status_code == 421
+    assert response.json['status']['code'] == 421
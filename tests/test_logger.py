@@ -0,0 +1,36 @@
+# Python deps & external libraries
+import os
+import logging
+import pytest
+
+from Logger import Logger
+
+# The server forks with the listener threads running too
+@pytest.mark.filterwarnings('ignore::DeprecationWarning')
+def test_forked_worker_writes_its_own_file(tmp_path):
+    instance = Logger(log_dir = str(tmp_path), logger_name = 'worker_test_logger')
+    logger = instance.get_logger()
+    logger.warning('from the parent')
+
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            Logger.set_worker(3)
+            logger.warning('from the worker')
+            instance.stop()
+            code = 0
+        finally:
+            os._exit(code)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    logger.warning('from the parent again')
+    instance.stop()
+    logging.getLogger('worker_test_logger').handlers = []
+
+    parent = (tmp_path / 'worker_test_logger.log').read_text()
+    worker = (tmp_path / 'worker_test_logger.worker3.log').read_text()
+    assert 'from the parent' in parent and 'from the parent again' in parent
+    assert 'from the worker' not in parent
+    assert 'from the worker' in worker and 'from the parent' not in worker
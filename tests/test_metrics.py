@@ -0,0 +1,32 @@
+# Python deps & external libraries
+from Metrics import MetricsRegistry
+
+def worker_registry(directory: str, worker: int, requests: int) -> MetricsRegistry:
+    registry = MetricsRegistry()
+    registry.directory, registry.worker = directory, str(worker)
+    registry.counter('requests_total', 'Requests', ('route',)).inc('/users', amount = requests)
+    registry.histogram('duration_seconds', 'Latency', buckets = (0.1,)).observe(0.05)
+    return registry
+
+def test_each_worker_renders_all_the_workers(tmp_path):
+    first = worker_registry(str(tmp_path), 0, 3)
+    second = worker_registry(str(tmp_path), 1, 5)
+    first.flush()
+    second.flush()
+
+    for registry in (first, second):
+        text = registry.render()
+        assert text.count('# TYPE requests_total counter') == 1
+        assert 'requests_total{worker="0",route="/users"} 3' in text
+        assert 'requests_total{worker="1",route="/users"} 5' in text
+        assert 'duration_seconds_count{worker="0"} 1' in text
+        assert 'duration_seconds_count{worker="1"} 1' in text
+
+    # The own series are live, not read back from the snapshot
+    first.counter('requests_total', 'Requests', ('route',)).inc('/users')
+    assert 'requests_total{worker="0",route="/users"} 4' in first.render()
+
+def test_unshared_registry_has_no_worker_label():
+    registry = MetricsRegistry()
+    registry.counter('requests_total', 'Requests').inc()
+    assert registry.render() == '# HELP requests_total Requests\n# TYPE requests_total counter\nrequests_total 1\n'
@@ -0,0 +1,54 @@
+# Python deps & external libraries
+import os
+import time
+import threading
+from flask import Flask
+
+from Middleware import RequestProfiler
+
+HEADERS = {'X-API-KEY': 'admin', 'X-API-SECRET': 'secret', 'X-Profile': 'cprofile'}
+
+def create_app(directory: str) -> Flask:
+    app = Flask(__name__)
+    RequestProfiler({'retention': 1000}, frozenset({'admin'}), {'admin': 'secret'}, directory).init_app(app)
+
+    @app.get('/slow')
+    def slow():
+        time.sleep(0.02)
+        return {'success': True}
+
+    return app
+
+def test_concurrent_cprofile_requests(tmp_path):
+    app = create_app(str(tmp_path))
+    barrier = threading.Barrier(16)
+    responses = []
+
+    def request():
+        client = app.test_client()
+        barrier.wait()
+        for _ in range(5):
+            responses.append(client.get('/slow', headers = HEADERS))
+
+    threads = [threading.Thread(target = request) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(responses) == 80
+    assert all(response.status_code == 200 for response in responses)
+
+    # Overlapping requests were sampled instead, and every request got its profile
+    modes = [response.headers['X-Profile'] for response in responses]
+    assert 'cprofile' in modes and 'sample' in modes
+    profiles = os.listdir(tmp_path)
+    assert sum(name.endswith('.pstats') for name in profiles) == modes.count('cprofile')
+    assert sum(name.endswith('.collapsed') for name in profiles) == modes.count('sample')
+
+def test_cprofile_after_concurrent_requests(tmp_path):
+    app = create_app(str(tmp_path))
+    response = app.test_client().get('/slow', headers = HEADERS)
+
+    assert response.status_code == 200
+    assert response.headers['X-Profile'] == 'cprofile'
@@ -0,0 +1,67 @@
+# Python deps & external libraries
+import sqlite3
+import logging
+
+from Database import DatabaseFactory
+from Database.GroupCommit import _Write
+
+# Enough rows for the statements to run well past their timeout
+SLOW_SELECT = 'WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 50000000) SELECT count(*) FROM c'
+SLOW_INSERT = f'INSERT INTO slow (n) {SLOW_SELECT}'
+
+def create_database(db_path: str, **config):
+    connection = sqlite3.connect(db_path)
+    connection.execute('CREATE TABLE fast (id INTEGER PRIMARY KEY, name TEXT NOT NULL)')
+    connection.execute('CREATE TABLE slow (n INTEGER)')
+    connection.commit()
+    connection.close()
+
+    return DatabaseFactory.create_database({
+        'type': 'sqlite',
+        'database': db_path,
+        'group_commit_ms': 50,
+        'table_timeouts': {'slow': 50},
+        **config
+    }, logging.getLogger('group_commit_test'))
+
+def rows(db_path: str, table: str) -> list:
+    connection = sqlite3.connect(db_path)
+    try:
+        return connection.execute(f'SELECT * FROM {table} ORDER BY 1').fetchall()
+    finally:
+        connection.close()
+
+def test_timed_out_write_fails_alone(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    database = create_database(db_path)
+    batch = [
+        _Write("INSERT INTO fast (name) VALUES ('a')", 'fast'),
+        _Write("INSERT INTO fast (name) VALUES (NULL)", 'fast'),
+        _Write(SLOW_INSERT, 'slow'),
+        _Write("INSERT INTO fast (name) VALUES ('b')", 'fast')
+    ]
+    database.group_commit._commit_group(batch)
+
+    first, failed, slow, last = batch
+    assert first.error is None and first.rowcount == 1
+    assert isinstance(failed.error, sqlite3.IntegrityError)
+    assert database._is_timeout(slow.error)
+    assert last.error is None and last.rowcount == 1
+    assert all(write.done.is_set() for write in batch)
+    assert rows(db_path, 'fast') == [(1, 'a'), (2, 'b')]
+    assert rows(db_path, 'slow') == []
+
+def test_timed_out_write_gets_a_timeout_status(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    database = create_database(db_path)
+
+    assert database.timed_out(database.write(SLOW_INSERT, 'slow'))
+    assert database.write("INSERT INTO fast (name) VALUES ('a')", 'fast')['status']['success']
+    assert rows(db_path, 'fast') == [(1, 'a')]
+
+def test_timed_out_select_keeps_the_connection(tmp_path):
+    db_path = str(tmp_path / 'test.db')
+    database = create_database(db_path, group_commit_ms = None, table_timeouts = {}, statement_timeout_ms = 50)
+
+    assert database.timed_out(database.query(SLOW_SELECT, 'slow', {}))
+    assert database.query('SELECT count(*) FROM fast', 'fast', {})['status']['success']
@@ -40,4 +40,53 @@ class ParseUtils:
             else:
                 print('Secrets parsed successfully.')
         
-        return secrets
\ No newline at end of file
+        return secrets
+        
+    @staticmethod
+    def parse_quotas(quotas_str: str, logger = None) -> dict:
+        '''
+        Parse the quotas string `quotas_str` (`key:limit;limit,key:limit`) into a dictionary.
+        
+        Args:
+            quotas_str (str): The quotas string, e.g. `key:100000/hour;1000000/day`
+            
+        Returns:
+            dict: The quota limit strings by API key
+        '''
+        quotas = {}
+        
+        for item in filter(None, quotas_str.split(',')):
+            key, _, limits = item.partition(':')
+            if key and limits:
+                quotas[key.strip()] = limits.strip()
+            elif logger:
+                logger.error(f'Error parsing the quota `{item}`.')
+            else:
+                print(f'Error parsing the quota `{item}`.')
+        
+        return quotas
+    
+    @staticmethod
+    def parse_timeouts(timeouts_str: str, logger = None) -> dict:
+        '''
+        Parse the timeouts string `timeouts_str` (`name:milliseconds,name:milliseconds`) into a dictionary.
+        The names may contain `:`, the timeout is after the last one.
+        
+        Args:
+            timeouts_str (str): The timeouts string, e.g. `/api/v1/<table>/_export:0,events:2000`
+            
+        Returns:
+            dict: The timeout strings by name
+        '''
+        timeouts = {}
+        
+        for item in filter(None, timeouts_str.split(',')):
+            name, _, timeout = item.rpartition(':')
+            if name and timeout.strip().isdigit():
+                timeouts[name.strip()] = timeout.strip()
+            elif logger:
+                logger.error(f'Error parsing the timeout `{item}`.')
+            else:
+                print(f'Error parsing the timeout `{item}`.')
+        
+        return timeouts